@@ -0,0 +1,107 @@
+"""
+Núcleo compartido de ARC Raiders Maps: datos del juego e índices derivados
+"""
+
+from .context import SystemPrompt, build_system_prompt, get_system_prompt
+from .crafting import CraftingEngine, RecipeCycleError, material_id, parse_inventory
+from .data import ITEMS_FILE, TRANS, GameData, get_game_data, load_items
+from .history import HistoryManager, count_tokens, message_tokens
+from .icons import ICON_INDEX_FILE, ICONS_DIR, IconIndex, build_icon_index, detect_grid, icon_hash, is_inventory
+from .images import PreparedImage, data_url, image_digest, prepare_image, sniff_mime
+from .intents import Intent, IntentRouter
+from .llm_client import DeadlineExceeded, LLMClient, get_llm_client, is_retryable, retry_delay
+from .locations import LOCATION_FLAGS, LOCATION_TYPES, LocationMatcher, location_flag, location_mask
+from .maps import MAP_URLS, MAPGENIE_MAPS, MAPS_DATA
+from .markers import MARKERS_JS, loader_tag, marker_payload, markers_json
+from .recipes import RECIPES
+from .response_cache import ResponseCache, context_hash, normalize_question
+from .retrieval import BM25Index, ContextRetriever, tokenize
+from .routes import RoutePlanner
+from .search import FIELD_WEIGHTS, ItemSearchIndex, normalize
+from .snapshot import ItemSnapshot, build_snapshot, load_snapshot
+from .spatial import MapSpatialIndex, SpatialIndex, cluster_grid, cluster_levels, to_leaflet
+from .streaming import StreamError, chat_completion_deltas, collect_stream, response_deltas
+from .tile_archive import ARCHIVE_FILE, TileArchive, pack_directory, tile_hash
+from .tiles import CDN_URL, ORDER_ZXY, ORDER_ZYX, TILE_SCHEMES, TileScheme, scheme_for
+
+__all__ = [
+    "ARCHIVE_FILE",
+    "BM25Index",
+    "CDN_URL",
+    "ContextRetriever",
+    "CraftingEngine",
+    "DeadlineExceeded",
+    "FIELD_WEIGHTS",
+    "GameData",
+    "HistoryManager",
+    "ICONS_DIR",
+    "ICON_INDEX_FILE",
+    "IconIndex",
+    "ITEMS_FILE",
+    "Intent",
+    "IntentRouter",
+    "LLMClient",
+    "LOCATION_FLAGS",
+    "LOCATION_TYPES",
+    "LocationMatcher",
+    "ItemSearchIndex",
+    "ItemSnapshot",
+    "MAPGENIE_MAPS",
+    "MARKERS_JS",
+    "MAPS_DATA",
+    "MapSpatialIndex",
+    "MAP_URLS",
+    "ORDER_ZXY",
+    "ORDER_ZYX",
+    "PreparedImage",
+    "RECIPES",
+    "RecipeCycleError",
+    "ResponseCache",
+    "RoutePlanner",
+    "SpatialIndex",
+    "StreamError",
+    "SystemPrompt",
+    "TILE_SCHEMES",
+    "TileArchive",
+    "TileScheme",
+    "TRANS",
+    "build_icon_index",
+    "build_snapshot",
+    "build_system_prompt",
+    "chat_completion_deltas",
+    "cluster_grid",
+    "cluster_levels",
+    "collect_stream",
+    "context_hash",
+    "count_tokens",
+    "data_url",
+    "detect_grid",
+    "get_game_data",
+    "get_llm_client",
+    "get_system_prompt",
+    "icon_hash",
+    "image_digest",
+    "is_inventory",
+    "is_retryable",
+    "load_items",
+    "loader_tag",
+    "location_flag",
+    "marker_payload",
+    "markers_json",
+    "location_mask",
+    "material_id",
+    "message_tokens",
+    "load_snapshot",
+    "normalize",
+    "normalize_question",
+    "pack_directory",
+    "parse_inventory",
+    "prepare_image",
+    "response_deltas",
+    "retry_delay",
+    "scheme_for",
+    "sniff_mime",
+    "tile_hash",
+    "to_leaflet",
+    "tokenize",
+]
@@ -0,0 +1,78 @@
+"""
+Prompt de sistema del chat de IA
+
+La parte estática del contexto (mapas, tipos de ubicación, reglas) se
+construye una vez y se reutiliza en cada mensaje; solo se rehace si
+cambian los objetos de los que sale (una GameData nueva al cambiar
+items_data.json, o RECIPES / MAPS recargados). Va siempre primero y
+byte a byte igual, de modo que el proveedor pueda reaprovechar su caché
+de prefijos; lo que cambia por mensaje (mapa actual, historial, items,
+recetas y POIs recuperados con arc_core.retrieval) va detrás.
+"""
+
+import threading
+
+from .response_cache import context_hash
+
+
+def build_system_prompt(items, recipes, maps):
+    """Texto del prompt de sistema a partir de los datos del juego"""
+    maps_summary = []
+    for mdata in maps.values():
+        pois = ", ".join([p["title"] for p in mdata["pois"][:5]])
+        maps_summary.append(f"- {mdata['name']}: {pois}...")
+
+    return f"""Eres un asistente experto de ARC Raiders, un videojuego de supervivencia cooperativo.
+
+MAPAS DISPONIBLES:
+{chr(10).join(maps_summary)}
+
+TIPOS DE UBICACIONES: electrical, mechanical, medical, industrial, residential, commercial, nature, ARC, technological
+
+BASE DE DATOS: {len(items)} items y {len(recipes)} recetas. Con cada pregunta recibirás los items, recetas y ubicaciones más relevantes.
+
+REGLAS:
+1. Responde en español
+2. Sé conciso y directo
+3. Da recomendaciones específicas de ubicaciones
+4. Si preguntan por crafteo, detalla los materiales
+5. Para farmeo, sugiere rutas eficientes
+6. Si no sabes algo, dilo honestamente
+7. Tienes acceso a información actualizada del juego hasta tu fecha de entrenamiento"""
+
+
+class SystemPrompt:
+    """Prompt de sistema cacheado mientras no cambien sus fuentes"""
+
+    def __init__(self, builder=build_system_prompt):
+        self.builder = builder
+        self.builds = 0
+        self._lock = threading.Lock()
+        self._state = (None, None, None)  # (fuentes, texto, hash)
+
+    @staticmethod
+    def _same(a, b):
+        # Se comparan los objetos (no su contenido): recorrer RECIPES y MAPS
+        # para comprobarlos costaría más que reconstruir el prompt
+        return b is not None and all(x is y for x, y in zip(a, b))
+
+    def get(self, items, recipes, maps):
+        """(texto, hash) del prompt para estos datos"""
+        sources = (items, recipes, maps)
+        state = self._state
+        if not self._same(sources, state[0]):
+            with self._lock:
+                state = self._state
+                if not self._same(sources, state[0]):
+                    text = self.builder(items, recipes, maps)
+                    state = self._state = (sources, text, context_hash(text))
+                    self.builds += 1
+        return state[1], state[2]
+
+
+SYSTEM_PROMPT = SystemPrompt()
+
+
+def get_system_prompt(items, recipes, maps):
+    """(texto, hash) del prompt de sistema compartido por todo el proceso"""
+    return SYSTEM_PROMPT.get(items, recipes, maps)
@@ -0,0 +1,256 @@
+"""
+Motor de crafteo: orden topológico de las recetas y materiales base precalculados
+
+Las recetas forman un grafo (una receta usa otras como material). Se
+ordena una sola vez; al recorrerlo de las hojas hacia arriba cada receta
+obtiene su vector de materiales base por unidad, y cualquier cantidad se
+responde escalando ese vector. Los ciclos se detectan al construir el
+motor en lugar de cortar la recursión a una profundidad fija.
+
+El mismo orden, recorrido al revés, da el índice inverso material →
+recetas que lo consumen (directa o indirectamente).
+"""
+
+import re
+
+
+class RecipeCycleError(ValueError):
+    """Las recetas se usan entre sí en ciclo"""
+
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__("Ciclo en las recetas: " + " → ".join(cycle))
+
+
+def material_id(name):
+    """Id de receta que correspondería a un material"""
+    return name.lower().replace(" ", "_")
+
+
+class CraftingEngine:
+    """Resolución de recetas con materiales base memoizados"""
+
+    def __init__(self, recipes):
+        self.recipes = recipes
+        self.order = self._topological_order()
+
+        # Materiales base por unidad, de las hojas hacia arriba
+        self._base = {}
+        for recipe_id in self.order:
+            base = {}
+            for mat_name, mat_qty in recipes[recipe_id]["materials"]:
+                sub_id = material_id(mat_name)
+                if sub_id in recipes:
+                    for name, qty in self._base[sub_id].items():
+                        base[name] = base.get(name, 0) + qty * mat_qty
+                else:
+                    base[mat_name] = base.get(mat_name, 0) + mat_qty
+            self._base[recipe_id] = base
+
+        self._build_reverse_index()
+
+    def _subrecipes(self, recipe_id):
+        for mat_name, _ in self.recipes[recipe_id]["materials"]:
+            sub_id = material_id(mat_name)
+            if sub_id in self.recipes:
+                yield sub_id
+
+    def _topological_order(self):
+        """Recetas ordenadas de forma que cada una va después de sus materiales"""
+        order = []
+        state = {}  # 1 = en la pila, 2 = terminada
+
+        for root in self.recipes:
+            if state.get(root):
+                continue
+            state[root] = 1
+            path = [root]
+            stack = [iter(self._subrecipes(root))]
+            while stack:
+                sub_id = next(stack[-1], None)
+                if sub_id is None:
+                    stack.pop()
+                    done = path.pop()
+                    state[done] = 2
+                    order.append(done)
+                elif state.get(sub_id) == 1:
+                    start = path.index(sub_id)
+                    raise RecipeCycleError(path[start:] + [sub_id])
+                elif not state.get(sub_id):
+                    state[sub_id] = 1
+                    path.append(sub_id)
+                    stack.append(iter(self._subrecipes(sub_id)))
+        return order
+
+    def __contains__(self, recipe_id):
+        return recipe_id in self.recipes
+
+    def base_materials(self, recipe_id, quantity=1):
+        """Materiales base totales para fabricar `quantity` unidades"""
+        base = self._base.get(recipe_id)
+        if base is None:
+            return {}
+        return {name: qty * quantity for name, qty in base.items()}
+
+    def recipe_tree(self, recipe_id, quantity=1, depth=0):
+        """Árbol completo de materiales (para mostrarlo).
+
+        Se construye con una pila explícita: cadenas de recetas profundas
+        no chocan con el límite de recursión de Python.
+        """
+        if recipe_id not in self.recipes:
+            return None
+        root = {"name": self.recipes[recipe_id]["name"], "quantity": quantity, "materials": [], "depth": depth}
+        stack = [(root, recipe_id)]
+        while stack:
+            node, node_id = stack.pop()
+            for mat_name, mat_qty in self.recipes[node_id]["materials"]:
+                sub_id = material_id(mat_name)
+                qty = mat_qty * node["quantity"]
+                if sub_id in self.recipes:
+                    child = {"name": self.recipes[sub_id]["name"], "quantity": qty, "materials": [],
+                             "depth": node["depth"] + 1}
+                    stack.append((child, sub_id))
+                else:
+                    child = {"name": mat_name, "quantity": qty, "base": True}
+                node["materials"].append(child)
+        return root
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # ÍNDICE INVERSO
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def _build_reverse_index(self):
+        self.material_names = {}
+        self._used_by = {}
+        for recipe_id, recipe in self.recipes.items():
+            for mat_name, _ in recipe["materials"]:
+                mat_id = material_id(mat_name)
+                self.material_names.setdefault(mat_id, mat_name)
+                users = self._used_by.setdefault(mat_id, [])
+                if recipe_id not in users:
+                    users.append(recipe_id)
+
+        # Los consumidores de una receta van después de ella en el orden,
+        # así que recorriéndolo al revés ya están resueltos
+        position = {recipe_id: i for i, recipe_id in enumerate(self.recipes)}
+        self._used_by_all = {}
+        for mat_id in list(reversed(self.order)) + [m for m in self._used_by if m not in self.recipes]:
+            users = set(self._used_by.get(mat_id, ()))
+            for user in self._used_by.get(mat_id, ()):
+                users |= self._used_by_all[user]
+            self._used_by_all[mat_id] = users
+        self._position = position
+
+    def recipes_using(self, material, transitive=True):
+        """Recetas que consumen un material (por nombre o id), en orden de RECIPES"""
+        mat_id = material_id(material)
+        if transitive:
+            found = self._used_by_all.get(mat_id, ())
+        else:
+            found = self._used_by.get(mat_id, ())
+        return sorted(found, key=self._position.__getitem__)
+
+    def find_recipes_using(self, query):
+        """(directas, indirectas) para los materiales cuyo nombre contiene la consulta"""
+        q = query.lower().strip()
+        direct, indirect = set(), set()
+        for mat_id, name in self.material_names.items():
+            if q in name.lower():
+                direct.update(self._used_by[mat_id])
+                indirect.update(self._used_by_all[mat_id])
+        indirect -= direct
+        return (
+            sorted(direct, key=self._position.__getitem__),
+            sorted(indirect, key=self._position.__getitem__),
+        )
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # INVENTARIO
+    # ═══════════════════════════════════════════════════════════════════════
+
+    def _consume(self, recipe_id, units, stock):
+        """Descuenta del stock lo necesario para `units` unidades; False si no llega.
+
+        Recorre los materiales en profundidad con una pila de iteradores:
+        lo que falta de un intermedio se fabrica antes de seguir con el
+        siguiente material, sin recursión.
+        """
+        stack = [(iter(self.recipes[recipe_id]["materials"]), units)]
+        while stack:
+            materials, units = stack[-1]
+            material = next(materials, None)
+            if material is None:
+                stack.pop()
+                continue
+            mat_name, mat_qty = material
+            mat_id = material_id(mat_name)
+            need = mat_qty * units
+            used = min(stock.get(mat_id, 0), need)
+            if used:
+                stock[mat_id] -= used
+                need -= used
+            if need:
+                if mat_id not in self.recipes:
+                    return False
+                stack.append((iter(self.recipes[mat_id]["materials"]), need))
+        return True
+
+    def max_craftable(self, recipe_id, inventory):
+        """Unidades de una receta que se pueden fabricar con un inventario {id: cantidad}"""
+        low, high = 0, sum(inventory.values())
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self._consume(recipe_id, mid, dict(inventory)):
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    def craftable_with(self, inventory):
+        """{receta: unidades} para todas las recetas fabricables con el inventario.
+
+        Usa primero los intermedios que ya estén en el inventario y fabrica
+        el resto desde sus materiales. Las recetas cuyos materiales base no
+        aparecen en el inventario se descartan sin simular.
+        """
+        stock = {}
+        for name, qty in inventory.items():
+            if qty > 0:
+                mat_id = material_id(name)
+                stock[mat_id] = stock.get(mat_id, 0) + qty
+
+        candidates = set()
+        for mat_id in stock:
+            candidates |= self._used_by_all.get(mat_id, set())
+
+        result = {}
+        for recipe_id in self.order:
+            if recipe_id in candidates:
+                units = self.max_craftable(recipe_id, stock)
+                if units:
+                    result[recipe_id] = units
+        return result
+
+
+def parse_inventory(text):
+    """Lee un inventario en texto: una línea por material ("4x Cloth", "Battery: 2", "cable 3")"""
+    inventory = {}
+    for line in re.split(r"[\n,;]+", text):
+        line = line.strip()
+        if not line:
+            continue
+        match = re.match(r"^(\d+)\s*x?\s+(.+)$", line) or re.match(r"^(\d+)x(.+)$", line)
+        if match:
+            qty, name = int(match.group(1)), match.group(2)
+        else:
+            # La "x" solo separa si lleva espacio o ":" delante ("Box 3" no es "Bo" x3)
+            match = re.match(r"^(.+?)(?:\s*[:×]\s*|\s+x?\s*)(\d+)$", line)
+            if not match:
+                qty, name = 1, line
+            else:
+                name, qty = match.group(1), int(match.group(2))
+        name = name.strip(" :")
+        if name:
+            inventory[name] = inventory.get(name, 0) + qty
+    return inventory
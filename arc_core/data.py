@@ -0,0 +1,161 @@
+"""
+Datos del juego: carga única de items_data.json e índices derivados
+"""
+
+import json
+import os
+from functools import cached_property, lru_cache
+
+from .intents import IntentRouter
+from .locations import LocationMatcher, location_flag, location_mask
+from .maps import MAPS_DATA
+from .recipes import RECIPES
+from .retrieval import ContextRetriever
+from .routes import RoutePlanner
+from .search import ItemSearchIndex
+from .spatial import SpatialIndex
+from .snapshot import load_snapshot
+
+# Ruta absoluta al archivo de items
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ITEMS_FILE = os.path.join(BASE_DIR, "items_data.json")
+
+# Traducciones ES -> EN
+TRANS = {
+    "bateria": "battery", "baterias": "battery", "pila": "battery", "pilas": "battery",
+    "energia": "power", "electrico": "electrical", "electricidad": "electrical",
+    "mecanico": "mechanical", "medico": "medical", "medicina": "medical",
+    "arma": "weapon", "municion": "ammo", "vendaje": "bandage",
+    "componente": "component", "cable": "cable", "chatarra": "scrap",
+    "quimico": "chemical", "plastico": "plastic", "metal": "metal",
+    "tela": "cloth", "pegamento": "adhesive", "cinta": "tape",
+}
+
+
+def load_items(path=ITEMS_FILE):
+    """Lee la lista de items desde el JSON"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class GameData:
+    """Items del juego con sus índices, construidos una sola vez"""
+
+    def __init__(self, items, translations=None, maps=None, recipes=None):
+        self.items = items
+        self.translations = TRANS if translations is None else translations
+        self.maps = MAPS_DATA if maps is None else maps
+        self.recipes = RECIPES if recipes is None else recipes
+        self._by_maps = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    @cached_property
+    def items_index(self):
+        """Items por nombre en minúsculas"""
+        return {item["name"].lower(): item for item in self.items}
+
+    def column(self, field):
+        """Valores de un campo para todos los items (None si falta)"""
+        if hasattr(self.items, "column"):
+            return self.items.column(field)
+        return [item.get(field) for item in self.items]
+
+    @cached_property
+    def search_index(self):
+        return ItemSearchIndex(self.items, self.translations)
+
+    def search_items(self, query, limit=10):
+        return self.search_index.search(query, limit)
+
+    @cached_property
+    def item_masks(self):
+        """Máscara de bits de foundIn por item"""
+        if not hasattr(self.items, "found_in_masks"):
+            return [location_mask(found) for found in self.column("foundIn")]
+
+        # El snapshot ya trae las máscaras; solo se traducen sus bits
+        flags = [location_flag(name) for name in self.items.categories]
+        remap = {}
+        masks = []
+        for raw in self.items.found_in_masks():
+            mask = remap.get(raw)
+            if mask is None:
+                mask = 0
+                for bit, flag in enumerate(flags):
+                    if raw >> bit & 1:
+                        mask |= flag
+                remap[raw] = mask
+            masks.append(mask)
+        return masks
+
+    @cached_property
+    def locations(self):
+        return LocationMatcher(self.maps, self.item_masks)
+
+    @cached_property
+    def spatial(self):
+        return SpatialIndex(self.maps)
+
+    @cached_property
+    def routes(self):
+        return RoutePlanner(self.maps, self.spatial)
+
+    def _for_maps(self, kind, maps, build):
+        # Uno por conjunto de mapas: cada app solo expone (y cita) los suyos
+        maps = self.maps if maps is None else maps
+        key = (kind, tuple(maps))
+        built = self._by_maps.get(key)
+        if built is None:
+            built = self._by_maps[key] = build(maps)
+        return built
+
+    def retriever_for(self, maps=None):
+        """BM25 sobre items, recetas y POIs (solo de `maps`) para el contexto de la IA"""
+        return self._for_maps("retriever", maps,
+                              lambda maps: ContextRetriever(self.items, self.recipes, maps, self.translations))
+
+    @property
+    def retriever(self):
+        return self.retriever_for()
+
+    def intents_for(self, maps=None):
+        """Router de preguntas sencillas que se responden sin IA (mapas de `maps`)"""
+        return self._for_maps("intents", maps, lambda maps: IntentRouter(self.recipes, maps, self.translations, self.maps))
+
+    @property
+    def intents(self):
+        return self.intents_for()
+
+    def get_locations(self, item, map_id):
+        return self.locations.locations(item, map_id)
+
+    def get_locations_batch(self, items, map_id):
+        return self.locations.locations_batch(items, map_id)
+
+
+def _source_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+@lru_cache(maxsize=2)
+def _load_game_data(path, source_key):
+    items = load_snapshot(path)
+    if items is None:
+        items = load_items(path)
+    return GameData(items)
+
+
+def get_game_data(path=ITEMS_FILE):
+    """Datos del juego compartidos por todo el proceso.
+
+    Usa el snapshot compilado (python build_snapshot.py) si existe y
+    corresponde al JSON actual; si no, parsea el JSON. Si el JSON cambia
+    en disco, la siguiente llamada devuelve unos datos nuevos.
+    """
+    return _load_game_data(path, _source_key(path))
@@ -0,0 +1,135 @@
+"""
+Presupuesto de tokens para el historial del chat
+
+Los tokens se cuentan en local (con tiktoken si está instalado; si no,
+con la aproximación de ~4 caracteres por token). Cada turno se envían
+los mensajes más recientes que caben en el presupuesto; los que se
+quedan fuera se pliegan en un resumen acumulado que vive en la sesión y
+se manda como un único mensaje de sistema. Así el tamaño de cada
+petición queda acotado por mucho que dure la conversación.
+"""
+
+import math
+import re
+
+try:
+    import tiktoken
+except ImportError:  # dependencia opcional
+    tiktoken = None
+
+# Tokens para el historial (sin contar prompt de sistema ni pregunta)
+DEFAULT_BUDGET = 1500
+# Tokens máximos del resumen acumulado
+SUMMARY_BUDGET = 300
+# Coste fijo aproximado de cada mensaje (rol, separadores)
+MESSAGE_OVERHEAD = 4
+# Coste aproximado de una imagen adjunta (detalle bajo)
+IMAGE_TOKENS = 85
+# Longitud máxima de cada línea del resumen
+SUMMARY_LINE_CHARS = 160
+
+_encoding = None
+
+
+def count_tokens(text):
+    """Tokens de un texto (exactos con tiktoken, estimados sin él)"""
+    global _encoding
+    if not text:
+        return 0
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def message_tokens(message):
+    """Tokens de un mensaje de chat (contenido de texto o lista de partes)"""
+    content = message.get("content")
+    if isinstance(content, str):
+        tokens = count_tokens(content)
+    else:
+        tokens = 0
+        for part in content or []:
+            if part.get("type") in ("input_image", "image_url"):
+                tokens += IMAGE_TOKENS
+            else:
+                tokens += count_tokens(part.get("text", ""))
+    return tokens + MESSAGE_OVERHEAD
+
+
+def _plain_text(message):
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    return " ".join(part.get("text", "") for part in content or [] if "text" in part)
+
+
+def summarize_locally(summary, messages):
+    """Resumen extractivo: primera frase de cada mensaje plegado"""
+    lines = [summary] if summary else []
+    for message in messages:
+        text = " ".join(_plain_text(message).split())
+        if not text:
+            continue
+        first = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+        if len(first) > SUMMARY_LINE_CHARS:
+            first = first[:SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+        who = "Usuario" if message.get("role") == "user" else "Asistente"
+        lines.append(f"- {who}: {first}")
+    return "\n".join(lines)
+
+
+class HistoryManager:
+    """Recorta el historial a un presupuesto de tokens con resumen acumulado.
+
+    El estado (resumen y cuántos mensajes ya están plegados en él) es un
+    diccionario que guarda el que llama, p. ej. en st.session_state.
+    summarizer(resumen, mensajes) → nuevo resumen; por defecto es local
+    y no llama a la IA.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, summary_budget=SUMMARY_BUDGET, summarizer=summarize_locally):
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.summarizer = summarizer
+
+    def _trim_summary(self, summary):
+        # Se descartan las líneas más antiguas hasta caber
+        lines = summary.split("\n")
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > self.summary_budget:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def prepare(self, history, state):
+        """Mensajes a enviar para este turno; actualiza `state` si pliega mensajes"""
+        folded = min(state.get("folded", 0), len(history))
+        summary = state.get("summary", "")
+        recent = history[folded:]
+
+        # El resumen nuevo también ocupa presupuesto: se repite hasta que
+        # los mensajes que quedan caben junto a él
+        while True:
+            # Mensajes más recientes que caben (el último siempre entra)
+            budget = self.budget - (count_tokens(summary) + MESSAGE_OVERHEAD if summary else 0)
+            start = len(recent)
+            used = 0
+            while start > 0:
+                cost = message_tokens(recent[start - 1])
+                if used + cost > budget and start < len(recent):
+                    break
+                used += cost
+                start -= 1
+            if not start:
+                break
+            summary = self._trim_summary(self.summarizer(summary, recent[:start]))
+            folded += start
+            recent = recent[start:]
+            state["summary"] = summary
+            state["folded"] = folded
+
+        messages = []
+        if summary:
+            messages.append({"role": "system", "content": f"RESUMEN DE LA CONVERSACIÓN ANTERIOR:\n{summary}"})
+        messages.extend(recent)
+        return messages
@@ -0,0 +1,257 @@
+"""
+Reconocimiento local de inventarios a partir de capturas de pantalla
+
+Cada item de items_data.json tiene un icono (`icon`). build_icon_index.py
+calcula una vez el hash perceptual (dHash) de esos iconos a partir de
+una carpeta local y lo guarda en icon_hashes.json. Con ese índice, una
+captura del inventario se divide en celdas (la rejilla se detecta por la
+periodicidad de los bordes), se calcula el mismo hash de cada celda y se
+busca el icono más cercano por distancia de Hamming: ids de items con
+sus cantidades en milisegundos y sin llamar a la IA.
+
+Las cantidades de cada pila se leen con pytesseract si está instalado;
+si no, cada celda cuenta como una unidad. Requiere Pillow y NumPy.
+"""
+
+import io
+import json
+import os
+from collections import Counter, namedtuple
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # dependencia opcional
+    Image = None
+
+try:
+    import pytesseract
+except ImportError:  # dependencia opcional
+    pytesseract = None
+
+from .data import BASE_DIR
+from .images import trim_borders
+
+# Carpeta con los iconos descargados (mismo nombre de archivo que `icon`)
+ICONS_DIR = os.environ.get("ARC_ICONS_DIR", os.path.join(BASE_DIR, "icons"))
+ICON_INDEX_FILE = os.path.join(BASE_DIR, "icon_hashes.json")
+
+# Lado del dHash: HASH_SIZE² bits
+HASH_SIZE = 16
+# Distancia máxima (fracción de bits distintos) para aceptar una coincidencia
+MAX_DISTANCE = 0.22
+# Fondo sobre el que se componen los iconos (las celdas del juego son oscuras)
+ICON_BACKGROUND = (24, 26, 30)
+# Margen de la celda que se descarta (borde de rareza y cantidad)
+CELL_MARGIN = 0.12
+# Desviación típica mínima del gris para que una celda no se considere vacía
+EMPTY_STD = 6.0
+# Tamaño de celda plausible en píxeles para la detección de la rejilla
+MIN_CELL, MAX_CELL = 32, 256
+# Autocorrelación normalizada mínima del periodo para aceptar una rejilla
+MIN_PERIODICITY = 0.3
+# Celdas reconocidas (número y fracción de las no vacías) para tomar la
+# captura por un inventario
+MIN_RECOGNIZED = 4
+MIN_RECOGNIZED_RATIO = 0.5
+
+Grid = namedtuple("Grid", "x y cell_width cell_height columns rows")
+Match = namedtuple("Match", "item_id distance box quantity")
+
+
+def _require_pillow():
+    if Image is None:
+        raise RuntimeError("El reconocimiento de inventario necesita Pillow (pip install pillow)")
+
+
+def _square(image):
+    """Rellena a cuadrado con el color de fondo, centrando el contenido"""
+    side = max(image.size)
+    canvas = Image.new("RGB", (side, side), ICON_BACKGROUND)
+    canvas.paste(image, ((side - image.width) // 2, (side - image.height) // 2))
+    return canvas
+
+
+def dhash(image, size=HASH_SIZE):
+    """Hash de diferencias: (size * size / 8) bytes como array de uint8"""
+    gray = np.asarray(image.convert("L").resize((size + 1, size), Image.LANCZOS), dtype=np.int16)
+    return np.packbits(gray[:, 1:] > gray[:, :-1])
+
+
+def icon_hash(image):
+    """Hash de un icono (RGBA) compuesto sobre el fondo de las celdas"""
+    image = image.convert("RGBA")
+    box = image.getchannel("A").getbbox()
+    if box:
+        image = image.crop(box)
+    background = Image.new("RGBA", image.size, ICON_BACKGROUND + (255,))
+    return dhash(_square(Image.alpha_composite(background, image).convert("RGB")))
+
+
+def icon_filename(icon_path):
+    """Archivo local de un icono ("/items/icons/x.webp" → "x.webp")"""
+    return os.path.basename(icon_path or "")
+
+
+def build_icon_index(items, icons_dir=ICONS_DIR, out_path=ICON_INDEX_FILE):
+    """Hashea los iconos disponibles en icons_dir → (out_path, hasheados, ids sin icono)"""
+    _require_pillow()
+    hashes = {}
+    missing = []
+    for item in items:
+        path = os.path.join(icons_dir, icon_filename(item.get("icon")))
+        if not item.get("icon") or not os.path.isfile(path):
+            missing.append(item["id"])
+            continue
+        with Image.open(path) as image:
+            hashes[item["id"]] = icon_hash(image).tobytes().hex()
+
+    payload = {"hash_size": HASH_SIZE, "hashes": hashes}
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp_path, out_path)
+    return out_path, len(hashes), missing
+
+
+def _period(profile, min_score=MIN_PERIODICITY):
+    """Periodo dominante de un perfil de bordes (autocorrelación); None si no es claro"""
+    signal = profile - profile.mean()
+    best, best_score = None, 0.0
+    energy = float(signal @ signal) or 1.0
+    for lag in range(MIN_CELL, min(MAX_CELL, len(signal) // 2) + 1):
+        score = float(signal[:-lag] @ signal[lag:]) / energy
+        if score > best_score:
+            best, best_score = lag, score
+    return best if best_score >= min_score else None
+
+
+def _grid_lines(profile, period):
+    """Inicio de la primera celda y número de celdas completas.
+
+    Los bordes de la rejilla se repiten en cada periodo y los de los
+    iconos no: al plegar el perfil sobre un periodo quedan picos en los
+    bordes y la celda es el tramo más largo entre ellos.
+    """
+    folded = np.array([profile[offset::period].sum() for offset in range(period)])
+    strong = np.flatnonzero(folded >= folded.max() * 0.5)
+    gaps = np.diff(np.append(strong, strong[0] + period))
+    phase = int(strong[gaps.argmax()] + 1) % period
+    return phase, (len(profile) - phase) // period
+
+
+def detect_grid(image):
+    """Rejilla de celdas de una captura (None si no hay periodicidad clara)"""
+    _require_pillow()
+    gray = np.asarray(image.convert("L"), dtype=np.float32)
+    cols_profile = np.abs(np.diff(gray, axis=1)).sum(axis=0)
+    rows_profile = np.abs(np.diff(gray, axis=0)).sum(axis=1)
+    cell_width, cell_height = _period(cols_profile), _period(rows_profile)
+    if not cell_width or not cell_height:
+        return None
+    x, columns = _grid_lines(cols_profile, cell_width)
+    y, rows = _grid_lines(rows_profile, cell_height)
+    if not columns or not rows:
+        return None
+    return Grid(x, y, cell_width, cell_height, columns, rows)
+
+
+def grid_cells(grid):
+    """Cajas (x0, y0, x1, y1) de las celdas, por filas"""
+    for row in range(grid.rows):
+        for col in range(grid.columns):
+            x0 = grid.x + col * grid.cell_width
+            y0 = grid.y + row * grid.cell_height
+            yield x0, y0, x0 + grid.cell_width, y0 + grid.cell_height
+
+
+def read_quantity(cell):
+    """Cantidad de la pila (esquina inferior derecha); 1 si no se puede leer"""
+    if pytesseract is None:
+        return 1
+    width, height = cell.size
+    corner = cell.crop((width // 2, height * 2 // 3, width, height)).convert("L")
+    text = pytesseract.image_to_string(corner, config="--psm 7 -c tessedit_char_whitelist=0123456789x")
+    digits = "".join(ch for ch in text if ch.isdigit())
+    return int(digits) if digits else 1
+
+
+def is_inventory(recognized, unknown, min_cells=MIN_RECOGNIZED, min_ratio=MIN_RECOGNIZED_RATIO):
+    """True si hay bastantes celdas reconocidas para fiarse del resultado"""
+    return recognized >= min_cells and recognized >= min_ratio * (recognized + unknown)
+
+
+class IconIndex:
+    """Hashes perceptuales de los iconos con búsqueda por distancia de Hamming"""
+
+    def __init__(self, hashes, hash_size=HASH_SIZE):
+        self.hash_size = hash_size
+        self.ids = list(hashes)
+        self._hashes = np.array([np.frombuffer(bytes.fromhex(h), dtype=np.uint8) for h in hashes.values()],
+                                dtype=np.uint8).reshape(len(self.ids), -1)
+
+    @classmethod
+    def load(cls, path=ICON_INDEX_FILE):
+        """Índice guardado por build_icon_index (None si no existe)"""
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        return cls(payload["hashes"], payload.get("hash_size", HASH_SIZE))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, digest):
+        """(item_id, distancia en fracción de bits) del icono más parecido"""
+        if not self.ids:
+            return None, 1.0
+        distances = np.unpackbits(self._hashes ^ digest, axis=1).sum(axis=1)
+        best = int(distances.argmin())
+        return self.ids[best], distances[best] / (self.hash_size * self.hash_size)
+
+    def cell_hash(self, cell):
+        """Hash de una celda recortada, o None si está vacía"""
+        width, height = cell.size
+        inner = cell.crop((round(width * CELL_MARGIN), round(height * CELL_MARGIN),
+                           round(width * (1 - CELL_MARGIN)), round(height * (1 - CELL_MARGIN))))
+        if np.asarray(inner.convert("L"), dtype=np.float32).std() < EMPTY_STD:
+            return None
+        # Como en icon_hash: solo el contenido, sin el fondo de la celda
+        return dhash(_square(trim_borders(inner.convert("RGB"))), self.hash_size)
+
+    def recognize(self, image, grid=None, max_distance=MAX_DISTANCE):
+        """(coincidencias, celdas no reconocidas) de una captura (imagen o bytes)"""
+        _require_pillow()
+        try:
+            if isinstance(image, bytes):
+                image = Image.open(io.BytesIO(image))
+            image = image.convert("RGB")
+        except (OSError, Image.DecompressionBombError):
+            # Archivo corrupto o que no es una imagen: nada que reconocer
+            return [], 0
+        grid = grid or detect_grid(image)
+        if grid is None:
+            return [], 0
+        matches = []
+        unknown = 0
+        for box in grid_cells(grid):
+            cell = image.crop(box)
+            digest = self.cell_hash(cell)
+            if digest is None:
+                continue
+            item_id, distance = self.nearest(digest)
+            if distance > max_distance:
+                unknown += 1
+                continue
+            matches.append(Match(item_id, distance, box, read_quantity(cell)))
+        return matches, unknown
+
+    def inventory(self, image, grid=None):
+        """({item_id: cantidad}, celdas reconocidas, celdas no reconocidas)"""
+        matches, unknown = self.recognize(image, grid)
+        counts = Counter()
+        for match in matches:
+            counts[match.item_id] += match.quantity
+        return dict(counts), len(matches), unknown
@@ -0,0 +1,106 @@
+"""
+Preprocesado de imágenes subidas antes de mandarlas a la IA de visión
+
+Las capturas de inventario llegan a resolución de pantalla (PNG de
+varios MB). La API las reescala igualmente a un máximo de 2048 px de
+lado largo y 768 px de lado corto, así que se reducen aquí a ese tamaño,
+se recortan los bordes lisos (bandas negras, marcos) y se recodifican a
+WebP (o JPEG) con calidad fija: mismo detalle para el modelo, una
+fracción de los bytes. El hash del contenido original identifica la
+imagen para no procesarla ni enviarla dos veces.
+
+Pillow es opcional: sin él la imagen se envía tal cual, pero con su tipo
+MIME real.
+"""
+
+import base64
+import hashlib
+import io
+from collections import namedtuple
+
+try:
+    from PIL import Image, ImageChops, features
+except ImportError:  # dependencia opcional
+    Image = None
+
+# Tamaño al que la API reescala las imágenes en detalle alto
+MAX_LONG_SIDE = 2048
+MAX_SHORT_SIDE = 768
+QUALITY = 80
+# Diferencia máxima (0-255) con el color de la esquina para considerar un borde liso
+BORDER_TOLERANCE = 8
+
+PreparedImage = namedtuple("PreparedImage", "data mime width height digest")
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+)
+
+
+def image_digest(data):
+    """Hash del contenido original (clave de caché de la imagen)"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def sniff_mime(data):
+    """Tipo MIME por la firma de los bytes (no por la extensión)"""
+    for signature, mime in _SIGNATURES:
+        if data.startswith(signature):
+            return mime
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def target_size(width, height, max_long=MAX_LONG_SIDE, max_short=MAX_SHORT_SIDE):
+    """Tamaño reducido que conserva la proporción (nunca amplía)"""
+    scale = min(1.0, max_long / max(width, height), max_short / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def trim_borders(image, tolerance=BORDER_TOLERANCE):
+    """Recorta los bordes del mismo color que la esquina superior izquierda"""
+    background = Image.new(image.mode, image.size, image.getpixel((0, 0)))
+    diff = ImageChops.difference(image, background).convert("L")
+    box = diff.point(lambda value: 255 if value > tolerance else 0).getbbox()
+    if box and box != (0, 0) + image.size:
+        return image.crop(box)
+    return image
+
+
+def prepare_image(data, fmt="WEBP", quality=QUALITY, crop=True):
+    """Imagen lista para enviar: reducida, recortada, recodificada y con hash"""
+    digest = image_digest(data)
+    if Image is None:
+        return PreparedImage(data, sniff_mime(data), None, None, digest)
+
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            original_size = source.size
+            image = source.convert("RGB")
+    except (OSError, Image.DecompressionBombError):
+        # Corrupta o no es una imagen: se envía tal cual, como sin Pillow
+        return PreparedImage(data, sniff_mime(data), None, None, digest)
+    if crop:
+        image = trim_borders(image)
+    size = target_size(*image.size)
+    if size != image.size:
+        image = image.resize(size, Image.LANCZOS)
+
+    if fmt.upper() == "WEBP" and not features.check("webp"):
+        fmt = "JPEG"
+    out = io.BytesIO()
+    image.save(out, format=fmt.upper(), quality=quality, optimize=True)
+    encoded = out.getvalue()
+
+    # Recodificar una imagen ya pequeña puede salir más grande
+    if len(encoded) >= len(data) and image.size == original_size:
+        return PreparedImage(data, sniff_mime(data), image.width, image.height, digest)
+    return PreparedImage(encoded, f"image/{fmt.lower()}", image.width, image.height, digest)
+
+
+def data_url(prepared):
+    """data: URL para input_image / image_url"""
+    return f"data:{prepared.mime};base64,{base64.b64encode(prepared.data).decode('ascii')}"
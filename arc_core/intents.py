@@ -0,0 +1,177 @@
+"""
+Router de intenciones local para el chat
+
+Clasifica las preguntas sencillas con reglas deterministas (palabras
+clave + vocabulario de TRANS, nombres de recetas, categorías de
+ubicación y mapas) y extrae sus parámetros, para que la app responda con
+sus propias funciones en milisegundos. Lo que no encaja con seguridad en
+una intención devuelve None y sigue yendo a la IA.
+"""
+
+import re
+from collections import namedtuple
+
+from .locations import LOCATION_TYPES
+from .search import normalize
+
+Intent = namedtuple("Intent", "name slots")
+
+# Preguntas más largas se consideran abiertas y van a la IA
+MAX_WORDS = 14
+
+# Palabras clave por intención (texto ya normalizado, sin acentos)
+ROUTE_CUES = ("ruta", "route", "recorrido")
+BEST_MAP_CUES = (
+    "mejor mapa", "que mapa", "cual mapa", "mapa para", "mapa con mas",
+    "donde farmear", "best map", "which map",
+)
+RECIPE_CUES = (
+    "craft", "fabric", "receta", "recipe", "materiales", "necesito para", "que necesito",
+    "como hago", "como hacer", "como se hace", "construir",
+)
+
+# Negaciones que anulan una palabra clave que va poco después
+# ("no quiero craftear medkit, dime dónde está...")
+NEGATIONS = frozenset({"no", "ni", "nunca", "sin", "not", "dont", "don", "never", "without"})
+# Palabras antes de la palabra clave (sin pasar de un signo de puntuación)
+# en las que se busca la negación
+NEGATION_WINDOW = 4
+# "no sé cómo hacer..." pregunta lo mismo que "cómo hacer..."
+NOT_NEGATING = frozenset({"se", "sabe", "sabes", "sabia", "know"})
+
+# Alias en español de categorías que TRANS no cubre
+TYPE_ALIASES = {
+    "residencial": "residential", "comercial": "commercial", "seguridad": "security",
+    "naturaleza": "nature", "tecnologico": "technological", "tecnologia": "technological",
+}
+
+
+def _words(text):
+    return re.findall(r"[a-z0-9\-]+", normalize(text))
+
+
+def _tokens(text):
+    """Palabras y signos que separan cláusulas, en orden"""
+    return re.findall(r"[a-z0-9\-]+|[,.;:?!¿¡]", normalize(text))
+
+
+def _contains(text, phrase):
+    return re.search(rf"(?<![a-z0-9]){re.escape(phrase)}(?![a-z0-9])", text) is not None
+
+
+def _cue_positions(words, cue):
+    """Posiciones de las palabras donde empieza la palabra clave"""
+    parts = cue.split()
+    for i in range(len(words) - len(parts) + 1):
+        if words[i:i + len(parts)] == parts or (len(parts) == 1 and cue.isalpha() and words[i].startswith(cue)):
+            yield i
+
+
+def _negated(tokens, position):
+    """True si una negación de la misma cláusula precede a `position` (dentro de NEGATION_WINDOW)"""
+    for i in range(position - 1, max(-1, position - NEGATION_WINDOW - 1), -1):
+        if not tokens[i][0].isalnum():
+            return False
+        if tokens[i] in NEGATIONS and tokens[i + 1] not in NOT_NEGATING:
+            return True
+    return False
+
+
+def _base_forms(word):
+    """La palabra y su singular masculino ("medicas" → "medica", "medico")"""
+    forms = [word]
+    if word.endswith("s"):
+        forms += [word[:-1], word[:-2]]
+    forms += [form[:-1] + "o" for form in list(forms) if form.endswith("a")]
+    return forms
+
+
+class IntentRouter:
+    """Clasificador de intenciones con extracción de parámetros.
+
+    `maps` son los mapas que expone la app; `known_maps`, todos los del
+    juego (por defecto los mismos). Una ruta en un mapa conocido que la
+    app no expone no se responde en local.
+    """
+
+    def __init__(self, recipes, maps, translations=None, known_maps=None):
+        self.recipes = recipes
+        self.maps = maps
+        self.translations = translations or {}
+
+        # Nombre normalizado → id, probando primero los más largos
+        # ("advanced medkit" antes que "medkit")
+        self._recipe_names = sorted(
+            ((normalize(recipe["name"]), recipe_id) for recipe_id, recipe in recipes.items()),
+            key=lambda kv: -len(kv[0]),
+        )
+
+        self._types = {name.lower(): name for name in LOCATION_TYPES}
+        for word, target in list(self.translations.items()) + list(TYPE_ALIASES.items()):
+            canonical = self._types.get(target.lower())
+            if canonical:
+                self._types[word] = canonical
+
+        self._map_names = {}
+        for map_id, map_data in (maps if known_maps is None else {**known_maps, **maps}).items():
+            self._map_names[map_id.replace("-", " ")] = map_id
+            self._map_names[normalize(map_data["name"])] = map_id
+        self._map_names = dict(sorted(self._map_names.items(), key=lambda kv: -len(kv[0])))
+
+    def _translated(self, words):
+        return " ".join(self.translations.get(word, word) for word in words)
+
+    def recipe_slot(self, text):
+        """Id de la receta mencionada (también en español vía TRANS)"""
+        words = _words(text)
+        for candidate in (" ".join(words), self._translated(words)):
+            for name, recipe_id in self._recipe_names:
+                if _contains(candidate, name):
+                    return recipe_id
+        return None
+
+    def type_slot(self, text):
+        """Categoría de ubicación mencionada ("ARC", "electrical"...)"""
+        for word in _words(text):
+            for candidate in _base_forms(word):
+                if candidate in self._types:
+                    return self._types[candidate]
+        return None
+
+    def map_slot(self, text):
+        """Id del mapa mencionado"""
+        joined = " ".join(_words(text))
+        for name, map_id in self._map_names.items():
+            if _contains(joined, name):
+                return map_id
+        return None
+
+    def classify(self, text):
+        """Intent(nombre, parámetros) o None si la pregunta no es de las sencillas"""
+        words = _words(text)
+        if not words or len(words) > MAX_WORDS:
+            return None
+        tokens = _tokens(text)
+
+        def cued(cues):
+            # Las palabras clave negadas no cuentan
+            return any(not _negated(tokens, i) for cue in cues for i in _cue_positions(tokens, cue))
+
+        if cued(ROUTE_CUES):
+            target = self.type_slot(text)
+            map_id = self.map_slot(text)
+            if target and (map_id is None or map_id in self.maps):
+                return Intent("route", {"type": target, "map": map_id})
+            return None
+
+        if cued(BEST_MAP_CUES):
+            target = self.type_slot(text)
+            if target:
+                return Intent("best_map", {"type": target})
+            return None
+
+        if cued(RECIPE_CUES):
+            recipe_id = self.recipe_slot(text)
+            if recipe_id:
+                return Intent("recipe", {"recipe": recipe_id})
+        return None
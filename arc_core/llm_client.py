@@ -0,0 +1,301 @@
+"""
+Cliente de OpenAI compartido: asíncrono, con pool, reintentos y límites
+
+Un único AsyncOpenAI (un solo pool de conexiones keep-alive) vive en un
+event loop propio en un hilo de fondo y lo comparten todas las sesiones
+de Streamlit. Cada petición:
+
+- espera turno en un semáforo (máximo de peticiones en vuelo),
+- reintenta 408/409/429/5xx y errores de conexión con backoff
+  exponencial con jitter (respetando Retry-After si viene),
+- tiene un plazo total (deadline) que incluye la espera de turno, los
+  reintentos y, en los streams, la lectura de la respuesta completa.
+
+get_llm_client guarda como mucho MAX_CLIENTS clientes (uno por API key)
+y cierra el menos usado al pasarse, para que las keys que escriben los
+usuarios no dejen hilos, pools ni la propia key en memoria. Cerrar un
+cliente con peticiones en curso espera a que terminen, y un cliente
+cerrado que alguien aún conserva vuelve a abrir su loop al usarlo.
+
+Los scripts de Streamlit son síncronos: LLMClient expone
+chat.completions.create y responses.create con la misma forma que el
+cliente síncrono (los streams son iterables con close()), así que
+arc_core.streaming y las apps lo usan sin cambios. base_url (o la
+variable OPENAI_BASE_URL) permite apuntarlo a un servidor local de
+pruebas como mock_openai_server.py.
+"""
+
+import asyncio
+import functools
+import hashlib
+import queue
+import random
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import openai
+
+# Peticiones simultáneas a la API por proceso
+MAX_CONCURRENCY = 8
+# Timeout de cada intento (conexión / entre bytes) y plazo total
+REQUEST_TIMEOUT = 30.0
+DEADLINE = 90.0
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+RETRY_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+# Clientes (API keys distintas) abiertos a la vez por proceso
+MAX_CLIENTS = 4
+
+_END = object()
+
+
+def is_retryable(error):
+    """True si el error es temporal (rate limit, 5xx, red)"""
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRY_STATUS
+    return isinstance(error, openai.APIConnectionError)
+
+
+def retry_delay(attempt, error=None, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Espera antes del reintento `attempt` (0, 1, 2...): Retry-After o backoff con jitter"""
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            return min(cap, max(0.0, float(response.headers.get("retry-after"))))
+        except (TypeError, ValueError):
+            pass
+    return random.uniform(0.5, 1.0) * min(cap, base * 2 ** attempt)
+
+
+class DeadlineExceeded(TimeoutError):
+    """La petición no terminó dentro de su plazo total"""
+
+
+class _SyncStream:
+    """Stream asíncrono consumido desde código síncrono a través de una cola"""
+
+    def __init__(self, llm, loop, open_stream):
+        self._queue = queue.Queue()
+        self._future = asyncio.run_coroutine_threadsafe(self._pump(llm, open_stream), loop)
+        # El cliente sigue en uso hasta que el stream termina o se corta
+        self._future.add_done_callback(lambda _: llm._release())
+
+    async def _pump(self, llm, open_stream):
+        async def consume():
+            async with llm.slot():
+                stream = await llm.with_retries(open_stream)
+                try:
+                    async for event in stream:
+                        self._queue.put(event)
+                finally:
+                    await stream.close()
+
+        try:
+            await llm.within_deadline(consume())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._queue.put(e)
+        finally:
+            self._queue.put(_END)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = self._queue.get()
+        if item is _END:
+            self._queue.put(_END)
+            raise StopIteration
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def close(self):
+        """Corta el stream (cierra la conexión y libera el turno)"""
+        self._future.cancel()
+
+
+class LLMClient:
+    """Cliente compartido con pool, concurrencia acotada, reintentos y deadline"""
+
+    def __init__(self, api_key=None, base_url=None, max_concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT,
+                 deadline=DEADLINE, max_retries=MAX_RETRIES):
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.retries = 0
+        self._options = {"api_key": api_key, "base_url": base_url, "timeout": timeout}
+
+        # Llamadas síncronas en curso (incluidos streams sin terminar) y cierre pendiente
+        self._lock = threading.Lock()
+        self._users = 0
+        self._closing = False
+        self.loop = None
+        self._open()
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+        self.responses = SimpleNamespace(create=self._responses_create)
+
+    def _open(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="llm-client", daemon=True)
+        thread.start()
+
+        async def setup():
+            # Los reintentos los gestiona esta capa, no el SDK
+            client = openai.AsyncOpenAI(max_retries=0, **self._options)
+            return client, asyncio.Semaphore(self.max_concurrency)
+
+        self._client, self._semaphore = asyncio.run_coroutine_threadsafe(setup(), loop).result()
+        self.loop, self._thread = loop, thread
+
+    @property
+    def closed(self):
+        return self.loop is None
+
+    def _acquire(self):
+        """Loop en el que lanzar una llamada (reabierto si el cliente se cerró)"""
+        with self._lock:
+            if self.loop is None:
+                self._open()
+            self._users += 1
+            self._closing = False
+            return self.loop
+
+    def _release(self):
+        with self._lock:
+            self._users -= 1
+            pending_close = self._closing and not self._users
+        if pending_close:
+            if threading.current_thread() is self._thread:
+                # Desde el propio loop no se puede esperar a que se pare
+                threading.Thread(target=self.close, name="llm-client-close", daemon=True).start()
+            else:
+                self.close()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Turno en el semáforo de concurrencia"""
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    async def with_retries(self, make_call):
+        """Ejecuta make_call() con reintentos y dentro del plazo total"""
+        loop = asyncio.get_running_loop()
+        end = loop.time() + self.deadline
+        attempt = 0
+        while True:
+            remaining = end - loop.time()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"Sin respuesta en {self.deadline:.0f} s")
+            try:
+                return await asyncio.wait_for(make_call(), remaining)
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f"Sin respuesta en {self.deadline:.0f} s") from None
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = retry_delay(attempt, e)
+                if loop.time() + delay >= end:
+                    raise
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+    async def within_deadline(self, coro):
+        """Ejecuta coro entero (turno, reintentos y lectura) dentro del plazo total"""
+        try:
+            return await asyncio.wait_for(coro, self.deadline)
+        except DeadlineExceeded:
+            raise
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Sin respuesta en {self.deadline:.0f} s") from None
+
+    async def _call(self, make_call):
+        async def call():
+            async with self.slot():
+                return await self.with_retries(make_call)
+
+        return await self.within_deadline(call())
+
+    def _create(self, endpoint, kwargs):
+        loop = self._acquire()
+        try:
+            make_call = functools.partial(endpoint(self._client), **kwargs)
+            if kwargs.get("stream"):
+                stream = _SyncStream(self, loop, make_call)
+                loop = None
+                return stream
+            return asyncio.run_coroutine_threadsafe(self._call(make_call), loop).result()
+        finally:
+            # Los streams se liberan solos al terminar
+            if loop is not None:
+                self._release()
+
+    def _chat_create(self, **kwargs):
+        return self._create(lambda client: client.chat.completions.create, kwargs)
+
+    def _responses_create(self, **kwargs):
+        return self._create(lambda client: client.responses.create, kwargs)
+
+    def close(self):
+        """Cierra pool, loop e hilo; con llamadas en curso, al terminar la última"""
+        with self._lock:
+            if self._users:
+                self._closing = True
+                return
+            loop, thread, client = self.loop, self._thread, self._client
+            self.loop = None
+        if loop is None:
+            return
+
+        async def shutdown():
+            # Lo que quede (streams cortados a medias) se cancela antes de cerrar el pool
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await client.close()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+_clients = OrderedDict()
+_clients_lock = threading.Lock()
+
+
+def _client_key(api_key, base_url):
+    # La key no se guarda tal cual como clave del registro
+    return hashlib.sha256(f"{api_key}\0{base_url}".encode("utf-8")).hexdigest()
+
+
+def get_llm_client(api_key=None, base_url=None, max_clients=MAX_CLIENTS, **options):
+    """Cliente compartido por proceso para una API key / base_url (LRU de max_clients)"""
+    key = _client_key(api_key, base_url)
+    evicted = []
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = LLMClient(api_key, base_url, **options)
+        _clients.move_to_end(key)
+        # Se cierran los menos usados (los que tengan llamadas en curso, al
+        # terminarlas; si alguien aún los conserva, se reabren al usarlos)
+        while len(_clients) > max_clients:
+            evicted.append(_clients.popitem(last=False)[1])
+    for old in evicted:
+        old.close()
+    return client
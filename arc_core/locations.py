@@ -0,0 +1,106 @@
+"""
+Categorías de ubicación como flags de bits
+
+Cada categoría (residential, ARC, exodus, security...) es un bit. Un item
+tiene la máscara de su foundIn y cada POI la de sus types, así que
+"¿este item aparece en este POI?" es un solo AND. Las coincidencias
+item → POIs se precalculan por mapa para cada máscara distinta.
+"""
+
+import threading
+from functools import lru_cache
+
+# Las 13 categorías de foundIn/types conocidas (bit = posición)
+LOCATION_TYPES = (
+    "residential", "ARC", "commercial", "exodus", "security", "industrial", "mechanical",
+    "electrical", "nature", "medical", "old-world", "technological", "raider",
+)
+
+# Flags por nombre en minúsculas; las categorías nuevas reciben el siguiente bit
+LOCATION_FLAGS = {name.lower(): 1 << i for i, name in enumerate(LOCATION_TYPES)}
+_flags_lock = threading.Lock()
+
+
+def location_flag(name, create=True):
+    """Bit de una categoría (0 si no existe y create=False)"""
+    key = name.lower()
+    flag = LOCATION_FLAGS.get(key)
+    if flag is None:
+        if not create:
+            return 0
+        with _flags_lock:
+            flag = LOCATION_FLAGS.setdefault(key, 1 << len(LOCATION_FLAGS))
+    return flag
+
+
+@lru_cache(maxsize=1024)
+def _mask_of(types):
+    mask = 0
+    for name in types:
+        mask |= location_flag(name)
+    return mask
+
+
+def location_mask(types):
+    """Máscara de una lista de categorías (foundIn de item o types de POI)"""
+    return _mask_of(tuple(types or ()))
+
+
+def mask_types(mask):
+    """Nombres (en minúsculas) de los bits activos de una máscara"""
+    return [name for name, flag in list(LOCATION_FLAGS.items()) if mask & flag]
+
+
+class LocationMatcher:
+    """Cruce item → POIs por máscaras, precalculado por mapa"""
+
+    def __init__(self, maps, item_masks=()):
+        self.maps = maps
+        self._pois = {}
+        self._type_counts = {}
+        for map_id, map_data in maps.items():
+            pois = [(poi, location_mask(poi.get("types", []))) for poi in map_data.get("pois", [])]
+            self._pois[map_id] = pois
+            counts = {}
+            for _, mask in pois:
+                for name in mask_types(mask):
+                    counts[name] = counts.get(name, 0) + 1
+            self._type_counts[map_id] = counts
+
+        self._matches = {map_id: {} for map_id in maps}
+        for mask in set(item_masks):
+            for map_id in maps:
+                self._titles(map_id, mask)
+
+    def _titles(self, map_id, mask):
+        cache = self._matches.get(map_id)
+        if cache is None:
+            return []
+        titles = cache.get(mask)
+        if titles is None:
+            titles = cache[mask] = tuple(poi["title"] for poi, poi_mask in self._pois[map_id] if poi_mask & mask)
+        return titles
+
+    def locations(self, item, map_id):
+        """Títulos de los POIs del mapa donde puede aparecer el item"""
+        return list(self._titles(map_id, location_mask(item.get("foundIn", []))))
+
+    def locations_batch(self, items, map_id):
+        """locations() para una página de resultados completa"""
+        return [self.locations(item, map_id) for item in items]
+
+    def pois_of_type(self, map_id, target_type):
+        """POIs del mapa que tienen la categoría indicada"""
+        flag = location_flag(target_type, create=False)
+        return [poi for poi, mask in self._pois.get(map_id, []) if mask & flag]
+
+    def best_maps_for_type(self, target_type, map_ids=None):
+        """(nombre, nº de POIs, map_id) ordenados de más a menos POIs"""
+        key = target_type.lower()
+        results = []
+        for map_id in map_ids or self.maps:
+            count = self._type_counts.get(map_id, {}).get(key, 0)
+            if count > 0:
+                results.append((self.maps[map_id]["name"], count, map_id))
+        results.sort(key=lambda x: -x[1])
+        return results
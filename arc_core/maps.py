@@ -0,0 +1,160 @@
+"""
+Datos de los mapas: POIs reales con coordenadas y enlaces externos
+"""
+
+from .tiles import CDN_URL, TILE_SCHEMES
+
+# --- Datos de los mapas con POIs reales ---
+# URLs de tiles y zooms salen de TILE_SCHEMES (dam y spaceport usan {z}/{y}/{x})
+MAPS_DATA = {
+    "dam": {
+        "id": "dam",
+        "name": "Dam Battlegrounds",
+        "description": 'Alcantara Power Plant, or "The Dam", stands as a silent sentinel amidst a toxic, waterlogged land.',
+        **TILE_SCHEMES["dam"].map_fields(),
+        "width": 8192,
+        "height": 8192,
+        "thumbnail": f"{CDN_URL}/maps/dam/images/thumbnail.webp",
+        "pois": [
+            {"title": "Hydrophonic Dome Complex", "coords": [4010.5, 5237], "types": ["nature", "industrial", "security"]},
+            {"title": "Power Generation Complex", "coords": [5188, 5560], "types": ["industrial", "electrical"]},
+            {"title": "Water Treatment", "coords": [3306.5, 4091.5], "types": ["industrial", "mechanical"]},
+            {"title": "Testing Annex", "coords": [5144.51, 3091.49], "types": ["medical", "commercial"]},
+            {"title": "Research & Administration", "coords": [4357.53, 3744.5], "types": ["technological", "commercial"]},
+            {"title": "Control Tower", "coords": [4498.61, 3902.69], "types": ["technological", "security"]},
+            {"title": "Old Battlegrounds", "coords": [2616.3, 4816.27], "types": ["ARC"]},
+            {"title": "Primary Facility", "coords": [4201.96, 3898.38], "types": ["mechanical", "industrial"]},
+            {"title": "Electrical Substation", "coords": [3306.43, 3368.12], "types": ["electrical"]},
+            {"title": "Pale Apartments", "coords": [2673.34, 5513.91], "types": ["residential"]},
+            {"title": "Ruby Residence", "coords": [3181.13, 5864.72], "types": ["residential"]},
+            {"title": "Pattern House", "coords": [4957.21, 6141.13], "types": ["residential"]},
+            {"title": "South Swamp Outpost", "coords": [2454.58, 3978.27], "types": []},
+            {"title": "Water Towers", "coords": [2854, 3017.96], "types": []},
+            {"title": "Formicai Outpost", "coords": [4040, 2125.5], "types": []},
+            {"title": "Electrical Tower", "coords": [5740.5, 3087], "types": []},
+            {"title": "East Broken Bridge", "coords": [6157.04, 5228.68], "types": []},
+            {"title": "Raider Outpost East", "coords": [5815.64, 5583.54], "types": []},
+            {"title": "Pipeline Tower", "coords": [5186.65, 5045.37], "types": []},
+            {"title": "The Breach", "coords": [4735.93, 4789.73], "types": []},
+            {"title": "Red Lakes Balcony", "coords": [5077.73, 3439.54], "types": []},
+            {"title": "Small Creek", "coords": [4240.71, 3244.9], "types": []},
+            {"title": "Wreckage", "coords": [4476.18, 2681.21], "types": []},
+            {"title": "Scrap Yard", "coords": [4050.31, 2731.08], "types": ["mechanical", "industrial"]},
+        ]
+    },
+    "spaceport": {
+        "id": "spaceport",
+        "name": "The Spaceport",
+        "description": "Acerra Spaceport is a majestic testament to humanity's past ambitions.",
+        **TILE_SCHEMES["spaceport"].map_fields(),
+        "width": 8192,
+        "height": 8192,
+        "thumbnail": f"{CDN_URL}/maps/spaceport/images/thumbnail.webp",
+        "pois": [
+            {"title": "Departure Building", "coords": [3252.48, 4490], "types": ["commercial", "technological"]},
+            {"title": "Launch Towers", "coords": [3902.98, 4612.49], "types": ["technological", "security"]},
+            {"title": "Arrival Building", "coords": [3259.76, 5296.4], "types": ["commercial", "technological"]},
+            {"title": "Shipping Warehouse", "coords": [3680.6, 5760.07], "types": ["industrial", "mechanical"]},
+            {"title": "North Trench Tower", "coords": [4479.74, 5793.37], "types": ["technological"]},
+            {"title": "South Trench Tower", "coords": [4344.91, 5627.27], "types": ["technological"]},
+            {"title": "Rocket Assembly", "coords": [5019, 4614], "types": ["ARC", "industrial"]},
+            {"title": "Fuel Control", "coords": [4788.91, 4901.57], "types": ["mechanical", "electrical"]},
+            {"title": "Container Storage", "coords": [4788.06, 3639.39], "types": ["industrial", "mechanical"]},
+            {"title": "Vehicle Maintenance", "coords": [4216.93, 3458.96], "types": ["mechanical", "industrial"]},
+            {"title": "Control Tower A6", "coords": [4194.39, 3838.68], "types": ["technological", "commercial"]},
+            {"title": "East Plains Warehouse", "coords": [5842.82, 4453.53], "types": []},
+            {"title": "Little Hangar", "coords": [5396.87, 5252.23], "types": []},
+            {"title": "The Trench", "coords": [4604.75, 5464.13], "types": []},
+            {"title": "Maintenance Hangar", "coords": [3777.31, 2707.67], "types": []},
+            {"title": "Staff Parking", "coords": [4539.16, 2386.45], "types": []},
+            {"title": "Communications Tower", "coords": [5938.41, 3353.48], "types": []},
+        ]
+    },
+    "buried-city": {
+        "id": "buried-city",
+        "name": "Buried City",
+        "description": "Amidst the sand dunes in this arid wasteland you will find a remnant of the old world.",
+        **TILE_SCHEMES["buried-city"].map_fields(),
+        "width": 8192,
+        "height": 8192,
+        "thumbnail": f"{CDN_URL}/maps/buried-city-v3/images/thumbnail.webp",
+        "pois": [
+            {"title": "Library", "coords": [3614.87, 5390.1], "types": ["commercial", "old-world"]},
+            {"title": "Hospital", "coords": [4242.34, 5901.56], "types": ["medical"]},
+            {"title": "Parking Garage", "coords": [4533.58, 5248.26], "types": ["mechanical"]},
+            {"title": "Galleria", "coords": [5213.82, 5297.44], "types": ["commercial"]},
+            {"title": "Space Travel", "coords": [4819.81, 4889.46], "types": ["commercial", "technological"]},
+            {"title": "Research", "coords": [4606.72, 4740.12], "types": ["medical", "technological"]},
+            {"title": "Town Hall", "coords": [4560.34, 3891.2], "types": ["old-world"]},
+            {"title": "Marano Park", "coords": [4083.82, 4574.24], "types": ["nature"]},
+            {"title": "Plaza Rosa", "coords": [4240.89, 2325.54], "types": ["medical", "commercial"]},
+            {"title": "Grandioso Apartments", "coords": [2556.38, 3031.45], "types": ["residential"]},
+            {"title": "Santa Maria Houses", "coords": [4026.6, 3066.62], "types": ["residential", "old-world"]},
+            {"title": "Outskirts", "coords": [2215.52, 5096.41], "types": ["industrial", "mechanical"]},
+            {"title": "Red Tower", "coords": [4908.03, 2672.32], "types": ["residential"]},
+            {"title": "Church Ruins", "coords": [6104, 1932], "types": []},
+            {"title": "Corso Da Vinci", "coords": [4056, 3458], "types": []},
+        ]
+    },
+    "blue-gate": {
+        "id": "blue-gate",
+        "name": "Blue Gate",
+        "description": "Once a steadfast symbol of defiant connection, the Blue Gate now serves as a daunting entryway.",
+        **TILE_SCHEMES["blue-gate"].map_fields(),
+        "width": 8192,
+        "height": 8192,
+        "thumbnail": f"{CDN_URL}/maps/blue-gate/images/thumbnail.webp",
+        "pois": [
+            {"title": "Trapper's Glade", "coords": [2568.2, 4785.13], "types": ["nature"]},
+            {"title": "Raider's Refuge", "coords": [2574.96, 5131.62], "types": ["residential"]},
+            {"title": "Adorned Wreckage", "coords": [2250.73, 4435.1], "types": ["mechanical", "industrial"]},
+            {"title": "Village", "coords": [3266.64, 5617.17], "types": ["commercial", "residential"]},
+            {"title": "Checkpoint", "coords": [3857, 4344.71], "types": ["mechanical"]},
+            {"title": "Warehouse Complex", "coords": [4776.99, 4668.93], "types": ["industrial"]},
+            {"title": "Gate Control Room", "coords": [4550.03, 4455.48], "types": []},
+            {"title": "Reinforced Reception", "coords": [4025.86, 5332.24], "types": ["security", "technological"]},
+            {"title": "Ancient Fort", "coords": [4159.61, 2534.44], "types": ["old-world", "technological"]},
+            {"title": "Barren Clearing", "coords": [2010.27, 5384.93], "types": ["ARC"]},
+        ]
+    },
+    "stella-montis": {
+        "id": "stella-montis",
+        "name": "Stella Montis",
+        "description": "A secluded research facility amidst snow-draped peaks.",
+        "layers": [
+            {
+                "id": "stella-montis-l2",
+                "name": "Top Section",
+                "tileUrl": TILE_SCHEMES["stella-montis-l2"].template(),
+            },
+            {
+                "id": "stella-montis-l1", 
+                "name": "Bottom Section",
+                "tileUrl": TILE_SCHEMES["stella-montis-l1"].template(),
+            }
+        ],
+        "width": 8192,
+        "height": 8192,
+        **TILE_SCHEMES["stella-montis-l2"].zoom_fields(),
+        "thumbnail": f"{CDN_URL}/maps/stella-montis/images/thumbnail-v2.webp",
+        "pois": [
+            {"title": "Seed Vault", "coords": [6306, 950], "types": ["industrial", "technological"]},
+            {"title": "Sandbox", "coords": [3719.38, 3850.36], "types": ["mechanical", "technological"]},
+            {"title": "Loading Bay", "coords": [1985.56, 4104.92], "types": ["industrial"]},
+            {"title": "Assembly Workshops", "coords": [2435.5, 6270.24], "types": ["technological"]},
+            {"title": "Business Center", "coords": [6029.23, 4766.19], "types": ["exodus", "commercial"]},
+            {"title": "Cultural Archives", "coords": [6443.12, 3844.26], "types": ["old-world"]},
+            {"title": "Medical Research", "coords": [1557.34, 3815.98], "types": ["medical", "technological"]},
+        ]
+    }
+}
+
+# Mapas con versión en MapGenie
+MAP_URLS = {
+    "dam": "https://mapgenie.io/arc-raiders/maps/dam-battlegrounds",
+    "spaceport": "https://mapgenie.io/arc-raiders/maps/the-spaceport",
+    "buried-city": "https://mapgenie.io/arc-raiders/maps/buried-city"
+}
+
+# Mapas con página en MapGenie: los que muestran las apps de chat
+MAPGENIE_MAPS = {map_id: MAPS_DATA[map_id] for map_id in MAP_URLS}
@@ -0,0 +1,73 @@
+"""
+Marcadores del mapa de Leaflet para static/map_markers.js
+
+marker_payload() serializa los POIs de un mapa y los marcadores
+personalizados por columnas, con sus clusters por zoom; markers_json()
+lo deja listo para incrustarlo en un <script> del HTML del mapa. El
+cargador (static/map_markers.js) es el mismo para todos los mapas:
+Streamlit lo sirve como archivo (server.enableStaticServing) y el
+navegador lo guarda aparte en vez de recibirlo dentro de cada
+documento; sin servir estáticos se incrusta como antes.
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+from .data import BASE_DIR
+from .spatial import cluster_levels, to_leaflet
+
+MARKERS_JS = os.path.join(BASE_DIR, "static", "map_markers.js")
+# Ruta en la que Streamlit sirve la carpeta static/ junto a la app
+STATIC_URL = "app/static"
+# Color de los POIs sin un color propio para su tipo
+DEFAULT_COLOR = "#FFFFFF"
+
+
+def marker_payload(map_data, custom_markers=None, colors=None):
+    """Marcadores por columnas (coordenadas planas para un Float64Array) con sus clusters por zoom.
+
+    colors: {tipo: color} con la clave "default"; el de cada POI es el de su primer tipo.
+    """
+    colors = colors or {"default": DEFAULT_COLOR}
+    palette = list(dict.fromkeys(colors.values()))
+    pois = map_data.get("pois", [])
+    custom_markers = custom_markers or []
+    coords = [poi["coords"][:2] for poi in pois] + [[m.get("x", 4096), m.get("y", 4096)] for m in custom_markers]
+    lats, lngs = to_leaflet(coords, map_data["width"])
+    lats, lngs = lats.round(3), lngs.round(3)
+
+    def color_index(types):
+        return palette.index(colors.get(types[0], colors["default"]) if types else colors["default"])
+
+    return {
+        "coords": [value for pair in zip(lats.tolist(), lngs.tolist()) for value in pair],
+        "kind": [0] * len(pois) + [1] * len(custom_markers),
+        "color": [color_index(poi.get("types", [])) for poi in pois] + [0] * len(custom_markers),
+        "palette": palette,
+        "title": [poi["title"] for poi in pois] + [m.get("name", "Custom") for m in custom_markers],
+        "detail": [", ".join(poi["types"]) if poi.get("types") else "Location" for poi in pois]
+                  + [m.get("notes", "") for m in custom_markers],
+        "clusters": cluster_levels(lats, lngs, map_data["minZoom"], map_data["maxZoom"]),
+    }
+
+
+def markers_json(payload):
+    """JSON para un <script>: sin "<" literal, así que ningún texto cierra la etiqueta ni abre un comentario"""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).replace("<", "\\u003c")
+
+
+@lru_cache(maxsize=1)
+def loader_source():
+    """Código de static/map_markers.js"""
+    with open(MARKERS_JS, encoding="utf-8") as f:
+        return f.read()
+
+
+def loader_tag(static_serving, base=STATIC_URL):
+    """<script> del cargador: por URL (con la versión del contenido) o en línea"""
+    if static_serving:
+        version = hashlib.sha256(loader_source().encode("utf-8")).hexdigest()[:12]
+        return f'<script src="{base}/map_markers.js?v={version}"></script>'
+    return f"<script>{loader_source()}</script>"
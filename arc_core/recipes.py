@@ -0,0 +1,55 @@
+"""
+Recetas de crafteo conocidas
+"""
+
+# Sistema de Crafteo - Recetas conocidas
+RECIPES = {
+    "bandage": {
+        "name": "Bandage",
+        "materials": [("Cloth", 2)],
+        "category": "medical",
+        "description": "Cura heridas menores"
+    },
+    "medkit": {
+        "name": "Medkit", 
+        "materials": [("Bandage", 2), ("Chemical", 1)],
+        "category": "medical",
+        "description": "Restaura una cantidad moderada de salud"
+    },
+    "advanced_medkit": {
+        "name": "Advanced Medkit",
+        "materials": [("Medkit", 1), ("Advanced Medical Components", 1)],
+        "category": "medical",
+        "description": "Restaura gran cantidad de salud"
+    },
+    "basic_electrical_components": {
+        "name": "Basic Electrical Components",
+        "materials": [("Cable", 2), ("Battery", 1)],
+        "category": "electrical",
+        "description": "Componente básico para crafting eléctrico"
+    },
+    "basic_mechanical_components": {
+        "name": "Basic Mechanical Components",
+        "materials": [("Scrap Metal", 2), ("Adhesive", 1)],
+        "category": "mechanical",
+        "description": "Componente básico para crafting mecánico"
+    },
+    "shield_booster": {
+        "name": "Shield Booster",
+        "materials": [("Basic Electrical Components", 2), ("ARC Powercell", 1)],
+        "category": "utility",
+        "description": "Aumenta la regeneración de escudo temporalmente"
+    },
+    "stamina_booster": {
+        "name": "Stamina Booster",
+        "materials": [("Agave", 2), ("Chemical", 1)],
+        "category": "utility",
+        "description": "Aumenta la regeneración de stamina"
+    },
+    "emp_grenade": {
+        "name": "EMP Grenade",
+        "materials": [("Advanced Electrical Components", 1), ("Battery", 2), ("Explosive", 1)],
+        "category": "weapon",
+        "description": "Desactiva robots y drones temporalmente"
+    },
+}
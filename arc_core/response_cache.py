@@ -0,0 +1,124 @@
+"""
+Caché persistente de respuestas de la IA
+
+La clave es la pregunta normalizada + el mapa actual + un hash del
+contexto del sistema, así que cambiar los datos del juego invalida
+las respuestas viejas sin borrar nada a mano. Se guarda en SQLite
+(sobrevive a reinicios y se comparte entre sesiones), con caducidad
+por TTL y expulsión LRU cuando se supera el número máximo de entradas.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from .data import BASE_DIR
+from .search import normalize
+
+CACHE_FILE = os.path.join(BASE_DIR, "ai_cache.sqlite3")
+
+# Una semana; las respuestas dependen del contexto, no de la fecha
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 2000
+
+
+def normalize_question(text):
+    """Pregunta sin acentos, mayúsculas, signos ni espacios repetidos"""
+    text = normalize(text)
+    text = re.sub(r"[¿?¡!.,;:\"'()]+", " ", text)
+    return " ".join(text.split())
+
+
+def context_hash(context):
+    """Hash corto del contexto del sistema"""
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """Respuestas de la IA en SQLite con TTL, LRU y contadores de aciertos"""
+
+    def __init__(self, path=CACHE_FILE, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Streamlit atiende cada sesión en su propio hilo
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    question TEXT NOT NULL,
+                    map_id TEXT NOT NULL,
+                    context TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    @staticmethod
+    def make_key(question, map_id, context_digest):
+        raw = "\0".join((normalize_question(question), map_id or "", context_digest))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, question, map_id, context_digest):
+        """Respuesta guardada o None (cuenta acierto / fallo)"""
+        key = self.make_key(question, map_id, context_digest)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, question, map_id, context_digest, response):
+        """Guarda una respuesta y expulsa las menos usadas si sobran"""
+        key = self.make_key(question, map_id, context_digest)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_question(question), map_id or "", context_digest, response, now, now),
+            )
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self._conn.execute(
+                """DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self):
+        """Aciertos, fallos, tasa de acierto y entradas guardadas"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
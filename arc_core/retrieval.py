@@ -0,0 +1,179 @@
+"""
+Recuperación local (BM25) de items, recetas y POIs para el contexto de la IA
+
+En lugar de mandar siempre los mismos items, cada mensaje recupera los
+documentos más relevantes de items_data.json, RECIPES y MAPS con BM25
+sobre un índice invertido construido una vez. Funciona sin red y sin
+dependencias: tokens sin acentos, sin palabras vacías, con plurales
+simples recortados y las consultas traducidas con TRANS (ES → EN).
+"""
+
+import math
+import re
+
+from .search import normalize
+
+# Parámetros estándar de BM25
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Cuántos documentos de cada tipo entran en el contexto por defecto
+TOP_ITEMS = 8
+TOP_RECIPES = 3
+TOP_POIS = 6
+
+# Repeticiones de cada campo en el documento (el nombre pesa más)
+NAME_BOOST = 3
+
+STOPWORDS = frozenset("""
+a al algo algun alguna alguno como con cual cuales cuando de del donde el en es esta este esto hay
+la las lo los mas me mi mejor necesito para pero por puedo que quien se si sin sobre su sus te tu un
+una uno unos y ya
+an and are can do does for from how i in is it of on or the to what where which with you
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _stem(token):
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Tokens normalizados de un texto (sin palabras vacías)"""
+    return [_stem(tok) for tok in _TOKEN_RE.findall(normalize(text or "")) if tok not in STOPWORDS]
+
+
+class BM25Index:
+    """Índice invertido con puntuación BM25 sobre listas de tokens"""
+
+    def __init__(self, documents, k1=BM25_K1, b=BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.size = len(documents)
+        self._lengths = [len(doc) for doc in documents]
+        self._avg_length = sum(self._lengths) / self.size if self.size else 0.0
+        self._postings = {}
+        for doc_id, doc in enumerate(documents):
+            counts = {}
+            for token in doc:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                self._postings.setdefault(token, []).append((doc_id, tf))
+        self._idf = {
+            token: math.log(1 + (self.size - len(posting) + 0.5) / (len(posting) + 0.5))
+            for token, posting in self._postings.items()
+        }
+
+    def scores(self, tokens):
+        """{doc_id: puntuación} para los documentos con algún token"""
+        scores = {}
+        avg = self._avg_length or 1.0
+        for token in set(tokens):
+            idf = self._idf.get(token)
+            if idf is None:
+                continue
+            for doc_id, tf in self._postings[token]:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def top(self, tokens, limit):
+        """[(doc_id, puntuación)] de mayor a menor (empates por orden de alta)"""
+        ranked = sorted(self.scores(tokens).items(), key=lambda kv: (-kv[1], kv[0]))
+        return ranked[:limit]
+
+
+class ContextRetriever:
+    """Items, recetas y POIs relevantes para un mensaje"""
+
+    def __init__(self, items, recipes, maps, translations=None):
+        self.items = items
+        self.recipes = recipes
+        self.maps = maps
+        self.translations = translations or {}
+
+        columns = {}
+        for field in ("name", "description", "type", "rarity", "foundIn"):
+            if hasattr(items, "column"):
+                columns[field] = items.column(field)
+            else:
+                columns[field] = [item.get(field) for item in items]
+        item_docs = []
+        for idx in range(len(items)):
+            text = " ".join(
+                [columns["name"][idx] or ""] * NAME_BOOST
+                + [columns["type"][idx] or "", columns["rarity"][idx] or "", columns["description"][idx] or ""]
+                + list(columns["foundIn"][idx] or [])
+            )
+            item_docs.append(tokenize(text))
+        self._items = BM25Index(item_docs)
+
+        self._recipe_ids = list(recipes)
+        self._recipes = BM25Index([
+            tokenize(" ".join(
+                [recipe["name"]] * NAME_BOOST
+                + [name for name, _ in recipe["materials"]]
+                + [recipe.get("category", ""), recipe.get("description", "")]
+            ))
+            for recipe in recipes.values()
+        ])
+
+        self._pois = []
+        poi_docs = []
+        for map_id, map_data in maps.items():
+            for poi in map_data.get("pois", []):
+                self._pois.append((map_id, poi))
+                poi_docs.append(tokenize(" ".join(
+                    [poi["title"]] * NAME_BOOST + list(poi.get("types", [])) + [map_data["name"]]
+                )))
+        self._poi_index = BM25Index(poi_docs)
+
+    def query_tokens(self, text):
+        """Tokens de la consulta más sus traducciones ES → EN"""
+        tokens = []
+        for word in normalize(text or "").split():
+            word = word.strip("¿?¡!.,;:\"'()")
+            translated = self.translations.get(word) or self.translations.get(_stem(word))
+            if translated:
+                tokens.extend(tokenize(translated))
+            tokens.extend(tokenize(word))
+        return tokens
+
+    def retrieve(self, text, items=TOP_ITEMS, recipes=TOP_RECIPES, pois=TOP_POIS):
+        """{"items": [...], "recipes": [(id, receta)], "pois": [(map_id, poi)]}"""
+        tokens = self.query_tokens(text)
+        return {
+            "items": [self.items[idx] for idx, _ in self._items.top(tokens, items)],
+            "recipes": [(self._recipe_ids[idx], self.recipes[self._recipe_ids[idx]])
+                        for idx, _ in self._recipes.top(tokens, recipes)],
+            "pois": [self._pois[idx] for idx, _ in self._poi_index.top(tokens, pois)],
+        }
+
+    def format_context(self, text, **limits):
+        """Bloque de texto con los datos recuperados ("" si no hay nada relevante)"""
+        found = self.retrieve(text, **limits)
+        sections = []
+        if found["items"]:
+            lines = []
+            for item in found["items"]:
+                where = ", ".join(item.get("foundIn") or []) or "unknown"
+                lines.append(f"- {item['name']} ({item.get('rarity') or 'common'}, {item.get('type') or '?'}): {where}")
+            sections.append("ITEMS RELEVANTES:\n" + "\n".join(lines))
+        if found["recipes"]:
+            lines = []
+            for _, recipe in found["recipes"]:
+                mats = ", ".join(f"{q}x {n}" for n, q in recipe["materials"])
+                lines.append(f"- {recipe['name']}: necesita {mats}")
+            sections.append("RECETAS RELEVANTES:\n" + "\n".join(lines))
+        if found["pois"]:
+            lines = []
+            for map_id, poi in found["pois"]:
+                types = ", ".join(poi.get("types", [])) or "sin tipo"
+                lines.append(f"- {poi['title']} ({self.maps[map_id]['name']}): {types}")
+            sections.append("UBICACIONES RELEVANTES:\n" + "\n".join(lines))
+        return "\n\n".join(sections)
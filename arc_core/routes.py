@@ -0,0 +1,203 @@
+"""
+Rutas de farmeo sobre las coordenadas reales de los POIs
+
+La ruta es un camino abierto que visita todos los POIs pedidos, con
+inicio y final opcionales (spawn / extracción). Para pocos POIs se
+resuelve de forma exacta con Held-Karp; para más se parte del mejor
+vecino más cercano y se mejora con 2-opt y Or-opt hasta que no quede
+ningún movimiento que acorte la ruta. Las matrices de distancias salen
+del índice espacial del mapa (NumPy, calculadas una vez); los solvers
+trabajan sobre la submatriz de los POIs elegidos convertida a listas.
+"""
+
+import numpy as np
+
+from .locations import location_flag
+from .spatial import SpatialIndex
+
+# Hasta cuántos POIs se usa la solución exacta (2^n · n² operaciones)
+EXACT_LIMIT = 12
+
+
+def path_length(matrix, order):
+    return sum(matrix[a][b] for a, b in zip(order, order[1:]))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SOLVERS SOBRE UNA MATRIZ (nodo 0 = inicio, nodo n-1 = final)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def solve_exact(matrix):
+    """Held-Karp: orden óptimo de los nodos interiores entre 0 y n-1"""
+    n = len(matrix) - 2
+    if n <= 0:
+        return []
+    end = n + 1
+    full = (1 << n) - 1
+    inf = float("inf")
+
+    # dp[mask][j]: coste mínimo saliendo de 0, visitando mask y acabando en j
+    dp = [[inf] * n for _ in range(1 << n)]
+    parent = [[-1] * n for _ in range(1 << n)]
+    for j in range(n):
+        dp[1 << j][j] = matrix[0][j + 1]
+
+    for mask in range(1, 1 << n):
+        row = dp[mask]
+        for j in range(n):
+            cost = row[j]
+            if cost == inf or not mask >> j & 1:
+                continue
+            dist_j = matrix[j + 1]
+            for k in range(n):
+                if mask >> k & 1:
+                    continue
+                nxt = mask | 1 << k
+                new_cost = cost + dist_j[k + 1]
+                if new_cost < dp[nxt][k]:
+                    dp[nxt][k] = new_cost
+                    parent[nxt][k] = j
+
+    last = min(range(n), key=lambda j: dp[full][j] + matrix[j + 1][end])
+    order = []
+    mask = full
+    while last != -1:
+        order.append(last + 1)
+        mask, last = mask ^ (1 << last), parent[mask][last]
+    return order[::-1]
+
+
+def _nearest_neighbour(matrix, first):
+    n = len(matrix) - 2
+    order = [first]
+    remaining = set(range(1, n + 1)) - {first}
+    while remaining:
+        row = matrix[order[-1]]
+        nxt = min(remaining, key=lambda k: (row[k], k))
+        order.append(nxt)
+        remaining.remove(nxt)
+    return order
+
+
+def _two_opt(matrix, seq):
+    """Invierte tramos mientras acorte la ruta (extremos fijos)"""
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(seq) - 2):
+            a, b = seq[i - 1], seq[i]
+            for k in range(i + 1, len(seq) - 1):
+                c, d = seq[k], seq[k + 1]
+                delta = matrix[a][c] + matrix[b][d] - matrix[a][b] - matrix[c][d]
+                if delta < -1e-9:
+                    seq[i:k + 1] = seq[i:k + 1][::-1]
+                    b = seq[i]
+                    improved = True
+    return seq
+
+
+def _or_opt(matrix, seq):
+    """Mueve tramos de 1 a 3 POIs (opcionalmente invertidos) a otra posición"""
+    improved = False
+    for length in (1, 2, 3):
+        i = 1
+        while i + length < len(seq):
+            seg = seq[i:i + length]
+            prev, nxt = seq[i - 1], seq[i + length]
+            removed = matrix[prev][seg[0]] + matrix[seg[-1]][nxt] - matrix[prev][nxt]
+            best = None
+            rest = seq[:i] + seq[i + length:]
+            for j in range(len(rest) - 1):
+                a, b = rest[j], rest[j + 1]
+                for cand in (seg, seg[::-1]):
+                    added = matrix[a][cand[0]] + matrix[cand[-1]][b] - matrix[a][b]
+                    if added - removed < -1e-9 and (best is None or added < best[0]):
+                        best = (added, j, cand)
+            if best:
+                _, j, cand = best
+                seq[:] = rest[:j + 1] + cand + rest[j + 1:]
+                improved = True
+            else:
+                i += 1
+    return improved
+
+
+def solve_heuristic(matrix):
+    """Vecino más cercano (mejor punto de partida) + 2-opt + Or-opt"""
+    n = len(matrix) - 2
+    if n <= 0:
+        return []
+    end = n + 1
+    best = None
+    for first in range(1, n + 1):
+        seq = [0] + _nearest_neighbour(matrix, first) + [end]
+        length = path_length(matrix, seq)
+        if best is None or length < best[0]:
+            best = (length, seq)
+
+    seq = best[1]
+    while True:
+        _two_opt(matrix, seq)
+        if not _or_opt(matrix, seq):
+            break
+    return seq[1:-1]
+
+
+def solve_path(matrix):
+    """Orden de los nodos 1..n-2 entre el inicio (0) y el final (n-1)"""
+    if len(matrix) - 2 <= EXACT_LIMIT:
+        return solve_exact(matrix)
+    return solve_heuristic(matrix)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PLANIFICADOR POR MAPA
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class RoutePlanner:
+    """Rutas por mapa sobre las matrices de distancias del índice espacial"""
+
+    def __init__(self, maps, spatial=None):
+        self.maps = maps
+        self.spatial = SpatialIndex(maps) if spatial is None else spatial
+
+    def distance_matrix(self, map_id):
+        """(pois, matriz de distancias NumPy) del mapa, calculada una sola vez"""
+        index = self.spatial[map_id]
+        return index.pois, index.distances
+
+    def plan(self, map_id, target_types, start=None, end=None):
+        """Ruta por los POIs de los tipos pedidos.
+
+        target_types: un tipo o lista de tipos (un POI vale si tiene alguno).
+        start / end: coordenadas [x, y] de spawn y extracción, o None para
+        dejar ese extremo libre. Devuelve (pois en orden, longitud).
+        """
+        if isinstance(target_types, str):
+            target_types = [target_types]
+        wanted = 0
+        for name in target_types:
+            wanted |= location_flag(name, create=False)
+
+        index = self.spatial[map_id]
+        picked = index.type_indices(wanted)
+        if not len(picked):
+            return [], 0.0
+
+        # Submatriz con nodo virtual de inicio (0) y de final (n+1);
+        # un extremo libre está a distancia 0 de todos los POIs
+        size = len(picked) + 2
+        matrix = np.zeros((size, size))
+        matrix[1:-1, 1:-1] = index.distances[np.ix_(picked, picked)]
+        coords = index.coords[picked]
+        if start is not None:
+            matrix[0, 1:-1] = np.hypot(*(coords - np.asarray(start[:2], dtype=np.float64)).T)
+        if end is not None:
+            matrix[1:-1, -1] = np.hypot(*(coords - np.asarray(end[:2], dtype=np.float64)).T)
+        if start is not None and end is not None:
+            matrix[0, -1] = np.hypot(start[0] - end[0], start[1] - end[1])
+
+        # Los solvers leen celdas sueltas: con listas es más rápido que con NumPy
+        order = solve_path(matrix.tolist())
+        length = float(matrix[[0] + order, order + [size - 1]].sum())
+        return [index.pois[picked[k - 1]] for k in order], length
@@ -0,0 +1,117 @@
+"""
+Índice invertido de n-gramas para la búsqueda de items
+"""
+
+import heapq
+from functools import lru_cache
+
+# Peso de cada campo en la puntuación
+FIELD_WEIGHTS = {"name": 10, "description": 3, "type": 5}
+
+# Longitud máxima de los n-gramas indexados
+GRAM_SIZE = 3
+
+
+def normalize(text):
+    text = text.lower().strip()
+    for a, b in [('á','a'),('é','e'),('í','i'),('ó','o'),('ú','u'),('ñ','n')]:
+        text = text.replace(a, b)
+    return text
+
+
+def _grams(text, n):
+    """Conjunto de n-gramas de longitud n de un texto"""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class ItemSearchIndex:
+    """Índice invertido sobre los campos de texto de los items.
+
+    Cada campo guarda sus n-gramas de 1 a GRAM_SIZE caracteres. Un término
+    corto se resuelve con una sola lista de postings; uno largo intersecta
+    las listas de sus n-gramas (de menor a mayor) y verifica la subcadena
+    solo sobre los candidatos. El resultado es el mismo que el recorrido
+    lineal por subcadenas, sin tocar los items que no pueden coincidir.
+    """
+
+    def __init__(self, items, translations=None, weights=None, gram_size=GRAM_SIZE):
+        # Un snapshot se usa tal cual: los items se materializan al devolverlos
+        self.items = items if hasattr(items, "column") else list(items)
+        self.translations = translations or {}
+        self.weights = dict(weights or FIELD_WEIGHTS)
+        self.gram_size = gram_size
+        self._texts = {}
+        self._postings = {}
+
+        for field in self.weights:
+            if hasattr(self.items, "column"):
+                values = self.items.column(field)
+            else:
+                values = [item.get(field) for item in self.items]
+            texts = [str(value or "").lower() for value in values]
+            postings = {}
+            for idx, text in enumerate(texts):
+                for n in range(1, gram_size + 1):
+                    for gram in _grams(text, n):
+                        postings.setdefault(gram, set()).add(idx)
+            self._texts[field] = texts
+            self._postings[field] = postings
+
+        self._match = lru_cache(maxsize=4096)(self._match_term)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _match_term(self, term, field):
+        """Índices de los items cuyo campo contiene el término"""
+        if not term:
+            return frozenset(range(len(self.items)))
+
+        postings = self._postings[field]
+        if len(term) <= self.gram_size:
+            return frozenset(postings.get(term, ()))
+
+        lists = []
+        for gram in _grams(term, self.gram_size):
+            posting = postings.get(gram)
+            if not posting:
+                return frozenset()
+            lists.append(posting)
+        lists.sort(key=len)
+
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            candidates &= posting
+            if not candidates:
+                return frozenset()
+
+        texts = self._texts[field]
+        return frozenset(idx for idx in candidates if term in texts[idx])
+
+    def expand_query(self, query):
+        """Términos de búsqueda: consulta completa, palabras y traducciones"""
+        q = normalize(query)
+        terms = {q}
+
+        if q in self.translations:
+            terms.add(self.translations[q])
+        for word in q.split():
+            if word in self.translations:
+                terms.add(self.translations[word])
+            terms.add(word)
+        return terms
+
+    def score(self, query):
+        """Puntuación por índice de item para una consulta"""
+        scores = {}
+        for term in self.expand_query(query):
+            for field, weight in self.weights.items():
+                for idx in self._match(term, field):
+                    scores[idx] = scores.get(idx, 0) + weight
+        return scores
+
+    def search(self, query, limit=10):
+        """Top-k items por puntuación (empates en orden de la base de datos)"""
+        scores = self.score(query)
+        best = heapq.nsmallest(limit, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [self.items[idx] for idx, _ in best]
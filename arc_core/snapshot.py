@@ -0,0 +1,347 @@
+"""
+Snapshot binario y columnar de items_data.json
+
+El JSON se compila una vez (paso de build) a un archivo que se abre con
+mmap: cadenas internadas en una tabla única, rareza y tipo como enums,
+foundIn como lista compacta + máscara de bits, y cada campo en su propia
+columna. Abrirlo no parsea nada salvo una cabecera pequeña; los procesos
+que lo abren comparten las mismas páginas del sistema operativo y los
+diccionarios de cada item se construyen solo cuando se piden.
+
+Se genera con build_snapshot.py.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+MAGIC = b"ARCSNAP1"
+VERSION = 1
+ALIGN = 8
+
+# Orden de las claves al reconstruir cada item
+FIELD_ORDER = ("id", "name", "description", "rarity", "type", "foundIn", "value", "icon", "updatedAt")
+STRING_FIELDS = ("id", "name", "description", "icon", "updatedAt")
+ENUM_FIELDS = ("rarity", "type")
+LIST_FIELD = "foundIn"
+INT_FIELD = "value"
+
+# Centinelas: clave ausente / valor null
+STR_MISSING, STR_NULL = 0xFFFFFFFF, 0xFFFFFFFE
+ENUM_MISSING, ENUM_NULL = 0xFF, 0xFE
+INT_MISSING, INT_NULL = -2**63, -2**63 + 1
+
+
+def snapshot_path_for(json_path):
+    """Ruta del snapshot que acompaña a un JSON de items"""
+    return os.path.splitext(json_path)[0] + ".snapshot"
+
+
+def _native(arr, byteorder):
+    if byteorder != sys.byteorder:
+        arr.byteswap()
+    return arr
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMPILACIÓN
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.offsets = array("I", [0])
+        self.data = bytearray()
+
+    def add(self, text):
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = len(self.ids)
+            self.ids[text] = sid
+            self.data += text.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return sid
+
+
+def _enum_code(table, value):
+    if value not in table:
+        if len(table) >= ENUM_NULL:
+            raise ValueError(f"Demasiados valores distintos para un enum: {value!r}")
+        table.append(value)
+    return table.index(value)
+
+
+def compile_snapshot(items, source_stat=None):
+    """Serializa una lista de items al formato de snapshot (bytes)"""
+    strings = _StringTable()
+    enums = {field: [] for field in ENUM_FIELDS}
+    categories = []
+
+    str_cols = {field: array("I") for field in STRING_FIELDS + ("extra",)}
+    enum_cols = {field: array("B") for field in ENUM_FIELDS}
+    values = array("q")
+    found_offsets = array("I", [0])
+    found_codes = array("B")
+    found_masks = array("I")
+    found_missing = array("B")
+
+    for item in items:
+        for field in STRING_FIELDS:
+            if field not in item:
+                str_cols[field].append(STR_MISSING)
+            elif item[field] is None:
+                str_cols[field].append(STR_NULL)
+            elif isinstance(item[field], str):
+                str_cols[field].append(strings.add(item[field]))
+            else:
+                raise ValueError(f"Campo {field!r} no es texto en {item.get('id')!r}")
+
+        for field in ENUM_FIELDS:
+            if field not in item:
+                enum_cols[field].append(ENUM_MISSING)
+            elif item[field] is None:
+                enum_cols[field].append(ENUM_NULL)
+            else:
+                enum_cols[field].append(_enum_code(enums[field], item[field]))
+
+        if INT_FIELD not in item:
+            values.append(INT_MISSING)
+        elif item[INT_FIELD] is None:
+            values.append(INT_NULL)
+        elif isinstance(item[INT_FIELD], int) and INT_NULL < item[INT_FIELD] < 2**63:
+            values.append(item[INT_FIELD])
+        else:
+            raise ValueError(f"Campo {INT_FIELD!r} no es entero en {item.get('id')!r}")
+
+        mask = 0
+        found_missing.append(LIST_FIELD not in item)
+        for category in item.get(LIST_FIELD) or []:
+            code = _enum_code(categories, category)
+            if code >= 32:
+                raise ValueError("foundIn admite como máximo 32 categorías")
+            found_codes.append(code)
+            mask |= 1 << code
+        found_offsets.append(len(found_codes))
+        found_masks.append(mask)
+
+        extra = {k: v for k, v in item.items() if k not in FIELD_ORDER}
+        str_cols["extra"].append(strings.add(json.dumps(extra, ensure_ascii=False)) if extra else STR_MISSING)
+
+    sections = {
+        "strings.offsets": strings.offsets,
+        "strings.data": bytes(strings.data),
+        "value": values,
+        "foundIn.offsets": found_offsets,
+        "foundIn.codes": found_codes,
+        "foundIn.mask": found_masks,
+        "foundIn.missing": found_missing,
+    }
+    sections.update({f"str.{field}": col for field, col in str_cols.items()})
+    sections.update({f"enum.{field}": col for field, col in enum_cols.items()})
+
+    meta = {
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "count": len(found_masks),
+        "strings": len(strings.ids),
+        "enums": enums,
+        "categories": categories,
+        "source": source_stat,
+        "sections": {},
+    }
+
+    body = bytearray()
+    for name, data in sections.items():
+        body += b"\0" * (-len(body) % ALIGN)
+        raw = data.tobytes() if isinstance(data, array) else data
+        typecode = data.typecode if isinstance(data, array) else "B"
+        meta["sections"][name] = [len(body), len(raw), typecode]
+        body += raw
+
+    header = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    # Los offsets de las secciones son relativos al inicio (alineado) del cuerpo
+    prefix += b"\0" * (-len(prefix) % ALIGN)
+    return prefix + bytes(body)
+
+
+def _source_stat(json_path):
+    st = os.stat(json_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def build_snapshot(json_path, out_path=None):
+    """Compila el JSON de items a su snapshot (escritura atómica)"""
+    out_path = out_path or snapshot_path_for(json_path)
+    stat = _source_stat(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+
+    payload = compile_snapshot(items, stat)
+
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, out_path)
+    return out_path, len(items), len(payload)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LECTURA
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ItemSnapshot(Sequence):
+    """Vista de solo lectura sobre un snapshot mapeado en memoria.
+
+    Se comporta como la lista de items del JSON: items[i] devuelve el
+    mismo diccionario (construido la primera vez que se pide) y los
+    slices devuelven listas. column(campo) da la columna completa sin
+    materializar los items.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+
+        if bytes(buf[:len(MAGIC)]) != MAGIC:
+            self.close()
+            raise ValueError(f"{path} no es un snapshot de items")
+        (header_len,) = struct.unpack_from("<I", buf, len(MAGIC))
+        header_end = len(MAGIC) + 4 + header_len
+        self.meta = json.loads(bytes(buf[len(MAGIC) + 4:header_end]))
+        if self.meta.get("version") != VERSION:
+            self.close()
+            raise ValueError(f"Versión de snapshot no soportada: {self.meta.get('version')}")
+
+        body_start = header_end + (-header_end % ALIGN)
+        byteorder = self.meta["byteorder"]
+        self._sections = {}
+        for name, (offset, length, typecode) in self.meta["sections"].items():
+            view = buf[body_start + offset:body_start + offset + length]
+            if typecode == "B":
+                self._sections[name] = view
+            elif byteorder == sys.byteorder:
+                self._sections[name] = view.cast(typecode)
+            else:
+                self._sections[name] = _native(array(typecode, view), byteorder)
+
+        self.count = self.meta["count"]
+        self.enums = self.meta["enums"]
+        self.categories = self.meta["categories"]
+        self._strings = [None] * self.meta["strings"]
+        self._items = [None] * self.count
+        self._columns = {}
+
+    def close(self):
+        self._sections = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Aún hay vistas vivas; el mapeo se libera con ellas
+            pass
+
+    def __len__(self):
+        return self.count
+
+    def string(self, sid):
+        """Cadena internada de la tabla de strings"""
+        text = self._strings[sid]
+        if text is None:
+            offsets = self._sections["strings.offsets"]
+            raw = self._sections["strings.data"][offsets[sid]:offsets[sid + 1]]
+            text = self._strings[sid] = sys.intern(str(raw, "utf-8"))
+        return text
+
+    def _value(self, field, idx):
+        """(presente, valor) de un campo de un item"""
+        if field in STRING_FIELDS:
+            sid = self._sections[f"str.{field}"][idx]
+            if sid == STR_MISSING:
+                return False, None
+            return True, None if sid == STR_NULL else self.string(sid)
+        if field in ENUM_FIELDS:
+            code = self._sections[f"enum.{field}"][idx]
+            if code == ENUM_MISSING:
+                return False, None
+            return True, None if code == ENUM_NULL else self.enums[field][code]
+        if field == LIST_FIELD:
+            if self._sections["foundIn.missing"][idx]:
+                return False, None
+            offsets = self._sections["foundIn.offsets"]
+            codes = self._sections["foundIn.codes"][offsets[idx]:offsets[idx + 1]]
+            return True, [self.categories[c] for c in codes]
+        if field == INT_FIELD:
+            value = self._sections["value"][idx]
+            if value == INT_MISSING:
+                return False, None
+            return True, None if value == INT_NULL else value
+        raise KeyError(field)
+
+    def _build_item(self, idx):
+        item = {}
+        for field in FIELD_ORDER:
+            present, value = self._value(field, idx)
+            if present:
+                item[field] = value
+        extra = self._sections["str.extra"][idx]
+        if extra != STR_MISSING:
+            item.update(json.loads(self.string(extra)))
+        return item
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self.count))]
+        if idx < 0:
+            idx += self.count
+        if not 0 <= idx < self.count:
+            raise IndexError("índice de item fuera de rango")
+        item = self._items[idx]
+        if item is None:
+            item = self._items[idx] = self._build_item(idx)
+        return item
+
+    def __iter__(self):
+        for idx in range(self.count):
+            yield self[idx]
+
+    def column(self, field):
+        """Valores de un campo para todos los items (None si falta)"""
+        col = self._columns.get(field)
+        if col is None:
+            if field in FIELD_ORDER:
+                col = [self._value(field, idx)[1] for idx in range(self.count)]
+            else:
+                col = [self[idx].get(field) for idx in range(self.count)]
+            self._columns[field] = col
+        return col
+
+    def found_in_masks(self):
+        """Máscara de bits de foundIn por item (bits según self.categories)"""
+        return self._sections["foundIn.mask"]
+
+
+def load_snapshot(json_path, snapshot_path=None):
+    """Abre el snapshot de un JSON si existe y está al día; si no, None"""
+    snapshot_path = snapshot_path or snapshot_path_for(json_path)
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        snapshot = ItemSnapshot(snapshot_path)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        fresh = snapshot.meta.get("source") == _source_stat(json_path)
+    except OSError:
+        # Sin JSON de origen el snapshot es la única fuente disponible
+        fresh = True
+    if not fresh:
+        snapshot.close()
+        return None
+    return snapshot
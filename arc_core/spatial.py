@@ -0,0 +1,212 @@
+"""
+Índice espacial de los POIs con NumPy
+
+Cada mapa guarda las coordenadas de sus POIs en un array (n, 2), la
+matriz de distancias entre todos ellos calculada de una vez y una
+rejilla uniforme (celda → POIs) para consultas de radio y de vecino más
+cercano sin recorrer el mapa entero. La conversión a coordenadas de
+Leaflet y la longitud de una ruta también se calculan en bloque, igual
+que los clusters de marcadores por zoom que dibuja el mapa.
+"""
+
+import math
+
+import numpy as np
+
+from .locations import location_mask
+
+# Celdas por lado de la rejilla (sobre el ancho del mapa)
+GRID_CELLS = 16
+
+# Con pocos POIs recorrer el array entero sale más barato que la rejilla
+BRUTE_FORCE_LIMIT = 64
+
+# Lado en píxeles de pantalla de la celda que agrupa marcadores en un cluster
+CLUSTER_PX = 64
+
+
+def to_leaflet(coords, width):
+    """Coordenadas del juego (n, 2) → (lat, lng) de Leaflet en un mundo de 256"""
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    scale = 256.0 / width
+    return -coords[:, 1] * scale, coords[:, 0] * scale
+
+
+def pairwise_distances(a, b=None):
+    """Matriz de distancias euclídeas entre dos conjuntos de puntos (n, 2) y (m, 2)"""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 2)
+    b = a if b is None else np.asarray(b, dtype=np.float64).reshape(-1, 2)
+    diff = a[:, None, :] - b[None, :, :]
+    return np.hypot(diff[..., 0], diff[..., 1])
+
+
+def cluster_grid(lats, lngs, zoom, cell_px=CLUSTER_PX):
+    """Agrupa puntos de Leaflet en celdas de cell_px píxeles en el zoom dado.
+
+    En CRS.Simple una unidad mide 2^zoom píxeles. Devuelve una entrada por
+    celda ocupada: el índice del punto si está solo o [lat, lng, n] con
+    el centroide y el número de puntos del cluster.
+    """
+    points = np.column_stack([np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64)])
+    if not len(points):
+        return []
+    cells = np.floor(points / (cell_px / 2 ** zoom)).astype(np.int64)
+    _, inverse, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    sums = np.zeros((len(counts), 2))
+    np.add.at(sums, inverse, points)
+    centers = (sums / counts[:, None]).round(3).tolist()
+    # Primer punto de cada celda (el único en las celdas con uno solo)
+    first = np.empty(len(counts), dtype=np.int64)
+    first[inverse[::-1]] = np.arange(len(points))[::-1]
+    return [index if count == 1 else [lat, lng, count]
+            for (lat, lng), count, index in zip(centers, counts.tolist(), first.tolist())]
+
+
+def cluster_levels(lats, lngs, min_zoom, max_zoom, cell_px=CLUSTER_PX):
+    """{zoom: cluster_grid(...)} de min_zoom a max_zoom; en max_zoom todos los puntos sueltos"""
+    levels = {zoom: cluster_grid(lats, lngs, zoom, cell_px) for zoom in range(min_zoom, max_zoom)}
+    levels[max_zoom] = list(range(len(np.atleast_1d(lats))))
+    return levels
+
+
+class MapSpatialIndex:
+    """POIs de un mapa: coordenadas, distancias y rejilla"""
+
+    def __init__(self, pois, width, cell_size=None):
+        self.pois = pois
+        self.width = width
+        self.coords = np.array([poi["coords"][:2] for poi in pois], dtype=np.float64).reshape(-1, 2)
+        self.distances = pairwise_distances(self.coords)
+        self.masks = [location_mask(poi.get("types", [])) for poi in pois]
+
+        self.cell_size = float(cell_size or max(width / GRID_CELLS, 1.0))
+        cells = np.floor(self.coords / self.cell_size).astype(np.int64)
+        self._grid = {}
+        for idx, (cx, cy) in enumerate(cells.tolist()):
+            self._grid.setdefault((cx, cy), []).append(idx)
+        self._grid = {cell: np.array(members) for cell, members in self._grid.items()}
+        if len(pois):
+            self._cell_min = cells.min(axis=0).tolist()
+            self._cell_max = cells.max(axis=0).tolist()
+
+    def __len__(self):
+        return len(self.pois)
+
+    def _cell(self, point):
+        return math.floor(point[0] / self.cell_size), math.floor(point[1] / self.cell_size)
+
+    def _gather(self, cells):
+        found = [self._grid[cell] for cell in cells if cell in self._grid]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def _ring(self, center, radius):
+        """Celdas a distancia de Chebyshev exacta `radius` de la celda central"""
+        cx, cy = center
+        if radius == 0:
+            return [center]
+        cells = []
+        for dx in range(-radius, radius + 1):
+            cells.append((cx + dx, cy - radius))
+            cells.append((cx + dx, cy + radius))
+        for dy in range(-radius + 1, radius):
+            cells.append((cx - radius, cy + dy))
+            cells.append((cx + radius, cy + dy))
+        return cells
+
+    def _distances_to(self, point, indices):
+        diff = self.coords[indices] - np.asarray(point[:2], dtype=np.float64)
+        return np.hypot(diff[:, 0], diff[:, 1])
+
+    def type_indices(self, wanted):
+        """Índices de los POIs que tienen alguno de los bits de `wanted`"""
+        return np.array([i for i, mask in enumerate(self.masks) if mask & wanted], dtype=np.int64)
+
+    def within(self, point, radius):
+        """(índices, distancias) de los POIs a `radius` o menos del punto, de más cerca a más lejos"""
+        if len(self.pois) <= BRUTE_FORCE_LIMIT:
+            dist = self._distances_to(point, slice(None))
+            keep = np.flatnonzero(dist <= radius)
+            order = keep[np.argsort(dist[keep], kind="stable")]
+            return order, dist[order]
+
+        x, y = point[0], point[1]
+        x0, y0 = self._cell((x - radius, y - radius))
+        x1, y1 = self._cell((x + radius, y + radius))
+        # Solo las celdas ocupadas: un radio enorme no recorre millones de celdas vacías
+        x0, y0 = max(x0, self._cell_min[0]), max(y0, self._cell_min[1])
+        x1, y1 = min(x1, self._cell_max[0]), min(y1, self._cell_max[1])
+        candidates = self._gather((cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1))
+        dist = self._distances_to(point, candidates)
+        keep = dist <= radius
+        candidates, dist = candidates[keep], dist[keep]
+        order = np.lexsort((candidates, dist))
+        return candidates[order], dist[order]
+
+    def nearest(self, point, k=1):
+        """(índices, distancias) de los k POIs más cercanos al punto"""
+        if not len(self.pois) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        k = min(k, len(self.pois))
+        if len(self.pois) <= BRUTE_FORCE_LIMIT:
+            dist = self._distances_to(point, slice(None))
+            order = np.argsort(dist, kind="stable")[:k]
+            return order, dist[order]
+
+        center = self._cell(point)
+        # Anillos necesarios para cubrir toda la rejilla desde la celda del punto
+        max_ring = max(
+            abs(center[0] - self._cell_min[0]), abs(center[0] - self._cell_max[0]),
+            abs(center[1] - self._cell_min[1]), abs(center[1] - self._cell_max[1]),
+        )
+
+        candidates = np.empty(0, dtype=np.int64)
+        for ring in range(max_ring + 1):
+            candidates = np.concatenate([candidates, self._gather(self._ring(center, ring))])
+            if len(candidates) >= k:
+                dist = self._distances_to(point, candidates)
+                # Lo que quede fuera de estos anillos está al menos a ring·celda
+                if np.partition(dist, k - 1)[k - 1] <= ring * self.cell_size:
+                    break
+
+        dist = self._distances_to(point, candidates)
+        order = np.lexsort((candidates, dist))[:k]
+        return candidates[order], dist[order]
+
+    def route_length(self, order):
+        """Longitud de una ruta dada como índices de POI"""
+        order = np.asarray(order, dtype=np.int64)
+        if len(order) < 2:
+            return 0.0
+        return float(self.distances[order[:-1], order[1:]].sum())
+
+    def leaflet_coords(self):
+        """(lat, lng) de Leaflet de todos los POIs"""
+        return to_leaflet(self.coords, self.width)
+
+
+class SpatialIndex:
+    """Índices espaciales de todos los mapas, construidos al pedirlos"""
+
+    def __init__(self, maps):
+        self.maps = maps
+        self._indexes = {}
+
+    def __getitem__(self, map_id):
+        index = self._indexes.get(map_id)
+        if index is None:
+            map_data = self.maps.get(map_id, {})
+            index = self._indexes[map_id] = MapSpatialIndex(map_data.get("pois", []), map_data.get("width", 8192))
+        return index
+
+    def within(self, map_id, point, radius):
+        """POIs del mapa a `radius` o menos del punto, con su distancia"""
+        index = self[map_id]
+        indices, dist = index.within(point, radius)
+        return [(index.pois[i], d) for i, d in zip(indices.tolist(), dist.tolist())]
+
+    def nearest(self, map_id, point, k=1):
+        """Los k POIs del mapa más cercanos al punto, con su distancia"""
+        index = self[map_id]
+        indices, dist = index.nearest(point, k)
+        return [(index.pois[i], d) for i, d in zip(indices.tolist(), dist.tolist())]
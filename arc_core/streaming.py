@@ -0,0 +1,77 @@
+"""
+Respuestas de OpenAI en streaming
+
+Los generadores devuelven el texto a trozos según llega (chat.completions
+o Responses API) y cierran la conexión HTTP en cuanto se dejan de
+consumir, ya sea al terminar, por un error o porque el usuario paró la
+respuesta. collect_stream acumula el texto y avisa a la interfaz como
+mucho cada `interval` segundos para no saturar el websocket de Streamlit.
+"""
+
+import time
+
+
+class StreamError(RuntimeError):
+    """La API informó de un error a mitad del stream"""
+
+
+def chat_completion_deltas(client, **kwargs):
+    """Trozos de texto de client.chat.completions.create(stream=True)"""
+    stream = client.chat.completions.create(stream=True, **kwargs)
+    try:
+        for chunk in stream:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+    finally:
+        stream.close()
+
+
+def response_deltas(client, **kwargs):
+    """Trozos de texto de client.responses.create(stream=True)"""
+    stream = client.responses.create(stream=True, **kwargs)
+    try:
+        for event in stream:
+            if event.type == "response.output_text.delta":
+                yield event.delta
+            elif event.type == "error":
+                raise StreamError(event.message)
+            elif event.type == "response.failed":
+                error = event.response.error
+                raise StreamError(error.message if error else "la respuesta falló")
+    finally:
+        stream.close()
+
+
+def collect_stream(deltas, on_text=None, cancel=None, interval=0.05):
+    """Consume un stream de trozos y devuelve (texto, completo).
+
+    on_text(texto_acumulado) se llama al llegar el primer trozo y después
+    como mucho cada `interval` segundos; el texto final lo pinta el que
+    llama con el valor devuelto.
+    cancel: objeto con is_set() (p. ej. threading.Event); si se activa se
+    corta el stream y se devuelve lo recibido hasta entonces con
+    completo=False. Si el que llama se interrumpe (una excepción en
+    on_text, como el rerun de Streamlit al pulsar "Detener") el stream
+    también se cierra.
+    """
+    parts = []
+    last = None
+    completed = True
+    try:
+        for delta in deltas:
+            if cancel is not None and cancel.is_set():
+                completed = False
+                break
+            parts.append(delta)
+            now = time.monotonic()
+            if on_text and (last is None or now - last >= interval):
+                on_text("".join(parts))
+                last = now
+    finally:
+        close = getattr(deltas, "close", None)
+        if close:
+            close()
+
+    return "".join(parts), completed
@@ -0,0 +1,155 @@
+"""
+Archivo único de tiles (SQLite, esquema MBTiles con deduplicación)
+
+En vez de miles de .webp sueltos en tiles/<mapa>/<z>/<x>/<y>.webp, todos
+los mapas van a un solo archivo: la tabla `images` guarda cada contenido
+distinto una vez (clave: su sha256) y `map` apunta cada (mapa, z, x, y) a
+su contenido. Los tiles repetidos (vacío, agua, bordes negros) ocupan
+un único blob. Es el mismo esquema que usan los MBTiles deduplicados,
+con una columna map_name para guardar varios mapas y la fila en TMS
+(y invertida) como en la especificación; la vista `tiles` da el formato
+MBTiles clásico. Las lecturas son por clave primaria: acceso aleatorio
+sin cargar nada más en memoria.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from .data import BASE_DIR
+
+ARCHIVE_FILE = os.path.join(BASE_DIR, "tiles.mbtiles")
+TILE_FORMAT = "webp"
+
+
+def tile_hash(data):
+    """Id del contenido de un tile (también sirve de ETag)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def tms_row(z, y):
+    """Fila TMS de MBTiles a partir de la y de XYZ (y al revés)"""
+    return (1 << z) - 1 - y
+
+
+class TileArchive:
+    """Tiles de todos los mapas en un archivo SQLite con contenido deduplicado"""
+
+    def __init__(self, path=ARCHIVE_FILE, readonly=False):
+        self.path = str(path)
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if readonly:
+            uri = Path(self.path).resolve().as_uri() + "?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            return
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(
+                f"""
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS images (tile_id TEXT PRIMARY KEY, tile_data BLOB NOT NULL);
+                CREATE TABLE IF NOT EXISTS map (
+                    map_name TEXT NOT NULL,
+                    zoom_level INTEGER NOT NULL,
+                    tile_column INTEGER NOT NULL,
+                    tile_row INTEGER NOT NULL,
+                    tile_id TEXT NOT NULL,
+                    PRIMARY KEY (map_name, zoom_level, tile_column, tile_row)
+                ) WITHOUT ROWID;
+                CREATE VIEW IF NOT EXISTS tiles AS
+                    SELECT map.map_name, map.zoom_level, map.tile_column, map.tile_row, images.tile_data
+                    FROM map JOIN images ON images.tile_id = map.tile_id;
+                INSERT OR IGNORE INTO metadata VALUES ('format', '{TILE_FORMAT}');
+                """
+            )
+
+    def put(self, map_id, z, x, y, data):
+        """Guarda un tile; devuelve su id de contenido"""
+        tile_id = tile_hash(data)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO images VALUES (?, ?)", (tile_id, data))
+            self._conn.execute("INSERT OR REPLACE INTO map VALUES (?, ?, ?, ?, ?)",
+                               (map_id, z, x, tms_row(z, y), tile_id))
+        return tile_id
+
+    def put_many(self, tiles):
+        """Guarda [(map_id, z, x, y, data)] en una sola transacción"""
+        with self._lock, self._conn:
+            for map_id, z, x, y, data in tiles:
+                tile_id = tile_hash(data)
+                self._conn.execute("INSERT OR IGNORE INTO images VALUES (?, ?)", (tile_id, data))
+                self._conn.execute("INSERT OR REPLACE INTO map VALUES (?, ?, ?, ?, ?)",
+                                   (map_id, z, x, tms_row(z, y), tile_id))
+
+    def get(self, map_id, z, x, y):
+        """(datos, id de contenido) o None si el tile no existe"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT images.tile_data, map.tile_id FROM map JOIN images ON images.tile_id = map.tile_id "
+                "WHERE map_name = ? AND zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                (map_id, z, x, tms_row(z, y)),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def size(self, map_id, z, x, y):
+        """Bytes del tile o None (sin leer el blob)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT length(images.tile_data) FROM map JOIN images ON images.tile_id = map.tile_id "
+                "WHERE map_name = ? AND zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                (map_id, z, x, tms_row(z, y)),
+            ).fetchone()
+        return row[0] if row else None
+
+    def maps(self):
+        """{map_id: (zoom mínimo, zoom máximo)}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT map_name, MIN(zoom_level), MAX(zoom_level) FROM map GROUP BY map_name"
+            ).fetchall()
+        return {name: (low, high) for name, low, high in rows}
+
+    def stats(self):
+        """{"tiles", "unique", "bytes"}: referencias, blobs distintos y tamaño de los blobs"""
+        with self._lock:
+            tiles = self._conn.execute("SELECT COUNT(*) FROM map").fetchone()[0]
+            unique, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(length(tile_data)), 0) FROM images").fetchone()
+        return {"tiles": tiles, "unique": unique, "bytes": size}
+
+    def vacuum(self):
+        """Borra los contenidos que ya no usa ningún tile y compacta el archivo"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM images WHERE tile_id NOT IN (SELECT tile_id FROM map)")
+            self._conn.execute("VACUUM")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def pack_directory(tiles_dir, archive, map_ids=None, batch=500):
+    """Mete tiles/<mapa>/<z>/<x>/<y>.<ext> en el archivo → número de tiles"""
+    tiles_dir = Path(tiles_dir)
+    count = 0
+    pending = []
+    for map_dir in sorted(p for p in tiles_dir.iterdir() if p.is_dir()):
+        if map_ids and map_dir.name not in map_ids:
+            continue
+        for tile in map_dir.glob(f"*/*/*.{TILE_FORMAT}"):
+            z, x = tile.parent.parent.name, tile.parent.name
+            if not (z.isdigit() and x.isdigit() and tile.stem.isdigit()):
+                continue
+            pending.append((map_dir.name, int(z), int(x), int(tile.stem), tile.read_bytes()))
+            if len(pending) >= batch:
+                archive.put_many(pending)
+                count += len(pending)
+                pending = []
+    if pending:
+        archive.put_many(pending)
+        count += len(pending)
+    return count
@@ -0,0 +1,121 @@
+"""
+Registro de esquemas de tiles de cada mapa
+
+Un único sitio para cómo se direccionan los tiles de cada mapa (o capa):
+ruta en el CDN, orden de los ejes en la URL ({z}/{x}/{y} o {z}/{y}/{x}:
+dam y spaceport van al revés), zooms nativos y máximos, y la extensión
+real del mapa. Lo usan el generador de Leaflet (maps.py y
+arc_maps_app.py), download_tiles.py y tile_server.py.
+
+Los mapas se muestran con L.CRS.Simple en un mundo de 256 × 256
+unidades: con tiles de 512 px, en el zoom z el mapa ocupa 256 · 2^z px,
+es decir 2^(z-1) tiles por lado. Los tiles fuera de ese rango no los
+pide nunca Leaflet y no hace falta descargarlos.
+"""
+
+import math
+
+# CDN base para tiles
+CDN_URL = "https://cdn.arcraidersmaps.app"
+
+# Lado del mundo en unidades de Leaflet (bounds [[0, 0], [-256, 256]])
+WORLD_SIZE = 256
+
+# Orden de los ejes en la URL del CDN
+ORDER_ZXY = "{z}/{x}/{y}"
+ORDER_ZYX = "{z}/{y}/{x}"
+
+
+class TileScheme:
+    """Direccionamiento y extensión de los tiles de un mapa o capa"""
+
+    def __init__(self, tileset, map_id, path, order=ORDER_ZXY, min_zoom=1, max_native_zoom=3, max_zoom=5,
+                 tile_size=512, world_size=WORLD_SIZE, ext="webp"):
+        self.tileset = tileset
+        self.map_id = map_id
+        self.path = path
+        self.order = order
+        self.min_zoom = min_zoom
+        self.max_native_zoom = max_native_zoom
+        self.max_zoom = max_zoom
+        self.tile_size = tile_size
+        self.world_size = world_size
+        self.ext = ext
+
+    def __repr__(self):
+        return f"TileScheme({self.tileset!r}, order={self.order!r}, zoom={self.min_zoom}-{self.max_native_zoom})"
+
+    def template(self, base=CDN_URL):
+        """Plantilla de URL para L.tileLayer en el CDN"""
+        return f"{base}{self.path}/{self.order}.{self.ext}"
+
+    def url(self, z, x, y, base=CDN_URL):
+        """URL del tile (z, x, y) en el CDN, con el orden de ejes del mapa"""
+        return f"{base}{self.path}/{self.order.format(z=z, x=x, y=y)}.{self.ext}"
+
+    def local_template(self, server):
+        """Plantilla de URL en tile_server.py (siempre {z}/{x}/{y})"""
+        return f"{server}/tiles/{self.tileset}/{{z}}/{{x}}/{{y}}.{self.ext}"
+
+    def tiles_per_side(self, z):
+        """Tiles por lado que cubren el mapa en el zoom z"""
+        return max(1, math.ceil(self.world_size * 2 ** z / self.tile_size))
+
+    def in_bounds(self, z, x, y, max_zoom=None):
+        """True si el tile existe dentro de la extensión del mapa (hasta max_zoom; por defecto el nativo)"""
+        if not self.min_zoom <= z <= (max_zoom if max_zoom is not None else self.max_native_zoom):
+            return False
+        side = self.tiles_per_side(z)
+        return 0 <= x < side and 0 <= y < side
+
+    def zooms(self):
+        return range(self.min_zoom, self.max_native_zoom + 1)
+
+    def tiles(self, zooms=None):
+        """(z, x, y) de todos los tiles nativos dentro de la extensión"""
+        for z in zooms or self.zooms():
+            side = self.tiles_per_side(z)
+            for x in range(side):
+                for y in range(side):
+                    yield z, x, y
+
+    def count(self):
+        return sum(self.tiles_per_side(z) ** 2 for z in self.zooms())
+
+    def zoom_fields(self):
+        """Campos de Leaflet para MAPS_DATA: tilesize y zooms"""
+        return {
+            "tilesize": self.tile_size,
+            "maxZoom": self.max_zoom,
+            "minZoom": self.min_zoom,
+            "maxNativeZoom": self.max_native_zoom,
+        }
+
+    def map_fields(self):
+        """zoom_fields() más la tileUrl del CDN"""
+        return {"tileUrl": self.template(), **self.zoom_fields()}
+
+
+TILE_SCHEMES = {
+    scheme.tileset: scheme
+    for scheme in (
+        TileScheme("dam", "dam", "/maps/dam/tiles", ORDER_ZYX, max_native_zoom=4),
+        TileScheme("spaceport", "spaceport", "/maps/spaceport/tiles", ORDER_ZYX),
+        TileScheme("buried-city", "buried-city", "/maps/buried-city-v3/tiles"),
+        TileScheme("blue-gate", "blue-gate", "/maps/blue-gate-v2/tiles"),
+        TileScheme("stella-montis-l2", "stella-montis", "/maps/stella-montis/layers/stella-montis-l2/tiles"),
+        TileScheme("stella-montis-l1", "stella-montis", "/maps/stella-montis/layers/stella-montis-l1/tiles"),
+    )
+}
+
+
+def scheme_for(map_id, layer_id=None):
+    """Esquema de un mapa (o de una de sus capas); la primera capa si no se indica"""
+    if layer_id in TILE_SCHEMES:
+        return TILE_SCHEMES[layer_id]
+    if map_id in TILE_SCHEMES:
+        return TILE_SCHEMES[map_id]
+    for scheme in TILE_SCHEMES.values():
+        if scheme.map_id == map_id:
+            return scheme
+    raise KeyError(f"Mapa sin esquema de tiles: {map_id}")
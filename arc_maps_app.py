@@ -5,8 +5,10 @@ Basado en los datos de arcraidersmaps.app
 
 import streamlit as st
 import streamlit.components.v1 as components
+import hashlib
 import json
 import os
+from arc_core import MAPS_DATA, SpatialIndex, loader_tag, marker_payload, markers_json, scheme_for
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ARC RAIDERS - MAPA INTERACTIVO (con tiles reales del juego)
@@ -19,173 +21,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# CDN base para tiles
-CDN_URL = "https://cdn.arcraidersmaps.app"
-
-# --- Datos de los mapas con POIs reales ---
-# NOTA: dam y spaceport usan {z}/{y}/{x}, los demás usan {z}/{x}/{y}
-MAPS_DATA = {
-    "dam": {
-        "id": "dam",
-        "name": "Dam Battlegrounds",
-        "description": 'Alcantara Power Plant, or "The Dam", stands as a silent sentinel amidst a toxic, waterlogged land.',
-        "tileUrl": f"{CDN_URL}/maps/dam/tiles/{{z}}/{{x}}/{{y}}.webp",
-        "width": 8192,
-        "height": 8192,
-        "tilesize": 512,
-        "maxZoom": 5,
-        "minZoom": 1,
-        "maxNativeZoom": 4,
-        "thumbnail": f"{CDN_URL}/maps/dam/images/thumbnail.webp",
-        "pois": [
-            {"title": "Hydrophonic Dome Complex", "coords": [4010.5, 5237], "types": ["nature", "industrial", "security"]},
-            {"title": "Power Generation Complex", "coords": [5188, 5560], "types": ["industrial", "electrical"]},
-            {"title": "Water Treatment", "coords": [3306.5, 4091.5], "types": ["industrial", "mechanical"]},
-            {"title": "Testing Annex", "coords": [5144.51, 3091.49], "types": ["medical", "commercial"]},
-            {"title": "Research & Administration", "coords": [4357.53, 3744.5], "types": ["technological", "commercial"]},
-            {"title": "Control Tower", "coords": [4498.61, 3902.69], "types": ["technological", "security"]},
-            {"title": "Old Battlegrounds", "coords": [2616.3, 4816.27], "types": ["ARC"]},
-            {"title": "Primary Facility", "coords": [4201.96, 3898.38], "types": ["mechanical", "industrial"]},
-            {"title": "Electrical Substation", "coords": [3306.43, 3368.12], "types": ["electrical"]},
-            {"title": "Pale Apartments", "coords": [2673.34, 5513.91], "types": ["residential"]},
-            {"title": "Ruby Residence", "coords": [3181.13, 5864.72], "types": ["residential"]},
-            {"title": "Pattern House", "coords": [4957.21, 6141.13], "types": ["residential"]},
-            {"title": "South Swamp Outpost", "coords": [2454.58, 3978.27], "types": []},
-            {"title": "Water Towers", "coords": [2854, 3017.96], "types": []},
-            {"title": "Formicai Outpost", "coords": [4040, 2125.5], "types": []},
-            {"title": "Electrical Tower", "coords": [5740.5, 3087], "types": []},
-            {"title": "East Broken Bridge", "coords": [6157.04, 5228.68], "types": []},
-            {"title": "Raider Outpost East", "coords": [5815.64, 5583.54], "types": []},
-            {"title": "Pipeline Tower", "coords": [5186.65, 5045.37], "types": []},
-            {"title": "The Breach", "coords": [4735.93, 4789.73], "types": []},
-            {"title": "Red Lakes Balcony", "coords": [5077.73, 3439.54], "types": []},
-            {"title": "Small Creek", "coords": [4240.71, 3244.9], "types": []},
-            {"title": "Wreckage", "coords": [4476.18, 2681.21], "types": []},
-            {"title": "Scrap Yard", "coords": [4050.31, 2731.08], "types": ["mechanical", "industrial"]},
-        ]
-    },
-    "spaceport": {
-        "id": "spaceport",
-        "name": "The Spaceport",
-        "description": "Acerra Spaceport is a majestic testament to humanity's past ambitions.",
-        "tileUrl": f"{CDN_URL}/maps/spaceport/tiles/{{z}}/{{x}}/{{y}}.webp",
-        "width": 8192,
-        "height": 8192,
-        "tilesize": 512,
-        "maxZoom": 5,
-        "minZoom": 1,
-        "maxNativeZoom": 3,
-        "thumbnail": f"{CDN_URL}/maps/spaceport/images/thumbnail.webp",
-        "pois": [
-            {"title": "Departure Building", "coords": [3252.48, 4490], "types": ["commercial", "technological"]},
-            {"title": "Launch Towers", "coords": [3902.98, 4612.49], "types": ["technological", "security"]},
-            {"title": "Arrival Building", "coords": [3259.76, 5296.4], "types": ["commercial", "technological"]},
-            {"title": "Shipping Warehouse", "coords": [3680.6, 5760.07], "types": ["industrial", "mechanical"]},
-            {"title": "North Trench Tower", "coords": [4479.74, 5793.37], "types": ["technological"]},
-            {"title": "South Trench Tower", "coords": [4344.91, 5627.27], "types": ["technological"]},
-            {"title": "Rocket Assembly", "coords": [5019, 4614], "types": ["ARC", "industrial"]},
-            {"title": "Fuel Control", "coords": [4788.91, 4901.57], "types": ["mechanical", "electrical"]},
-            {"title": "Container Storage", "coords": [4788.06, 3639.39], "types": ["industrial", "mechanical"]},
-            {"title": "Vehicle Maintenance", "coords": [4216.93, 3458.96], "types": ["mechanical", "industrial"]},
-            {"title": "Control Tower A6", "coords": [4194.39, 3838.68], "types": ["technological", "commercial"]},
-            {"title": "East Plains Warehouse", "coords": [5842.82, 4453.53], "types": []},
-            {"title": "Little Hangar", "coords": [5396.87, 5252.23], "types": []},
-            {"title": "The Trench", "coords": [4604.75, 5464.13], "types": []},
-            {"title": "Maintenance Hangar", "coords": [3777.31, 2707.67], "types": []},
-            {"title": "Staff Parking", "coords": [4539.16, 2386.45], "types": []},
-            {"title": "Communications Tower", "coords": [5938.41, 3353.48], "types": []},
-        ]
-    },
-    "buried-city": {
-        "id": "buried-city",
-        "name": "Buried City",
-        "description": "Amidst the sand dunes in this arid wasteland you will find a remnant of the old world.",
-        "tileUrl": f"{CDN_URL}/maps/buried-city-v3/tiles/{{z}}/{{x}}/{{y}}.webp",
-        "width": 8192,
-        "height": 8192,
-        "tilesize": 512,
-        "maxZoom": 5,
-        "minZoom": 1,
-        "maxNativeZoom": 3,
-        "thumbnail": f"{CDN_URL}/maps/buried-city-v3/images/thumbnail.webp",
-        "pois": [
-            {"title": "Library", "coords": [3614.87, 5390.1], "types": ["commercial", "old-world"]},
-            {"title": "Hospital", "coords": [4242.34, 5901.56], "types": ["medical"]},
-            {"title": "Parking Garage", "coords": [4533.58, 5248.26], "types": ["mechanical"]},
-            {"title": "Galleria", "coords": [5213.82, 5297.44], "types": ["commercial"]},
-            {"title": "Space Travel", "coords": [4819.81, 4889.46], "types": ["commercial", "technological"]},
-            {"title": "Research", "coords": [4606.72, 4740.12], "types": ["medical", "technological"]},
-            {"title": "Town Hall", "coords": [4560.34, 3891.2], "types": ["old-world"]},
-            {"title": "Marano Park", "coords": [4083.82, 4574.24], "types": ["nature"]},
-            {"title": "Plaza Rosa", "coords": [4240.89, 2325.54], "types": ["medical", "commercial"]},
-            {"title": "Grandioso Apartments", "coords": [2556.38, 3031.45], "types": ["residential"]},
-            {"title": "Santa Maria Houses", "coords": [4026.6, 3066.62], "types": ["residential", "old-world"]},
-            {"title": "Outskirts", "coords": [2215.52, 5096.41], "types": ["industrial", "mechanical"]},
-            {"title": "Red Tower", "coords": [4908.03, 2672.32], "types": ["residential"]},
-            {"title": "Church Ruins", "coords": [6104, 1932], "types": []},
-            {"title": "Corso Da Vinci", "coords": [4056, 3458], "types": []},
-        ]
-    },
-    "blue-gate": {
-        "id": "blue-gate",
-        "name": "Blue Gate",
-        "description": "Once a steadfast symbol of defiant connection, the Blue Gate now serves as a daunting entryway.",
-        "tileUrl": f"{CDN_URL}/maps/blue-gate-v2/tiles/{{z}}/{{x}}/{{y}}.webp",
-        "width": 8192,
-        "height": 8192,
-        "tilesize": 512,
-        "maxZoom": 5,
-        "minZoom": 1,
-        "maxNativeZoom": 3,
-        "thumbnail": f"{CDN_URL}/maps/blue-gate/images/thumbnail.webp",
-        "pois": [
-            {"title": "Trapper's Glade", "coords": [2568.2, 4785.13], "types": ["nature"]},
-            {"title": "Raider's Refuge", "coords": [2574.96, 5131.62], "types": ["residential"]},
-            {"title": "Adorned Wreckage", "coords": [2250.73, 4435.1], "types": ["mechanical", "industrial"]},
-            {"title": "Village", "coords": [3266.64, 5617.17], "types": ["commercial", "residential"]},
-            {"title": "Checkpoint", "coords": [3857, 4344.71], "types": ["mechanical"]},
-            {"title": "Warehouse Complex", "coords": [4776.99, 4668.93], "types": ["industrial"]},
-            {"title": "Gate Control Room", "coords": [4550.03, 4455.48], "types": []},
-            {"title": "Reinforced Reception", "coords": [4025.86, 5332.24], "types": ["security", "technological"]},
-            {"title": "Ancient Fort", "coords": [4159.61, 2534.44], "types": ["old-world", "technological"]},
-            {"title": "Barren Clearing", "coords": [2010.27, 5384.93], "types": ["ARC"]},
-        ]
-    },
-    "stella-montis": {
-        "id": "stella-montis",
-        "name": "Stella Montis",
-        "description": "A secluded research facility amidst snow-draped peaks.",
-        "layers": [
-            {
-                "id": "stella-montis-l2",
-                "name": "Top Section",
-                "tileUrl": f"{CDN_URL}/maps/stella-montis/layers/stella-montis-l2/tiles/{{z}}/{{x}}/{{y}}.webp",
-            },
-            {
-                "id": "stella-montis-l1", 
-                "name": "Bottom Section",
-                "tileUrl": f"{CDN_URL}/maps/stella-montis/layers/stella-montis-l1/tiles/{{z}}/{{x}}/{{y}}.webp",
-            }
-        ],
-        "width": 8192,
-        "height": 8192,
-        "tilesize": 512,
-        "maxZoom": 5,
-        "minZoom": 1,
-        "maxNativeZoom": 3,
-        "thumbnail": f"{CDN_URL}/maps/stella-montis/images/thumbnail-v2.webp",
-        "pois": [
-            {"title": "Seed Vault", "coords": [6306, 950], "types": ["industrial", "technological"]},
-            {"title": "Sandbox", "coords": [3719.38, 3850.36], "types": ["mechanical", "technological"]},
-            {"title": "Loading Bay", "coords": [1985.56, 4104.92], "types": ["industrial"]},
-            {"title": "Assembly Workshops", "coords": [2435.5, 6270.24], "types": ["technological"]},
-            {"title": "Business Center", "coords": [6029.23, 4766.19], "types": ["exodus", "commercial"]},
-            {"title": "Cultural Archives", "coords": [6443.12, 3844.26], "types": ["old-world"]},
-            {"title": "Medical Research", "coords": [1557.34, 3815.98], "types": ["medical", "technological"]},
-        ]
-    }
-}
-
 # --- Colores por tipo de POI ---
 POI_COLORS = {
     "nature": "#4CAF50",
@@ -203,9 +38,34 @@ POI_COLORS = {
     "default": "#FFFFFF"
 }
 
+# --- Índice espacial de los POIs (coordenadas Leaflet, radios, más cercano) ---
+@st.cache_resource
+def get_spatial_index():
+    """Uno por proceso, compartido entre sesiones y reruns"""
+    return SpatialIndex(MAPS_DATA)
+
+SPATIAL = get_spatial_index()
+
+# Radio (unidades del juego) para listar POIs cercanos a un marcador
+NEARBY_RADIUS = 500
+
+# --- Servidor local de tiles (tile_server.py); vacío = CDN ---
+TILE_SERVER_URL = os.getenv("ARC_TILE_SERVER", "").rstrip("/")
+# Cambiarlo tras actualizar los tiles invalida la caché del navegador
+TILE_VERSION = os.getenv("ARC_TILE_VERSION", "")
+# El servidor local tiene los zooms generados por build_tile_pyramid.py hasta maxZoom
+TILE_OVERZOOM = os.getenv("ARC_TILE_OVERZOOM", "") == "1"
+
 # --- Archivo para guardar marcadores personalizados ---
 MARKERS_FILE = "custom_markers.json"
 
+# Cargador de la capa de marcadores (el mismo en todos los mapas). El HTML
+# va en un iframe srcdoc, que resuelve las URLs relativas contra la página
+# de Streamlit: con server.enableStaticServing (.streamlit/config.toml) se
+# pide como archivo de static/ y el navegador lo cachea una vez; sin él,
+# se incrusta en cada documento
+MARKERS_LOADER = loader_tag(st.get_option("server.enableStaticServing"))
+
 def load_custom_markers():
     """Carga marcadores personalizados del archivo."""
     if os.path.exists(MARKERS_FILE):
@@ -218,13 +78,11 @@ def save_custom_markers(markers):
     with open(MARKERS_FILE, "w", encoding="utf-8") as f:
         json.dump(markers, f, ensure_ascii=False, indent=2)
 
-def get_poi_color(types):
-    """Obtener color basado en el tipo de POI"""
-    if not types:
-        return POI_COLORS["default"]
-    return POI_COLORS.get(types[0], POI_COLORS["default"])
+def markers_version(custom_markers):
+    """Hash del contenido de los marcadores personalizados (clave de la caché del HTML)"""
+    return hashlib.sha256(json.dumps(custom_markers, sort_keys=True).encode("utf-8")).hexdigest()[:16]
 
-def create_map_html(map_data, custom_markers=None, selected_layer=None, use_embedded_site=False):
+def create_map_html(map_data, custom_markers=None, selected_layer=None, use_embedded_site=False, tile_server=None):
     """Generar el HTML del mapa con Leaflet y tiles reales del juego"""
     
     # Opción: Incrustar el sitio original directamente
@@ -246,56 +104,23 @@ def create_map_html(map_data, custom_markers=None, selected_layer=None, use_embe
         </html>
         '''
     
-    # Determinar la URL de tiles
-    if "layers" in map_data and selected_layer:
-        layer = next((l for l in map_data["layers"] if l["id"] == selected_layer), map_data["layers"][0])
-        tile_url = layer["tileUrl"]
-    elif "tileUrl" in map_data:
-        tile_url = map_data["tileUrl"]
-    else:
-        tile_url = map_data["layers"][0]["tileUrl"]
+    # Determinar la URL de tiles (el esquema fija el orden de ejes y la extensión)
+    layer_ids = [l["id"] for l in map_data.get("layers", [])]
+    scheme = scheme_for(map_data["id"], selected_layer if selected_layer in layer_ids else None)
+    tile_url = scheme.template()
+    max_native_zoom = map_data['maxNativeZoom']
     
-    # Generar marcadores de POIs del juego
-    markers_js = ""
-    for poi in map_data.get("pois", []):
-        # Convertir coordenadas del juego a coordenadas Leaflet
-        x, y = poi["coords"][0], poi["coords"][1]
-        lat = -(y / map_data['width'] * 256)
-        lng = x / map_data['width'] * 256
-        
-        color = get_poi_color(poi.get("types", []))
-        types_str = ", ".join(poi.get("types", [])) if poi.get("types") else "Location"
-        
-        markers_js += f"""
-        L.circleMarker([{lat}, {lng}], {{
-            radius: 8,
-            fillColor: '{color}',
-            color: '#000',
-            weight: 2,
-            opacity: 1,
-            fillOpacity: 0.85
-        }}).addTo(markersLayer)
-          .bindPopup('<div style="min-width:150px"><b>{poi["title"]}</b><br><small style="color:#aaa">{types_str}</small></div>');
-        """
+    # Tiles servidos por tile_server.py (mismo nombre de carpeta que download_tiles.py)
+    if tile_server:
+        tile_url = scheme.local_template(tile_server)
+        if TILE_OVERZOOM:
+            max_native_zoom = scheme.max_zoom
+        if TILE_VERSION:
+            tile_url += f"?v={TILE_VERSION}"
     
-    # Generar marcadores personalizados
-    if custom_markers:
-        for marker in custom_markers:
-            x, y = marker.get("x", 4096), marker.get("y", 4096)
-            lat = -(y / map_data['width'] * 256)
-            lng = x / map_data['width'] * 256
-            
-            markers_js += f"""
-            L.marker([{lat}, {lng}], {{
-                icon: L.divIcon({{
-                    className: 'custom-marker',
-                    html: '<div style="background:#FF5722;width:24px;height:24px;border-radius:50%;border:3px solid #fff;box-shadow:0 2px 5px rgba(0,0,0,0.5);"></div>',
-                    iconSize: [24, 24],
-                    iconAnchor: [12, 12]
-                }})
-            }}).addTo(markersLayer)
-              .bindPopup('<div style="min-width:150px"><b>{marker.get("name", "Custom")}</b><br><small>{marker.get("notes", "")}</small></div>');
-            """
+    # Marcadores (POIs del juego + personalizados) serializados una vez como
+    # JSON con sus clusters por zoom; map_markers.js dibuja solo los visibles
+    markers = markers_json(marker_payload(map_data, custom_markers, POI_COLORS))
     
     html = f"""
     <!DOCTYPE html>
@@ -305,6 +130,7 @@ def create_map_html(map_data, custom_markers=None, selected_layer=None, use_embe
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
         <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+        {MARKERS_LOADER}
         <style>
             html, body {{ margin: 0; padding: 0; height: 100%; }}
             #map {{ width: 100%; height: 100%; background: #0d1117; }}
@@ -325,6 +151,15 @@ def create_map_html(map_data, custom_markers=None, selected_layer=None, use_embe
             .leaflet-control-zoom a:hover {{
                 background: rgba(30, 40, 50, 0.95) !important;
             }}
+            .marker-cluster div {{
+                background: rgba(255, 87, 34, 0.85);
+                color: #fff;
+                border: 2px solid #fff;
+                border-radius: 50%;
+                text-align: center;
+                font: bold 12px sans-serif;
+                box-shadow: 0 2px 5px rgba(0,0,0,0.5);
+            }}
             .coords-display {{
                 position: absolute;
                 bottom: 10px;
@@ -358,13 +193,13 @@ def create_map_html(map_data, custom_markers=None, selected_layer=None, use_embe
             }});
             
             // Calcular límites del mapa  
-            var bounds = [[0, 0], [-256, 256]];
+            var bounds = [[0, 0], [-{scheme.world_size}, {scheme.world_size}]];
             
             // Añadir capa de tiles del juego real
             L.tileLayer('{tile_url}', {{
                 minZoom: {map_data['minZoom']},
                 maxZoom: {map_data['maxZoom']},
-                maxNativeZoom: {map_data['maxNativeZoom']},
+                maxNativeZoom: {max_native_zoom},
                 tileSize: tileSize,
                 noWrap: true,
                 bounds: bounds,
@@ -375,11 +210,11 @@ def create_map_html(map_data, custom_markers=None, selected_layer=None, use_embe
             map.setView([-128, 128], 2);
             map.setMaxBounds([[-300, -50], [50, 306]]);
             
-            // Capa para marcadores
-            var markersLayer = L.layerGroup().addTo(map);
-            
-            // Añadir marcadores de POIs
-            {markers_js}
+            // Marcadores y clusters por zoom (JSON de marker_payload, ver map_markers.js)
+            var markersLayer = addMarkerLayer(map, {markers}, {{
+                minZoom: {map_data['minZoom']},
+                maxZoom: {map_data['maxZoom']}
+            }});
             
             // Mostrar coordenadas del juego al hacer click
             var coordsDisplay = document.getElementById('coords');
@@ -402,6 +237,11 @@ def create_map_html(map_data, custom_markers=None, selected_layer=None, use_embe
     """
     return html
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_map_html(map_id, selected_layer, marker_version, use_embedded_site, tile_server, _custom_markers):
+    """HTML del mapa, uno por (mapa, capa, versión de los marcadores) y origen de tiles"""
+    return create_map_html(MAPS_DATA[map_id], _custom_markers, selected_layer, use_embedded_site, tile_server)
+
 # Inicializar estado de sesión
 if "custom_markers" not in st.session_state:
     st.session_state.custom_markers = load_custom_markers()
@@ -523,6 +363,9 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("### ⚙️ Opciones")
     use_embedded = st.checkbox("📺 Usar mapa embebido (arcraidersmaps.app)", value=True, help="Si los tiles no cargan, usa el sitio original embebido")
+    use_local_tiles = False
+    if TILE_SERVER_URL:
+        use_local_tiles = st.checkbox("🖥️ Tiles del servidor local", value=True, help=f"tile_server.py en {TILE_SERVER_URL}")
     
     st.markdown("---")
     st.markdown("### 📊 Estadísticas")
@@ -572,6 +415,9 @@ with st.sidebar:
             col1, col2 = st.columns([4, 1])
             with col1:
                 st.caption(f"📍 **{marker['name']}** ({marker['x']}, {marker['y']})")
+                nearby = SPATIAL.within(selected_map, (marker["x"], marker["y"]), NEARBY_RADIUS)
+                if nearby:
+                    st.caption("↳ " + ", ".join(f"{poi['title']} ({dist:.0f})" for poi, dist in nearby[:3]))
             with col2:
                 if st.button("🗑️", key=f"del_{i}"):
                     st.session_state.custom_markers[selected_map].pop(i)
@@ -585,7 +431,8 @@ map_data = MAPS_DATA[st.session_state.selected_map]
 custom_markers = st.session_state.custom_markers.get(st.session_state.selected_map, [])
 
 # Mapa a pantalla completa (calc: 100vh - margen mínimo)
-map_html = create_map_html(map_data, custom_markers, selected_layer, use_embedded_site=use_embedded)
+map_html = cached_map_html(map_data["id"], selected_layer, markers_version(custom_markers), use_embedded,
+                           TILE_SERVER_URL if use_local_tiles else None, custom_markers)
 components.html(map_html, height=950, scrolling=False)
 
 # Lista de marcadores movida al sidebar para ahorrar espacio
@@ -4,12 +4,7 @@ ARC Raiders Interactive Map + AI Search
 
 import streamlit as st
 import streamlit.components.v1 as components
-import json
-import os
-
-# Ruta absoluta al archivo de items
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-ITEMS_FILE = os.path.join(SCRIPT_DIR, "items_data.json")
+from arc_core import MAPGENIE_MAPS, GameData, MAP_URLS, get_game_data
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURACIÓN
@@ -22,124 +17,24 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Cargar items
-@st.cache_data
-def load_items():
-    try:
-        with open(ITEMS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        st.error(f"Error cargando items: {e}")
-        return []
-
-GAME_ITEMS = load_items()
+# Cargar items (una sola vez por proceso, compartido entre sesiones)
+try:
+    GAME = get_game_data()
+except Exception as e:
+    st.error(f"Error cargando items: {e}")
+    GAME = GameData([])
 
-# Traducciones ES -> EN
-TRANS = {
-    "bateria": "battery", "baterias": "battery", "pila": "battery", "pilas": "battery",
-    "energia": "power", "electrico": "electrical", "electricidad": "electrical",
-    "mecanico": "mechanical", "medico": "medical", "medicina": "medical",
-    "arma": "weapon", "municion": "ammo", "vendaje": "bandage",
-    "componente": "component", "cable": "cable", "chatarra": "scrap",
-}
+GAME_ITEMS = GAME.items
 
-# POIs por mapa
-MAPS = {
-    "dam": {
-        "name": "Dam Battlegrounds",
-        "pois": [
-            {"title": "Power Generation Complex", "types": ["industrial", "electrical"]},
-            {"title": "Electrical Substation", "types": ["electrical"]},
-            {"title": "Water Treatment", "types": ["industrial", "mechanical"]},
-            {"title": "Testing Annex", "types": ["medical", "commercial"]},
-            {"title": "Research & Administration", "types": ["technological"]},
-            {"title": "Old Battlegrounds", "types": ["ARC"]},
-            {"title": "Primary Facility", "types": ["mechanical", "industrial"]},
-            {"title": "Scrap Yard", "types": ["mechanical", "industrial"]},
-            {"title": "Pale Apartments", "types": ["residential"]},
-            {"title": "Ruby Residence", "types": ["residential"]},
-            {"title": "Hydrophonic Dome", "types": ["nature"]},
-        ]
-    },
-    "spaceport": {
-        "name": "The Spaceport",
-        "pois": [
-            {"title": "Fuel Control", "types": ["mechanical", "electrical"]},
-            {"title": "Rocket Assembly", "types": ["ARC", "industrial"]},
-            {"title": "Shipping Warehouse", "types": ["industrial", "mechanical"]},
-            {"title": "Container Storage", "types": ["industrial"]},
-            {"title": "Vehicle Maintenance", "types": ["mechanical"]},
-            {"title": "Departure Building", "types": ["commercial"]},
-        ]
-    },
-    "buried-city": {
-        "name": "Buried City",
-        "pois": [
-            {"title": "Hospital", "types": ["medical"]},
-            {"title": "Research", "types": ["medical", "technological"]},
-            {"title": "Parking Garage", "types": ["mechanical"]},
-            {"title": "Outskirts", "types": ["industrial", "mechanical"]},
-            {"title": "Galleria", "types": ["commercial"]},
-            {"title": "Grandioso Apartments", "types": ["residential"]},
-            {"title": "Marano Park", "types": ["nature"]},
-        ]
-    },
-}
+# Mapas disponibles (los que tienen versión en MapGenie)
+MAPS = MAPGENIE_MAPS
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # BÚSQUEDA
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def normalize(text):
-    text = text.lower().strip()
-    for a, b in [('á','a'),('é','e'),('í','i'),('ó','o'),('ú','u'),('ñ','n')]:
-        text = text.replace(a, b)
-    return text
-
-def search_items(query):
-    q = normalize(query)
-    terms = {q}
-    
-    # Agregar traducción
-    if q in TRANS:
-        terms.add(TRANS[q])
-    for word in q.split():
-        if word in TRANS:
-            terms.add(TRANS[word])
-        terms.add(word)
-    
-    results = []
-    for item in GAME_ITEMS:
-        name = item.get("name", "").lower()
-        desc = item.get("description", "").lower()
-        
-        score = 0
-        for t in terms:
-            if t in name:
-                score += 10
-            if t in desc:
-                score += 3
-        
-        if score > 0:
-            results.append((score, item))
-    
-    results.sort(key=lambda x: -x[0])
-    return [item for _, item in results[:10]]
-
-def get_locations(item, map_id):
-    found_in = [f.lower() for f in item.get("foundIn", [])]
-    if not found_in:
-        return []
-    
-    pois = MAPS.get(map_id, {}).get("pois", [])
-    matches = []
-    for poi in pois:
-        poi_types = [t.lower() for t in poi.get("types", [])]
-        for f in found_in:
-            if f in poi_types:
-                matches.append(poi["title"])
-                break
-    return matches
+search_items = GAME.search_items
+get_locations_batch = GAME.get_locations_batch
 
 def do_search(query, map_id):
     items = search_items(query)
@@ -152,7 +47,8 @@ def do_search(query, map_id):
     
     emojis = {"common": "⚪", "uncommon": "🟢", "rare": "🔵", "epic": "🟣", "legendary": "🟡"}
     
-    for item in items[:6]:
+    page = items[:6]
+    for item, locs in zip(page, get_locations_batch(page, map_id)):
         e = emojis.get(item.get("rarity"), "⚪")
         response += f"{e} **{item['name']}**"
         
@@ -160,7 +56,6 @@ def do_search(query, map_id):
         if found_in:
             response += f" → _{', '.join(found_in)}_"
         
-        locs = get_locations(item, map_id)
         if locs:
             all_locs.extend(locs)
             response += f"\n   📍 {', '.join(locs[:3])}"
@@ -220,13 +115,6 @@ if "last_result" not in st.session_state:
 if "last_locs" not in st.session_state:
     st.session_state.last_locs = []
 
-# Mapas de MapGenie
-MAP_URLS = {
-    "dam": "https://mapgenie.io/arc-raiders/maps/dam-battlegrounds",
-    "spaceport": "https://mapgenie.io/arc-raiders/maps/the-spaceport",
-    "buried-city": "https://mapgenie.io/arc-raiders/maps/buried-city"
-}
-
 # ═══════════════════════════════════════════════════════════════════════════════
 # SIDEBAR
 # ═══════════════════════════════════════════════════════════════════════════════
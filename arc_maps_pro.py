@@ -4,18 +4,18 @@ ARC Raiders Maps Pro - Interactive Map + AI Chat + Crafteo + Rutas
 
 import streamlit as st
 import streamlit.components.v1 as components
-import json
 import os
-from openai import OpenAI
+import sqlite3
 from dotenv import load_dotenv
+from arc_core import (MAPGENIE_MAPS, CraftingEngine, GameData, HistoryManager, MAP_URLS, RECIPES,
+                      ResponseCache, chat_completion_deltas, collect_stream, context_hash, get_game_data,
+                      get_llm_client, get_system_prompt, normalize, parse_inventory)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURACIÓN
 # ═══════════════════════════════════════════════════════════════════════════════
 
 load_dotenv()
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-ITEMS_FILE = os.path.join(SCRIPT_DIR, "items_data.json")
 
 st.set_page_config(
     page_title="ARC Raiders Maps Pro",
@@ -24,256 +24,65 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Cliente OpenAI
+# Cliente OpenAI (compartido: pool, reintentos y concurrencia acotada;
+# OPENAI_BASE_URL permite usar mock_openai_server.py)
 @st.cache_resource
 def get_openai_client():
     api_key = os.getenv("OPENAI_API_KEY")
     if api_key:
-        return OpenAI(api_key=api_key)
+        return get_llm_client(api_key)
     return None
 
 client = get_openai_client()
 
-# Cargar items
-@st.cache_data
-def load_items():
+# Caché de respuestas de la IA (SQLite, compartida entre sesiones)
+@st.cache_resource
+def get_response_cache():
     try:
-        with open(ITEMS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        st.error(f"Error cargando items: {e}")
-        return []
+        return ResponseCache()
+    except sqlite3.Error:
+        # Sin disco escribible se pregunta siempre a la IA
+        return None
 
-GAME_ITEMS = load_items()
+response_cache = get_response_cache()
 
-# Crear índice de items por nombre
-@st.cache_data
-def create_items_index():
-    return {item["name"].lower(): item for item in GAME_ITEMS}
+# Cargar items (una sola vez por proceso, compartido entre sesiones)
+try:
+    GAME = get_game_data()
+except Exception as e:
+    st.error(f"Error cargando items: {e}")
+    GAME = GameData([])
 
-ITEMS_INDEX = create_items_index()
+GAME_ITEMS = GAME.items
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # DATOS DEL JUEGO
 # ═══════════════════════════════════════════════════════════════════════════════
 
-# Traducciones ES -> EN
-TRANS = {
-    "bateria": "battery", "baterias": "battery", "pila": "battery", "pilas": "battery",
-    "energia": "power", "electrico": "electrical", "electricidad": "electrical",
-    "mecanico": "mechanical", "medico": "medical", "medicina": "medical",
-    "arma": "weapon", "municion": "ammo", "vendaje": "bandage",
-    "componente": "component", "cable": "cable", "chatarra": "scrap",
-    "quimico": "chemical", "plastico": "plastic", "metal": "metal",
-    "tela": "cloth", "pegamento": "adhesive", "cinta": "tape",
-}
-
-# POIs por mapa con coordenadas aproximadas para rutas
-MAPS = {
-    "dam": {
-        "name": "Dam Battlegrounds",
-        "pois": [
-            {"title": "Power Generation Complex", "types": ["industrial", "electrical"], "x": 45, "y": 30},
-            {"title": "Electrical Substation", "types": ["electrical"], "x": 55, "y": 25},
-            {"title": "Water Treatment", "types": ["industrial", "mechanical"], "x": 35, "y": 45},
-            {"title": "Testing Annex", "types": ["medical", "commercial"], "x": 60, "y": 50},
-            {"title": "Research & Administration", "types": ["technological"], "x": 50, "y": 55},
-            {"title": "Old Battlegrounds", "types": ["ARC"], "x": 40, "y": 65},
-            {"title": "Primary Facility", "types": ["mechanical", "industrial"], "x": 30, "y": 40},
-            {"title": "Scrap Yard", "types": ["mechanical", "industrial"], "x": 65, "y": 35},
-            {"title": "Pale Apartments", "types": ["residential"], "x": 25, "y": 55},
-            {"title": "Ruby Residence", "types": ["residential"], "x": 70, "y": 60},
-            {"title": "Hydrophonic Dome", "types": ["nature"], "x": 50, "y": 70},
-        ]
-    },
-    "spaceport": {
-        "name": "The Spaceport",
-        "pois": [
-            {"title": "Fuel Control", "types": ["mechanical", "electrical"], "x": 40, "y": 30},
-            {"title": "Rocket Assembly", "types": ["ARC", "industrial"], "x": 55, "y": 25},
-            {"title": "Shipping Warehouse", "types": ["industrial", "mechanical"], "x": 45, "y": 45},
-            {"title": "Container Storage", "types": ["industrial"], "x": 60, "y": 40},
-            {"title": "Vehicle Maintenance", "types": ["mechanical"], "x": 35, "y": 55},
-            {"title": "Departure Building", "types": ["commercial"], "x": 50, "y": 60},
-        ]
-    },
-    "buried-city": {
-        "name": "Buried City",
-        "pois": [
-            {"title": "Hospital", "types": ["medical"], "x": 45, "y": 35},
-            {"title": "Research", "types": ["medical", "technological"], "x": 55, "y": 30},
-            {"title": "Parking Garage", "types": ["mechanical"], "x": 40, "y": 50},
-            {"title": "Outskirts", "types": ["industrial", "mechanical"], "x": 30, "y": 45},
-            {"title": "Galleria", "types": ["commercial"], "x": 60, "y": 55},
-            {"title": "Grandioso Apartments", "types": ["residential"], "x": 50, "y": 65},
-            {"title": "Marano Park", "types": ["nature"], "x": 65, "y": 40},
-        ]
-    },
-}
-
-# URLs de MapGenie
-MAP_URLS = {
-    "dam": "https://mapgenie.io/arc-raiders/maps/dam-battlegrounds",
-    "spaceport": "https://mapgenie.io/arc-raiders/maps/the-spaceport",
-    "buried-city": "https://mapgenie.io/arc-raiders/maps/buried-city"
-}
-
-# Sistema de Crafteo - Recetas conocidas
-RECIPES = {
-    "bandage": {
-        "name": "Bandage",
-        "materials": [("Cloth", 2)],
-        "category": "medical",
-        "description": "Cura heridas menores"
-    },
-    "medkit": {
-        "name": "Medkit", 
-        "materials": [("Bandage", 2), ("Chemical", 1)],
-        "category": "medical",
-        "description": "Restaura una cantidad moderada de salud"
-    },
-    "advanced_medkit": {
-        "name": "Advanced Medkit",
-        "materials": [("Medkit", 1), ("Advanced Medical Components", 1)],
-        "category": "medical",
-        "description": "Restaura gran cantidad de salud"
-    },
-    "basic_electrical_components": {
-        "name": "Basic Electrical Components",
-        "materials": [("Cable", 2), ("Battery", 1)],
-        "category": "electrical",
-        "description": "Componente básico para crafting eléctrico"
-    },
-    "basic_mechanical_components": {
-        "name": "Basic Mechanical Components",
-        "materials": [("Scrap Metal", 2), ("Adhesive", 1)],
-        "category": "mechanical",
-        "description": "Componente básico para crafting mecánico"
-    },
-    "shield_booster": {
-        "name": "Shield Booster",
-        "materials": [("Basic Electrical Components", 2), ("ARC Powercell", 1)],
-        "category": "utility",
-        "description": "Aumenta la regeneración de escudo temporalmente"
-    },
-    "stamina_booster": {
-        "name": "Stamina Booster",
-        "materials": [("Agave", 2), ("Chemical", 1)],
-        "category": "utility",
-        "description": "Aumenta la regeneración de stamina"
-    },
-    "emp_grenade": {
-        "name": "EMP Grenade",
-        "materials": [("Advanced Electrical Components", 1), ("Battery", 2), ("Explosive", 1)],
-        "category": "weapon",
-        "description": "Desactiva robots y drones temporalmente"
-    },
-}
+# Mapas disponibles (los que tienen versión en MapGenie)
+MAPS = MAPGENIE_MAPS
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # FUNCIONES DE BÚSQUEDA
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def normalize(text):
-    text = text.lower().strip()
-    for a, b in [('á','a'),('é','e'),('í','i'),('ó','o'),('ú','u'),('ñ','n')]:
-        text = text.replace(a, b)
-    return text
-
-def search_items(query, limit=10):
-    q = normalize(query)
-    terms = {q}
-    
-    if q in TRANS:
-        terms.add(TRANS[q])
-    for word in q.split():
-        if word in TRANS:
-            terms.add(TRANS[word])
-        terms.add(word)
-    
-    results = []
-    for item in GAME_ITEMS:
-        name = item.get("name", "").lower()
-        desc = item.get("description", "").lower()
-        item_type = item.get("type", "").lower()
-        
-        score = 0
-        for t in terms:
-            if t in name:
-                score += 10
-            if t in desc:
-                score += 3
-            if t in item_type:
-                score += 5
-        
-        if score > 0:
-            results.append((score, item))
-    
-    results.sort(key=lambda x: -x[0])
-    return [item for _, item in results[:limit]]
-
-def get_locations(item, map_id):
-    found_in = [f.lower() for f in item.get("foundIn", [])]
-    if not found_in:
-        return []
-    
-    pois = MAPS.get(map_id, {}).get("pois", [])
-    matches = []
-    for poi in pois:
-        poi_types = [t.lower() for t in poi.get("types", [])]
-        for f in found_in:
-            if f in poi_types:
-                matches.append(poi["title"])
-                break
-    return matches
+search_items = GAME.search_items
+get_locations_batch = GAME.get_locations_batch
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # SISTEMA DE CRAFTEO
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Orden topológico y materiales base por unidad, calculados una vez
+CRAFTING = CraftingEngine(RECIPES)
+
 def get_recipe_tree(recipe_id, quantity=1, depth=0):
     """Obtiene árbol completo de materiales necesarios"""
-    if recipe_id not in RECIPES:
-        return None
-    
-    recipe = RECIPES[recipe_id]
-    tree = {
-        "name": recipe["name"],
-        "quantity": quantity,
-        "materials": [],
-        "depth": depth
-    }
-    
-    for mat_name, mat_qty in recipe["materials"]:
-        mat_id = mat_name.lower().replace(" ", "_")
-        if mat_id in RECIPES and depth < 3:
-            subtree = get_recipe_tree(mat_id, mat_qty * quantity, depth + 1)
-            if subtree:
-                tree["materials"].append(subtree)
-            else:
-                tree["materials"].append({"name": mat_name, "quantity": mat_qty * quantity, "base": True})
-        else:
-            tree["materials"].append({"name": mat_name, "quantity": mat_qty * quantity, "base": True})
-    
-    return tree
+    return CRAFTING.recipe_tree(recipe_id, quantity, depth)
 
 def calculate_base_materials(recipe_id, quantity=1):
     """Calcula materiales base totales necesarios"""
-    base_mats = {}
-    
-    def collect(tree):
-        if tree.get("base"):
-            name = tree["name"]
-            base_mats[name] = base_mats.get(name, 0) + tree["quantity"]
-        else:
-            for mat in tree.get("materials", []):
-                collect(mat)
-    
-    tree = get_recipe_tree(recipe_id, quantity)
-    if tree:
-        collect(tree)
-    
-    return base_mats
+    return CRAFTING.base_materials(recipe_id, quantity)
 
 def format_recipe(recipe_id):
     """Formatea una receta para mostrar"""
@@ -308,97 +117,84 @@ def find_recipe_by_name(query):
 # RUTAS DE FARMEO
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def calculate_farming_route(map_id, target_type):
-    """Calcula ruta óptima para farmear un tipo de recurso"""
-    pois = MAPS.get(map_id, {}).get("pois", [])
-    relevant = []
-    
-    for poi in pois:
-        types = [t.lower() for t in poi.get("types", [])]
-        if target_type.lower() in types:
-            relevant.append(poi)
+def calculate_farming_route(map_id, target_type, start=None, end=None):
+    """Calcula ruta óptima para farmear uno o varios tipos de recurso"""
+    route, _ = GAME.routes.plan(map_id, target_type, start, end)
     
-    if not relevant:
+    if not route:
         return None, []
     
-    # Ordenar por proximidad (greedy nearest neighbor)
-    if len(relevant) > 1:
-        route = [relevant[0]]
-        remaining = relevant[1:]
-        
-        while remaining:
-            last = route[-1]
-            nearest = min(remaining, key=lambda p: 
-                ((p["x"] - last["x"])**2 + (p["y"] - last["y"])**2)**0.5)
-            route.append(nearest)
-            remaining.remove(nearest)
-        
-        return route, relevant
-    
-    return relevant, relevant
+    return route, list(route)
 
 def get_best_map_for_type(target_type):
     """Encuentra el mejor mapa para un tipo de recurso"""
-    results = []
-    
-    for map_id, map_data in MAPS.items():
-        count = sum(1 for poi in map_data["pois"] 
-                   if target_type.lower() in [t.lower() for t in poi.get("types", [])])
-        if count > 0:
-            results.append((map_data["name"], count, map_id))
-    
-    results.sort(key=lambda x: -x[1])
-    return results
+    return GAME.locations.best_maps_for_type(target_type, MAPS)
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# CHAT IA
+# RESPUESTAS LOCALES (sin IA)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def build_context():
-    """Construye contexto del juego para la IA"""
-    items_summary = []
-    for item in GAME_ITEMS[:100]:  # Top 100 items
-        found = ", ".join(item.get("foundIn", [])) or "unknown"
-        items_summary.append(f"- {item['name']} ({item.get('rarity', 'common')}): {found}")
-    
-    recipes_summary = []
-    for rid, recipe in RECIPES.items():
-        mats = ", ".join([f"{q}x {n}" for n, q in recipe["materials"]])
-        recipes_summary.append(f"- {recipe['name']}: necesita {mats}")
+def answer_locally(user_message, current_map):
+    """Responde las preguntas sencillas con las funciones de la app (None si hace falta la IA)"""
+    intent = GAME.intents_for(MAPS).classify(user_message)
+    if intent is None:
+        return None
     
-    maps_summary = []
-    for mid, mdata in MAPS.items():
-        pois = ", ".join([p["title"] for p in mdata["pois"][:5]])
-        maps_summary.append(f"- {mdata['name']}: {pois}...")
+    if intent.name == "recipe":
+        return format_recipe(intent.slots["recipe"])
+    
+    target_type = intent.slots["type"]
+    if intent.name == "best_map":
+        best = get_best_map_for_type(target_type)
+        if not best:
+            return f"No hay ubicaciones de tipo '{target_type}' en los mapas disponibles."
+        output = f"### 🏆 Mejores mapas para {target_type}\n"
+        for i, (name, count, _) in enumerate(best, 1):
+            output += f"{i}. **{name}** — {count} ubicaciones\n"
+        return output
+    
+    if intent.name == "route":
+        map_id = intent.slots["map"] or current_map
+        map_name = MAPS.get(map_id, {}).get("name", map_id)
+        route, _ = calculate_farming_route(map_id, target_type)
+        if not route:
+            return f"No hay ubicaciones de tipo '{target_type}' en {map_name}."
+        output = f"### 🗺️ Ruta de {target_type} en {map_name}\n"
+        for i, poi in enumerate(route, 1):
+            output += f"{i}. {poi['title']}\n"
+        return output
     
-    return f"""Eres un asistente experto de ARC Raiders, un videojuego de supervivencia cooperativo.
-
-MAPAS DISPONIBLES:
-{chr(10).join(maps_summary)}
-
-TIPOS DE UBICACIONES: electrical, mechanical, medical, industrial, residential, commercial, nature, ARC, technological
-
-ALGUNOS ITEMS ({len(GAME_ITEMS)} totales):
-{chr(10).join(items_summary[:30])}
-
-RECETAS DE CRAFTEO:
-{chr(10).join(recipes_summary)}
+    return None
 
-REGLAS:
-1. Responde en español
-2. Sé conciso y directo
-3. Da recomendaciones específicas de ubicaciones
-4. Si preguntan por crafteo, detalla los materiales
-5. Para farmeo, sugiere rutas eficientes
-6. Si no sabes algo, dilo honestamente
-7. Tienes acceso a información actualizada del juego hasta tu fecha de entrenamiento"""
+# ═══════════════════════════════════════════════════════════════════════════════
+# CHAT IA
+# ═══════════════════════════════════════════════════════════════════════════════
 
-def chat_with_ai(user_message, history, current_map):
-    """Genera respuesta de IA conversacional"""
+def build_context():
+    """Contexto del juego para la IA (construido una vez, se rehace si cambian los datos)"""
+    return get_system_prompt(GAME_ITEMS, RECIPES, MAPS)[0]
+
+# Historial recortado a un presupuesto de tokens, con resumen de lo anterior
+HISTORY = HistoryManager(budget=1200)
+
+def chat_with_ai_stream(user_message, history, current_map, history_state=None, status=None, relevant=None):
+    """Genera respuesta de IA conversacional, trozo a trozo según llega.
+
+    Los errores se devuelven como texto para mostrarlos en el chat; si se
+    pasa `status` (dict), además se marca status["error"] = True.
+    `relevant` es el contexto ya recuperado para la pregunta (si no, se
+    recupera aquí).
+    """
+    status = {} if status is None else status
+    status["error"] = False
     if not client:
-        return "❌ API key de OpenAI no configurada. Añade OPENAI_API_KEY al archivo .env"
+        status["error"] = True
+        yield "❌ API key de OpenAI no configurada. Añade OPENAI_API_KEY al archivo .env"
+        return
     
     try:
+        # El prompt estático va primero y siempre idéntico (caché de prefijos
+        # del proveedor); lo que cambia por mensaje va detrás
         messages = [{"role": "system", "content": build_context()}]
         
         # Agregar contexto del mapa actual
@@ -408,23 +204,89 @@ def chat_with_ai(user_message, history, current_map):
             "content": f"El usuario está viendo el mapa: {map_name}"
         })
         
-        # Historial de conversación
-        for msg in history[-6:]:  # Últimos 6 mensajes
-            messages.append(msg)
+        # Historial de conversación (lo que no cabe va resumido)
+        messages.extend(HISTORY.prepare(history, {} if history_state is None else history_state))
+        
+        # Items, recetas y POIs relevantes para esta pregunta (BM25 local)
+        if relevant is None:
+            relevant = GAME.retriever_for(MAPS).format_context(user_message)
+        if relevant:
+            messages.append({"role": "system", "content": relevant})
         
         messages.append({"role": "user", "content": user_message})
         
-        response = client.chat.completions.create(
+        yield from chat_completion_deltas(
+            client,
             model="gpt-4o-mini",
             messages=messages,
             max_tokens=600,
             temperature=0.7
         )
-        
-        return response.choices[0].message.content
     
     except Exception as e:
-        return f"❌ Error de IA: {str(e)}"
+        status["error"] = True
+        yield f"❌ Error de IA: {str(e)}"
+
+def chat_with_ai(user_message, history, current_map, history_state=None):
+    """Genera respuesta de IA conversacional (completa)"""
+    return "".join(chat_with_ai_stream(user_message, history, current_map, history_state))
+
+def stop_streaming():
+    """Guarda lo recibido hasta ahora cuando el usuario para la respuesta"""
+    partial = st.session_state.get("streaming_partial")
+    if partial is not None:
+        st.session_state.chat_history.append({"role": "assistant", "content": partial + " _(respuesta detenida)_"})
+        st.session_state.streaming_partial = None
+
+def stream_chat_reply(user_message):
+    """Escribe la respuesta en la página según llegan los tokens (o la saca de la caché)"""
+    current_map = st.session_state.current_map
+    
+    # Preguntas sencillas: respuesta local inmediata, sin llamar a la IA
+    local = answer_locally(user_message, current_map)
+    if local:
+        st.session_state.chat_history.append({"role": "user", "content": user_message})
+        st.session_state.chat_history.append({"role": "assistant", "content": local + "\n\n_⚡ Respuesta local_"})
+        st.rerun()
+    
+    # Solo se cachea la primera pregunta de la conversación: las siguientes
+    # se responden con el historial, que no forma parte de la clave
+    cacheable = response_cache is not None and not st.session_state.chat_history
+    # Datos recuperados para la pregunta: una sola búsqueda para la clave y el prompt
+    relevant = GAME.retriever_for(MAPS).format_context(user_message)
+    cached = None
+    if cacheable:
+        # Hash del contexto completo: prompt estático + datos recuperados
+        digest = context_hash(build_context() + relevant)
+        cached = response_cache.get(user_message, current_map, digest)
+    
+    st.session_state.chat_history.append({"role": "user", "content": user_message})
+    if cached is not None:
+        st.session_state.chat_history.append({"role": "assistant", "content": cached})
+        st.rerun()
+    
+    st.session_state.streaming_partial = ""
+    
+    st.markdown(f'<div class="chat-user">{user_message}</div>', unsafe_allow_html=True)
+    placeholder = st.empty()
+    st.button("⏹️ Detener", key="btn_stop", on_click=stop_streaming, use_container_width=True)
+    
+    def show(text):
+        st.session_state.streaming_partial = text
+        placeholder.markdown(f'<div class="chat-ai">{text}▌</div>', unsafe_allow_html=True)
+    
+    status = {}
+    response, completed = collect_stream(
+        chat_with_ai_stream(user_message, st.session_state.chat_history[:-1], current_map,
+                            st.session_state.chat_summary, status, relevant),
+        on_text=show,
+    )
+    st.session_state.streaming_partial = None
+    # Solo respuestas completas y sin error (una cortada no se repite como si fuera entera)
+    if cacheable and response and completed and not status["error"]:
+        response_cache.put(user_message, current_map, digest, response)
+    st.session_state.chat_history.append({"role": "assistant", "content": response})
+    st.rerun()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CSS - Layout optimizado sin conflictos
@@ -559,6 +421,8 @@ if "current_map" not in st.session_state:
     st.session_state.current_map = "dam"
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+if "chat_summary" not in st.session_state:
+    st.session_state.chat_summary = {}
 if "favorites" not in st.session_state:
     st.session_state.favorites = []
 if "search_history" not in st.session_state:
@@ -605,10 +469,11 @@ with st.sidebar:
                     st.markdown(f"**{len(items)} resultados:**")
                     emojis = {"common": "⚪", "uncommon": "🟢", "rare": "🔵", "epic": "🟣", "legendary": "🟡"}
                     
-                    for item in items[:8]:
+                    page = items[:8]
+                    page_locs = get_locations_batch(page, st.session_state.current_map)
+                    for item, locs in zip(page, page_locs):
                         e = emojis.get(item.get("rarity"), "⚪")
                         found = item.get("foundIn", [])
-                        locs = get_locations(item, st.session_state.current_map)
                         
                         with st.container():
                             col1, col2 = st.columns([4, 1])
@@ -664,6 +529,10 @@ with st.sidebar:
             st.warning("⚠️ Configura OPENAI_API_KEY en .env")
         else:
             st.caption("Pregunta sobre items, crafteo, ubicaciones...")
+            if response_cache is not None:
+                stats = response_cache.stats()
+                st.caption(f"⚡ Caché: {stats['hits']} aciertos · {stats['misses']} fallos · "
+                           f"{stats['entries']} respuestas guardadas")
             
             # Mostrar historial
             chat_container = st.container()
@@ -681,20 +550,14 @@ with st.sidebar:
             with col1:
                 if st.button("💬 Enviar", use_container_width=True, key="btn_send"):
                     if user_input:
-                        # Agregar mensaje usuario
-                        st.session_state.chat_history.append({"role": "user", "content": user_input})
-                        
-                        # Obtener respuesta
-                        with st.spinner("Pensando..."):
-                            response = chat_with_ai(user_input, st.session_state.chat_history, 
-                                                   st.session_state.current_map)
-                        
-                        st.session_state.chat_history.append({"role": "assistant", "content": response})
-                        st.rerun()
+                        # Respuesta en streaming bajo el historial
+                        with chat_container:
+                            stream_chat_reply(user_input)
             
             with col2:
                 if st.button("🗑️ Limpiar", use_container_width=True, key="btn_clear_chat"):
                     st.session_state.chat_history = []
+                    st.session_state.chat_summary = {}
                     st.rerun()
             
             # Sugerencias rápidas
@@ -706,12 +569,8 @@ with st.sidebar:
             ]
             for sug in suggestions:
                 if st.button(sug, key=f"sug_{hash(sug)}", use_container_width=True):
-                    st.session_state.chat_history.append({"role": "user", "content": sug})
-                    with st.spinner("Pensando..."):
-                        response = chat_with_ai(sug, st.session_state.chat_history, 
-                                               st.session_state.current_map)
-                    st.session_state.chat_history.append({"role": "assistant", "content": response})
-                    st.rerun()
+                    with chat_container:
+                        stream_chat_reply(sug)
     
     # ═══════════════════════════════════════════════════════════════════════
     # TAB: CRAFTEO
@@ -759,18 +618,28 @@ with st.sidebar:
         material = st.text_input("Material:", placeholder="battery, cloth...", key="craft_mat")
         
         if material and st.button("Buscar recetas", key="btn_find_recipes"):
-            mat_lower = material.lower()
-            found_recipes = []
-            for rid, recipe in RECIPES.items():
-                for mat_name, _ in recipe["materials"]:
-                    if mat_lower in mat_name.lower():
-                        found_recipes.append(recipe["name"])
-                        break
+            direct, indirect = CRAFTING.find_recipes_using(material)
             
-            if found_recipes:
-                st.success(f"Puedes craftear: {', '.join(found_recipes)}")
+            if direct:
+                st.success(f"Puedes craftear: {', '.join(RECIPES[rid]['name'] for rid in direct)}")
+                if indirect:
+                    st.caption(f"Como sub-componente: {', '.join(RECIPES[rid]['name'] for rid in indirect)}")
             else:
                 st.info("No se encontraron recetas con ese material")
+        
+        # Inventario completo
+        st.markdown("**🎒 ¿Qué puedo craftear con mi inventario?**")
+        inventory_text = st.text_area("Inventario:", placeholder="4x Cloth\nBattery: 3\nCable 2",
+                                      height=90, key="craft_inventory")
+        
+        if inventory_text and st.button("Calcular", key="btn_inventory"):
+            craftable = CRAFTING.craftable_with(parse_inventory(inventory_text))
+            
+            if craftable:
+                for rid, units in craftable.items():
+                    st.markdown(f"- {units}x {RECIPES[rid]['name']}")
+            else:
+                st.info("Con ese inventario no se puede craftear ninguna receta")
     
     # ═══════════════════════════════════════════════════════════════════════
     # TAB: RUTAS
@@ -782,10 +651,20 @@ with st.sidebar:
         resource_types = ["electrical", "mechanical", "medical", "industrial", 
                          "residential", "commercial", "ARC", "nature"]
         
-        selected_type = st.selectbox("Tipo de recurso:", resource_types)
+        selected_types = st.multiselect("Tipo de recurso:", resource_types, default=resource_types[:1])
+        
+        # Spawn / extracción: el POI más cercano a donde apareces o sales
+        poi_titles = [poi["title"] for poi in MAPS[st.session_state.current_map]["pois"]]
+        col1, col2 = st.columns(2)
+        with col1:
+            start_title = st.selectbox("Inicio:", ["Libre"] + poi_titles, key="route_start")
+        with col2:
+            end_title = st.selectbox("Extracción:", ["Libre"] + poi_titles, key="route_end")
         
-        if st.button("📍 Calcular Ruta", use_container_width=True, key="btn_route"):
-            route, all_pois = calculate_farming_route(st.session_state.current_map, selected_type)
+        if st.button("📍 Calcular Ruta", use_container_width=True, key="btn_route") and selected_types:
+            coords = {poi["title"]: poi["coords"] for poi in MAPS[st.session_state.current_map]["pois"]}
+            route, all_pois = calculate_farming_route(st.session_state.current_map, selected_types,
+                                                      coords.get(start_title), coords.get(end_title))
             
             if route:
                 st.success(f"✅ {len(route)} ubicaciones encontradas")
@@ -796,13 +675,13 @@ with st.sidebar:
                                unsafe_allow_html=True)
                 
                 # Items relacionados
-                related = search_items(selected_type, limit=5)
+                related = search_items(" ".join(selected_types), limit=5)
                 if related:
                     st.markdown("**📦 Items típicos:**")
                     for item in related[:3]:
                         st.caption(f"• {item['name']}")
             else:
-                st.warning(f"No hay ubicaciones de tipo '{selected_type}' en este mapa")
+                st.warning(f"No hay ubicaciones de tipo '{', '.join(selected_types)}' en este mapa")
         
         st.markdown("---")
         st.markdown("**🏆 Mejor mapa para...**")
@@ -1,7 +1,7 @@
 import streamlit as st
 import os
-import base64
-from openai import OpenAI
+from arc_core import (HistoryManager, IconIndex, collect_stream, data_url, get_game_data, get_llm_client, is_inventory,
+                      prepare_image, response_deltas)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # BASE DE DATOS DE INTELIGENCIA - ARC RAIDERS
@@ -245,21 +245,73 @@ with st.sidebar:
     st.markdown("---")
     if st.button("🗑️ Limpiar Conversación"):
         st.session_state.messages = []
+        st.session_state.history_summary = {}
+        st.session_state.sent_images = set()
         st.rerun()
 
 if not api_key:
     st.info("👈 Por favor, configura tu API Key en la barra lateral para iniciar la transmisión.")
     st.stop()
 
-client = OpenAI(api_key=api_key)
+# Cliente compartido entre reruns y sesiones (no uno nuevo por rerun)
+client = get_llm_client(api_key)
 
 # --- Estado de la sesión (Historial del Chat) ---
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "history_summary" not in st.session_state:
+    st.session_state.history_summary = {}
+# Hashes de las imágenes ya enviadas en esta conversación
+if "sent_images" not in st.session_state:
+    st.session_state.sent_images = set()
+
+# Historial enviado a la API: recortado a un presupuesto de tokens,
+# lo más antiguo se manda resumido
+HISTORY = HistoryManager(budget=3000)
 
 # --- Funciones de utilidad ---
-def encode_image(uploaded_file):
-    return base64.b64encode(uploaded_file.getvalue()).decode('utf-8')
+@st.cache_data(max_entries=16, show_spinner=False)
+def prepare_upload(data):
+    """Imagen reducida y recodificada (una vez por contenido)"""
+    return prepare_image(data)
+
+@st.cache_resource
+def load_icon_index():
+    """Hashes de iconos de build_icon_index.py (None si no se ha generado)"""
+    return IconIndex.load()
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def recognize_inventory(data):
+    """Inventario reconocido en local: ([(nombre, cantidad)], celdas sin reconocer)"""
+    index = load_icon_index()
+    if index is None:
+        return [], 0
+    counts, recognized, unknown = index.inventory(data)
+    # Pocas celdas reconocidas: no es un inventario (p. ej. una captura del
+    # mapa con una rejilla aparente); la imagen se analiza con la IA
+    if not is_inventory(recognized, unknown):
+        return [], 0
+    names = {item["id"]: item["name"] for item in get_game_data().items}
+    return sorted((names.get(item_id, item_id), count) for item_id, count in counts.items()), unknown
+
+upload = prepare_upload(uploaded_file.getvalue()) if uploaded_file else None
+detected, unknown_cells = recognize_inventory(uploaded_file.getvalue()) if uploaded_file else ([], 0)
+if detected:
+    st.sidebar.caption(f"🧩 {len(detected)} items reconocidos en local"
+                       + (f", {unknown_cells} celdas sin reconocer" if unknown_cells else ""))
+if upload:
+    size_note = f"{upload.width}×{upload.height}, " if upload.width else ""
+    if upload.digest in st.session_state.sent_images:
+        st.sidebar.caption(f"📸 Imagen ya analizada ({size_note}{len(upload.data) // 1024} KB)")
+    else:
+        st.sidebar.caption(f"📸 Se adjuntará al próximo mensaje ({size_note}{len(upload.data) // 1024} KB)")
+
+def stop_streaming():
+    """Guarda lo recibido hasta ahora cuando el usuario para la respuesta."""
+    partial = st.session_state.get("streaming_partial")
+    if partial is not None:
+        st.session_state.messages.append({"role": "assistant", "content": partial + " _(respuesta detenida)_"})
+        st.session_state.streaming_partial = None
 
 # --- Mostrar Historial de Chat ---
 for message in st.session_state.messages:
@@ -297,45 +349,65 @@ INSTRUCCIONES:
                 {"role": "system", "content": system_prompt}
             ]
             
-            # Añadir historial
-            for msg in st.session_state.messages[:-1]:
+            # Añadir historial (dentro del presupuesto de tokens)
+            for msg in HISTORY.prepare(st.session_state.messages[:-1], st.session_state.history_summary):
                 input_messages.append({"role": msg["role"], "content": msg["content"]})
             
             # Añadir mensaje actual
             user_query = f"Busca información sobre ARC Raiders para responder esta pregunta: {prompt}"
             
-            # Si hay imagen, usamos formato especial
-            if uploaded_file:
-                base64_image = encode_image(uploaded_file)
+            # Imagen nueva: cada imagen se envía una sola vez y su análisis
+            # queda en el historial
+            new_image = bool(upload) and upload.digest not in st.session_state.sent_images
+            send_image = new_image
+
+            # Inventario reconocido en local: si se reconocieron todas las
+            # celdas basta con el texto y la imagen no se envía
+            if detected and new_image:
+                lines = "\n".join(f"- {name} x{count}" for name, count in detected)
+                user_query += f"\n\nINVENTARIO DETECTADO EN LA CAPTURA (reconocido localmente):\n{lines}"
+                if not unknown_cells:
+                    send_image = False
+
+            if send_image:
                 input_messages.append({
                     "role": "user", 
                     "content": [
                         {"type": "input_text", "text": user_query},
-                        {"type": "input_image", "image_url": f"data:image/jpeg;base64,{base64_image}"}
+                        {"type": "input_image", "image_url": data_url(upload)}
                     ]
                 })
                 st.toast("Imagen adjuntada al análisis.", icon="📸")
             else:
                 input_messages.append({"role": "user", "content": user_query})
 
-            # Llamada a la API con búsqueda web habilitada
-            response = client.responses.create(
-                model="gpt-4o",
-                tools=[{"type": "web_search_preview"}],
-                input=input_messages,
-            )
+            # Llamada a la API con búsqueda web habilitada, en streaming:
+            # el texto se pinta según llega y "Detener" corta la conexión
+            st.session_state.streaming_partial = ""
+            st.button("⏹️ Detener", on_click=stop_streaming)
+            
+            def show(text):
+                st.session_state.streaming_partial = text
+                message_placeholder.markdown(text + "▌")
             
-            # Extraer el texto de la respuesta
-            full_response = ""
-            for item in response.output:
-                if item.type == "message":
-                    for content in item.content:
-                        if content.type == "output_text":
-                            full_response = content.text
-                            break
+            full_response, completed = collect_stream(
+                response_deltas(
+                    client,
+                    model="gpt-4o",
+                    tools=[{"type": "web_search_preview"}],
+                    input=input_messages,
+                ),
+                on_text=show,
+            )
             
+            st.session_state.streaming_partial = None
             message_placeholder.markdown(full_response)
             st.session_state.messages.append({"role": "assistant", "content": full_response})
+            # La imagen solo cuenta como vista si la respuesta llegó entera;
+            # si la llamada falla se vuelve a adjuntar en el siguiente mensaje
+            if new_image and completed:
+                st.session_state.sent_images.add(upload.digest)
 
         except Exception as e:
+            st.session_state.streaming_partial = None
             st.error(f"Error de conexión: {e}")
@@ -0,0 +1,113 @@
+"""
+Benchmark: bucles de Python originales vs índice espacial con NumPy
+Compara matriz de distancias, ruta greedy, conversión a Leaflet y
+consultas de radio / vecino más cercano sobre los mapas reales y sobre
+un mapa sintético grande.
+"""
+
+import math
+import random
+import sys
+import timeit
+
+from arc_core import MAPS_DATA, MapSpatialIndex, to_leaflet
+
+RADIUS = 500
+
+
+# --- Implementaciones originales (bucle a bucle) ---
+
+def loop_matrix(pois):
+    return [[math.hypot(a["coords"][0] - b["coords"][0], a["coords"][1] - b["coords"][1]) for b in pois]
+            for a in pois]
+
+
+def loop_greedy_route(pois):
+    route = [pois[0]]
+    remaining = pois[1:]
+    while remaining:
+        last = route[-1]
+        nearest = min(remaining, key=lambda p:
+            ((p["coords"][0] - last["coords"][0])**2 + (p["coords"][1] - last["coords"][1])**2)**0.5)
+        route.append(nearest)
+        remaining.remove(nearest)
+    return route
+
+
+def loop_route_length(pois, order):
+    return sum(math.hypot(pois[a]["coords"][0] - pois[b]["coords"][0], pois[a]["coords"][1] - pois[b]["coords"][1])
+               for a, b in zip(order, order[1:]))
+
+
+def loop_leaflet(pois, width):
+    return [(-(poi["coords"][1] / width * 256), poi["coords"][0] / width * 256) for poi in pois]
+
+
+def loop_within(pois, point, radius):
+    return [poi for poi in pois
+            if math.hypot(poi["coords"][0] - point[0], poi["coords"][1] - point[1]) <= radius]
+
+
+def loop_nearest(pois, point):
+    return min(pois, key=lambda p: math.hypot(p["coords"][0] - point[0], p["coords"][1] - point[1]))
+
+
+# --- Versión NumPy ---
+
+def numpy_greedy_route(index):
+    dist = index.distances.copy()
+    order = [0]
+    dist[:, 0] = float("inf")
+    for _ in range(len(index) - 1):
+        nxt = int(dist[order[-1]].argmin())
+        order.append(nxt)
+        dist[:, nxt] = float("inf")
+    return order
+
+
+def _best(stmt, repeat=3):
+    timer = timeit.Timer(stmt)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def _row(label, loop_s, numpy_s):
+    print(f"  {label:<22} {loop_s * 1e6:>11.1f} µs {numpy_s * 1e6:>11.1f} µs {loop_s / numpy_s:>8.1f}x")
+
+
+def bench(name, pois, width=8192):
+    rng = random.Random(0)
+    points = [(rng.uniform(0, width), rng.uniform(0, width)) for _ in range(100)]
+    order = list(range(len(pois)))
+    rng.shuffle(order)
+
+    print(f"\n{name} ({len(pois)} POIs)")
+    print(f"  {'':<22} {'bucles':>14} {'numpy':>14} {'mejora':>9}")
+    _row("índice (construcción)", _best(lambda: loop_matrix(pois)), _best(lambda: MapSpatialIndex(pois, width)))
+
+    index = MapSpatialIndex(pois, width)
+    _row("ruta greedy", _best(lambda: loop_greedy_route(pois)), _best(lambda: numpy_greedy_route(index)))
+    _row("longitud de ruta", _best(lambda: loop_route_length(pois, order)), _best(lambda: index.route_length(order)))
+    _row("coords Leaflet", _best(lambda: loop_leaflet(pois, width)), _best(lambda: to_leaflet(index.coords, width)))
+    _row(f"radio {RADIUS} (x100)",
+         _best(lambda: [loop_within(pois, p, RADIUS) for p in points]),
+         _best(lambda: [index.within(p, RADIUS) for p in points]))
+    _row("más cercano (x100)",
+         _best(lambda: [loop_nearest(pois, p) for p in points]),
+         _best(lambda: [index.nearest(p) for p in points]))
+
+
+def main():
+    synthetic = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    for map_id, map_data in MAPS_DATA.items():
+        bench(map_data["name"], map_data["pois"], map_data["width"])
+
+    rng = random.Random(42)
+    pois = [{"title": f"POI {i}", "coords": [rng.uniform(0, 8192), rng.uniform(0, 8192)], "types": []}
+            for i in range(synthetic)]
+    bench("Mapa sintético", pois)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Calcula los hashes perceptuales de los iconos de items (icon_hashes.json)
+El reconocedor de inventario de arc_recovery_app los usa para leer
+capturas en local. Los iconos se leen de una carpeta local con el mismo
+nombre de archivo que el campo `icon` de items_data.json:
+
+    python build_icon_index.py [carpeta_de_iconos]
+"""
+
+import sys
+import time
+
+from arc_core import ICON_INDEX_FILE, ICONS_DIR, build_icon_index, get_game_data
+
+
+def main():
+    icons_dir = sys.argv[1] if len(sys.argv) > 1 else ICONS_DIR
+
+    start = time.perf_counter()
+    out_path, count, missing = build_icon_index(get_game_data().items, icons_dir, ICON_INDEX_FILE)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {count} iconos → {out_path} en {elapsed * 1000:.0f} ms")
+    if missing:
+        print(f"⚠️ {len(missing)} items sin icono en {icons_dir}: {', '.join(missing[:10])}"
+              + (" ..." if len(missing) > 10 else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Compila items_data.json a un snapshot binario columnar (items_data.snapshot)
+Las apps lo abren con mmap al arrancar; si no existe usan el JSON
+"""
+
+import os
+import sys
+import time
+
+from arc_core import ITEMS_FILE, ItemSnapshot, build_snapshot
+
+
+def main():
+    json_path = sys.argv[1] if len(sys.argv) > 1 else ITEMS_FILE
+    out_path = sys.argv[2] if len(sys.argv) > 2 else None
+
+    start = time.perf_counter()
+    out_path, count, size = build_snapshot(json_path, out_path)
+    elapsed = time.perf_counter() - start
+    json_size = os.path.getsize(json_path)
+    print(f"✅ {count} items → {out_path}")
+    print(f"   {size / 1024:.1f} KB (JSON: {json_size / 1024:.1f} KB) en {elapsed * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    snapshot = ItemSnapshot(out_path)
+    elapsed = time.perf_counter() - start
+    print(f"📂 Apertura del snapshot: {elapsed * 1000:.2f} ms")
+    snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
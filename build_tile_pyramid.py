@@ -0,0 +1,234 @@
+"""
+Genera los zooms que faltan en los tiles descargados (pirámide de tiles)
+
+MAPS_DATA permite acercar hasta maxZoom (5) por encima del último zoom
+nativo del CDN (maxNativeZoom, 3 o 4), y en esos niveles el navegador
+reescala los tiles nativos en cada desplazamiento. Este script calcula
+esos niveles una sola vez con Pillow (LANCZOS) a partir de los tiles
+descargados y los guarda junto a ellos, en la carpeta tiles/ o en el
+archivo de --archive, para que tile_server.py los sirva tal cual.
+
+Cada tile nativo se abre una vez y de él salen todos sus descendientes
+(4 en el zoom siguiente, 16 en el otro). Con --lower además se rellenan
+los huecos de los zooms inferiores al nativo (cada tile que falta a
+partir de sus 4 hijos). Solo se rellenan: los tiles que ya existen son
+los del CDN, registrados en el manifest de download_tiles.py, y no se
+sobrescriben nunca, ni siquiera con --force (que solo rehace los zooms
+por encima del nativo). El trabajo se reparte en un pool de procesos,
+uno por núcleo.
+
+    python build_tile_pyramid.py                   # todos los mapas de tiles/
+    python build_tile_pyramid.py dam --lower --workers 4
+    python build_tile_pyramid.py --archive tiles.mbtiles
+    ARC_TILE_SERVER=http://127.0.0.1:8600 ARC_TILE_OVERZOOM=1 streamlit run arc_maps_app.py
+"""
+
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from arc_core.tile_archive import TileArchive
+from arc_core.tiles import TILE_SCHEMES
+
+TILES_DIR = Path("tiles")
+# Calidad WebP de los tiles generados
+QUALITY = 85
+# Tiles por envío a cada proceso
+CHUNKSIZE = 8
+
+
+class DirectoryTiles:
+    """tiles/<mapa>/<z>/<x>/<y>.webp"""
+
+    def __init__(self, tiles_dir):
+        self.tiles_dir = Path(tiles_dir)
+
+    def path(self, tileset, z, x, y):
+        return self.tiles_dir / tileset / str(z) / str(x) / f"{y}.webp"
+
+    def get(self, tileset, z, x, y):
+        try:
+            return self.path(tileset, z, x, y).read_bytes()
+        except OSError:
+            return None
+
+    def exists(self, tileset, z, x, y):
+        return self.path(tileset, z, x, y).is_file()
+
+    def put_many(self, tiles):
+        for tileset, z, x, y, data in tiles:
+            path = self.path(tileset, z, x, y)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.part")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+    def close(self):
+        pass
+
+
+class ArchiveTiles:
+    """Tiles de un archivo de arc_core.tile_archive"""
+
+    def __init__(self, path):
+        self.archive = TileArchive(path)
+
+    def get(self, tileset, z, x, y):
+        found = self.archive.get(tileset, z, x, y)
+        return found[0] if found else None
+
+    def exists(self, tileset, z, x, y):
+        return self.archive.size(tileset, z, x, y) is not None
+
+    def put_many(self, tiles):
+        self.archive.put_many(tiles)
+
+    def close(self):
+        self.archive.close()
+
+
+def encode(image, quality=QUALITY):
+    buffer = io.BytesIO()
+    image.save(buffer, "WEBP", quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def overzoom_tile(job):
+    """(data, z, x, y, niveles, tile_size, quality) → [(z, x, y, datos)] de sus descendientes"""
+    data, z, x, y, levels, tile_size, quality = job
+    try:
+        source = Image.open(io.BytesIO(data))
+        source.load()
+    except OSError:
+        # Tile corrupto o que no es una imagen: se deja sin descendientes
+        return []
+    with source:
+        source = source.convert("RGBA") if source.mode in ("RGBA", "LA", "P") else source.convert("RGB")
+        if source.size != (tile_size, tile_size):
+            source = source.resize((tile_size, tile_size), Image.LANCZOS)
+        out = []
+        for level in range(1, levels + 1):
+            # Cada descendiente sale directamente del nativo: sin reescalados encadenados
+            side = 1 << level
+            crop = tile_size / side
+            for dx in range(side):
+                for dy in range(side):
+                    box = (dx * crop, dy * crop, (dx + 1) * crop, (dy + 1) * crop)
+                    child = source.resize((tile_size, tile_size), Image.LANCZOS, box=box)
+                    out.append((z + level, x * side + dx, y * side + dy, encode(child, quality)))
+    return out
+
+
+def downsample_tile(job):
+    """(hijos, z, x, y, tile_size, quality) → (z, x, y, datos) a partir de los 4 tiles del zoom z+1"""
+    children, z, x, y, tile_size, quality = job
+    canvas = Image.new("RGBA", (tile_size * 2, tile_size * 2), (0, 0, 0, 0))
+    for (dx, dy), data in children.items():
+        try:
+            child = Image.open(io.BytesIO(data))
+            child.load()
+        except OSError:
+            continue
+        with child:
+            child = child.convert("RGBA")
+            if child.size != (tile_size, tile_size):
+                child = child.resize((tile_size, tile_size), Image.LANCZOS)
+            canvas.paste(child, (dx * tile_size, dy * tile_size))
+    return z, x, y, encode(canvas.resize((tile_size, tile_size), Image.LANCZOS), quality)
+
+
+def overzoom_jobs(store, scheme, force=False, quality=QUALITY):
+    native = scheme.max_native_zoom
+    levels = scheme.max_zoom - native
+    if levels <= 0:
+        return
+    for z, x, y in scheme.tiles([native]):
+        # Ya hecho si existe el último descendiente de este tile
+        last = 1 << levels
+        if not force and store.exists(scheme.tileset, scheme.max_zoom, (x + 1) * last - 1, (y + 1) * last - 1):
+            continue
+        data = store.get(scheme.tileset, z, x, y)
+        if data is not None:
+            yield data, z, x, y, levels, scheme.tile_size, quality
+
+
+def lower_jobs(store, scheme, z, quality=QUALITY):
+    for _, x, y in scheme.tiles([z]):
+        # Solo huecos: los existentes son del CDN y los sigue download_tiles.py
+        if store.exists(scheme.tileset, z, x, y):
+            continue
+        children = {}
+        for dx in (0, 1):
+            for dy in (0, 1):
+                data = store.get(scheme.tileset, z + 1, 2 * x + dx, 2 * y + dy)
+                if data is not None:
+                    children[dx, dy] = data
+        if children:
+            yield children, z, x, y, scheme.tile_size, quality
+
+
+def build_map(pool, store, scheme, lower=False, force=False, quality=QUALITY):
+    """Genera los zooms de un mapa → (tiles generados, bytes)"""
+    count = 0
+    size = 0
+    results = pool.map(overzoom_tile, overzoom_jobs(store, scheme, force, quality), chunksize=CHUNKSIZE)
+    for tiles in results:
+        store.put_many([(scheme.tileset, *tile) for tile in tiles])
+        count += len(tiles)
+        size += sum(len(tile[3]) for tile in tiles)
+
+    if lower:
+        # De arriba abajo: cada nivel sale del que se acaba de completar
+        for z in range(scheme.max_native_zoom - 1, scheme.min_zoom - 1, -1):
+            tiles = list(pool.map(downsample_tile, lower_jobs(store, scheme, z, quality),
+                                  chunksize=CHUNKSIZE))
+            store.put_many([(scheme.tileset, *tile) for tile in tiles])
+            count += len(tiles)
+            size += sum(len(tile[3]) for tile in tiles)
+    return count, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera los zooms que faltan a partir de los tiles descargados")
+    parser.add_argument("maps", nargs="*", help=f"mapas: {', '.join(TILE_SCHEMES)} (por defecto, todos)")
+    parser.add_argument("--tiles", type=Path, default=TILES_DIR, help="carpeta de download_tiles.py")
+    parser.add_argument("--archive", type=Path, help="archivo empaquetado (download_tiles.py --archive)")
+    parser.add_argument("--lower", action="store_true", help="rellenar también los huecos de los zooms inferiores al nativo")
+    parser.add_argument("--force", action="store_true", help="regenerar los zooms por encima del nativo aunque ya existan")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="procesos en paralelo")
+    parser.add_argument("--quality", type=int, default=QUALITY, help="calidad WebP")
+    args = parser.parse_args()
+    unknown = [map_id for map_id in args.maps if map_id not in TILE_SCHEMES]
+    if unknown:
+        parser.error(f"mapas desconocidos: {', '.join(unknown)}")
+
+    store = ArchiveTiles(args.archive) if args.archive else DirectoryTiles(args.tiles)
+    schemes = [TILE_SCHEMES[map_id] for map_id in args.maps] if args.maps else list(TILE_SCHEMES.values())
+    total_start = time.perf_counter()
+    total = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for scheme in schemes:
+                start = time.perf_counter()
+                count, size = build_map(pool, store, scheme, args.lower, args.force, args.quality)
+                elapsed = time.perf_counter() - start
+                total += count
+                zooms = ", ".join(f"zoom {z}" for z in range(scheme.max_native_zoom + 1, scheme.max_zoom + 1))
+                zooms += " + huecos inferiores" if args.lower else ""
+                print(f"🧱 {scheme.tileset} ({zooms}): {count} tiles, {size / 1024 / 1024:.1f} MB "
+                      f"en {elapsed:.1f}s ({count / elapsed if elapsed else 0:.0f} tiles/s)")
+    finally:
+        store.close()
+    print(f"✅ {total} tiles en {time.perf_counter() - total_start:.1f}s con {args.workers} procesos "
+          f"→ {args.archive or args.tiles}")
+    if total:
+        print("   Usa ARC_TILE_OVERZOOM=1 con arc_maps_app.py y tile_server.py para servirlos")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,74 @@
 """
 Descargador de tiles para ARC Raiders Maps
 Descarga los tiles del CDN para uso local
+
+Asíncrono sobre un único cliente httpx (conexiones keep-alive; HTTP/2 si
+el paquete h2 está instalado). Cada tile se escribe en un temporal y se
+renombra, así que un corte nunca deja un .webp truncado. El progreso se
+guarda en tiles/manifest.json y una nueva ejecución continúa donde se
+quedó. Con --sync se revisan también los tiles ya descargados con
+peticiones condicionales (If-None-Match / If-Modified-Since a partir del
+ETag y Last-Modified guardados en el manifest): solo se transfieren los
+que han cambiado en el CDN. Los errores temporales (429, 5xx, timeouts) se reintentan con
+backoff exponencial con jitter, y la concurrencia se ajusta sola según
+la latencia y los errores observados.
+
+    python download_tiles.py                      # menú interactivo
+    python download_tiles.py dam spaceport        # mapas concretos
+    python download_tiles.py --all --sync         # actualizar lo descargado
+    python download_tiles.py --all --cdn http://127.0.0.1:8000
+
+--cdn permite probarlo contra un servidor local con la misma estructura
+de rutas (p. ej. `python -m http.server` sobre una copia de los tiles).
+
+Con --archive los tiles van a un único archivo SQLite deduplicado
+(arc_core.tile_archive) en lugar de a miles de .webp; --pack convierte
+una carpeta ya descargada:
+
+    python download_tiles.py --all --archive tiles.mbtiles
+    python download_tiles.py --pack --out tiles --archive tiles.mbtiles
 """
 
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import json
 import os
-import requests
+import random
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import httpx
+
+from arc_core.tile_archive import TileArchive, pack_directory
+from arc_core.tiles import CDN_URL, TILE_SCHEMES
+
 # Configuración
-CDN_URL = "https://cdn.arcraidersmaps.app"
 TILES_DIR = Path("tiles")
+MANIFEST_NAME = "manifest.json"
+
+# HTTP/2 solo si h2 está instalado (si no, HTTP/1.1 keep-alive)
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Concurrencia adaptativa: empieza en INITIAL y se mueve entre MIN y MAX
+INITIAL_CONCURRENCY = 8
+MIN_CONCURRENCY = 2
+MAX_CONCURRENCY = 32
+# Latencia media aceptable respecto a la mejor observada antes de dejar de subir
+LATENCY_TOLERANCE = 2.0
+# Segundos mínimos entre dos recortes de concurrencia
+DECREASE_COOLDOWN = 2.0
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+RETRY_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Tiles que no existen en el CDN (fuera del mapa): no se reintentan
+MISSING_STATUS = frozenset({404, 410})
+# El manifest se guarda cada MANIFEST_EVERY tiles o MANIFEST_INTERVAL segundos
+MANIFEST_EVERY = 200
+MANIFEST_INTERVAL = 2.0
 
 # Headers para simular navegador
 HEADERS = {
@@ -21,190 +78,430 @@ HEADERS = {
     "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
 }
 
-# Mapas y sus configuraciones
-# dam y spaceport usan {z}/{y}/{x}, los demás usan {z}/{x}/{y}
-MAPS = {
-    "dam": {
-        "path": "/maps/dam/tiles",
-        "format": "{z}/{y}/{x}",  # y,x order
-        "maxNativeZoom": 4,
-        "minZoom": 1,
-    },
-    "spaceport": {
-        "path": "/maps/spaceport/tiles",
-        "format": "{z}/{y}/{x}",  # y,x order
-        "maxNativeZoom": 3,
-        "minZoom": 1,
-    },
-    "buried-city": {
-        "path": "/maps/buried-city-v3/tiles",
-        "format": "{z}/{x}/{y}",  # x,y order
-        "maxNativeZoom": 3,
-        "minZoom": 1,
-    },
-    "blue-gate": {
-        "path": "/maps/blue-gate-v2/tiles",
-        "format": "{z}/{x}/{y}",  # x,y order
-        "maxNativeZoom": 3,
-        "minZoom": 1,
-    },
-    "stella-montis-l1": {
-        "path": "/maps/stella-montis/layers/stella-montis-l1/tiles",
-        "format": "{z}/{x}/{y}",
-        "maxNativeZoom": 3,
-        "minZoom": 1,
-    },
-    "stella-montis-l2": {
-        "path": "/maps/stella-montis/layers/stella-montis-l2/tiles",
-        "format": "{z}/{x}/{y}",
-        "maxNativeZoom": 3,
-        "minZoom": 1,
-    },
-}
+def backoff_delay(attempt, retry_after=None, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Espera antes del reintento `attempt`: Retry-After o backoff exponencial con jitter completo"""
+    if retry_after is not None:
+        try:
+            return min(cap, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * 2 ** attempt))
 
 
-def get_tile_count(zoom_level):
-    """Obtener número de tiles por lado para un nivel de zoom"""
-    return 2 ** zoom_level
+def write_atomic(path, data):
+    """Escribe en un temporal del mismo directorio y lo renombra"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.part")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
 
 
-def download_tile(url, local_path):
-    """Descargar un tile individual"""
-    try:
-        if local_path.exists():
-            return True, url, "exists"
-        
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        
-        if response.status_code == 200:
-            local_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(local_path, "wb") as f:
-                f.write(response.content)
-            return True, url, "downloaded"
-        else:
-            return False, url, f"HTTP {response.status_code}"
-    except Exception as e:
-        return False, url, str(e)
-
-
-def download_map_tiles(map_id, map_config, max_workers=8):
-    """Descargar todos los tiles de un mapa"""
+class Manifest:
+    """Registro de tiles completados.
+
+    {clave: {"bytes", "sha256", "etag"?, "modified"?}} o {clave: {"missing": status}}
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tiles = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.tiles = json.load(f).get("tiles", {})
+            except (OSError, ValueError):
+                self.tiles = {}
+        self._pending = 0
+        self._saved_at = time.monotonic()
+
+    def is_done(self, key, size, retry_missing=False):
+        """True si el tile ya está completo en disco (o se sabe que no existe)"""
+        entry = self.tiles.get(key)
+        if entry is None:
+            return False
+        if "missing" in entry:
+            return not retry_missing
+        return size == entry["bytes"]
+
+    def validators(self, key, size):
+        """Cabeceras condicionales para revalidar un tile completo en disco"""
+        entry = self.tiles.get(key)
+        if not entry or "missing" in entry or not self.is_done(key, size):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("modified"):
+            headers["If-Modified-Since"] = entry["modified"]
+        return headers
+
+    def record(self, key, entry):
+        self.tiles[key] = entry
+        self._pending += 1
+        if self._pending >= MANIFEST_EVERY or time.monotonic() - self._saved_at >= MANIFEST_INTERVAL:
+            self.save()
+
+    def save(self):
+        if not self._pending and self.path.exists():
+            return
+        payload = json.dumps({"version": 1, "tiles": self.tiles}, separators=(",", ":"), sort_keys=True)
+        write_atomic(self.path, payload.encode("utf-8"))
+        self._pending = 0
+        self._saved_at = time.monotonic()
+
+
+class DirectoryStore:
+    """Tiles como archivos sueltos: <carpeta>/<mapa>/<z>/<x>/<y>.webp"""
+
+    def __init__(self, tiles_dir):
+        self.tiles_dir = Path(tiles_dir)
+
+    def path(self, map_id, z, x, y):
+        return self.tiles_dir / map_id / f"{z}" / f"{x}" / f"{y}.webp"
+
+    def size(self, map_id, z, x, y):
+        try:
+            return self.path(map_id, z, x, y).stat().st_size
+        except OSError:
+            return None
+
+    def write(self, map_id, z, x, y, data):
+        write_atomic(self.path(map_id, z, x, y), data)
+
+    def cleanup(self, map_id):
+        # Temporales que dejó una ejecución interrumpida
+        for part in (self.tiles_dir / map_id).glob("**/.*.part"):
+            part.unlink(missing_ok=True)
+
+    def close(self):
+        pass
+
+
+class ArchiveStore:
+    """Tiles en un único archivo SQLite deduplicado (cada escritura es una transacción)"""
+
+    def __init__(self, path):
+        self.archive = TileArchive(path)
+
+    def size(self, map_id, z, x, y):
+        return self.archive.size(map_id, z, x, y)
+
+    def write(self, map_id, z, x, y, data):
+        self.archive.put(map_id, z, x, y, data)
+
+    def cleanup(self, map_id):
+        pass
+
+    def close(self):
+        self.archive.close()
+
+
+class AdaptiveLimiter:
+    """Límite de peticiones en vuelo con aumento aditivo y recorte multiplicativo.
+
+    Sube de uno en uno mientras la latencia media se mantiene cerca de la
+    mejor observada; los errores temporales (429, 5xx, timeouts) lo
+    reducen a la mitad, como mucho una vez cada DECREASE_COOLDOWN segundos.
+    """
+
+    def __init__(self, initial=INITIAL_CONCURRENCY, minimum=MIN_CONCURRENCY, maximum=MAX_CONCURRENCY):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.peak = initial
+        self.latency = None
+        self.best_latency = None
+        self._successes = 0
+        self._last_decrease = float("-inf")
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    async def success(self, latency):
+        """Anota una respuesta; si el límite sube, despierta a quien espera un hueco"""
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+        self._successes += 1
+        if self._successes < self.limit:
+            return
+        self._successes = 0
+        if self.latency <= self.best_latency * LATENCY_TOLERANCE:
+            grown = self.limit < self.maximum
+            self.limit = min(self.maximum, self.limit + 1)
+            self.peak = max(self.peak, self.limit)
+            if grown:
+                async with self._cond:
+                    self._cond.notify_all()
+        elif self.latency > self.best_latency * LATENCY_TOLERANCE * 2:
+            self.limit = max(self.minimum, self.limit - 1)
+
+    def failure(self):
+        now = time.monotonic()
+        if now - self._last_decrease >= DECREASE_COOLDOWN:
+            self.limit = max(self.minimum, self.limit // 2)
+            self._last_decrease = now
+            self._successes = 0
+
+
+async def download_tile(client, limiter, url, store, tile, headers=None, retries=MAX_RETRIES):
+    """Descargar un tile individual → (estado, entrada del manifest o error).
+
+    Con cabeceras condicionales (`headers`) un 304 devuelve ("unchanged", None).
+    """
+    error = None
+    for attempt in range(retries + 1):
+        retry_after = None
+        async with limiter:
+            start = time.perf_counter()
+            try:
+                response = await client.get(url, headers=headers)
+            except httpx.TransportError as e:
+                limiter.failure()
+                error = str(e) or type(e).__name__
+            else:
+                latency = time.perf_counter() - start
+                status = response.status_code
+                if status == 200:
+                    await limiter.success(latency)
+                    data = response.content
+                    await asyncio.to_thread(store.write, *tile, data)
+                    entry = {"bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()[:16]}
+                    if response.headers.get("etag"):
+                        entry["etag"] = response.headers["etag"]
+                    if response.headers.get("last-modified"):
+                        entry["modified"] = response.headers["last-modified"]
+                    return "downloaded", entry
+                if status == 304:
+                    await limiter.success(latency)
+                    return "unchanged", None
+                if status in MISSING_STATUS:
+                    await limiter.success(latency)
+                    return "missing", {"missing": status}
+                error = f"HTTP {status}"
+                if status not in RETRY_STATUS:
+                    return "failed", error
+                limiter.failure()
+                retry_after = response.headers.get("retry-after")
+        if attempt < retries:
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+    return "failed", error
+
+
+def tile_tasks(scheme, cdn_url=CDN_URL):
+    """[(clave del manifest, url, (tileset, z, x, y))] de los tiles dentro de la extensión del mapa"""
+    return [
+        (f"{scheme.tileset}/{z}/{x}/{y}", scheme.url(z, x, y, cdn_url), (scheme.tileset, z, x, y))
+        for z, x, y in scheme.tiles()
+    ]
+
+
+async def download_map_tiles(client, limiter, manifest, store, scheme, cdn_url=CDN_URL,
+                             retry_missing=False, sync=False):
+    """Descargar (o con sync, revalidar) todos los tiles de un mapa"""
     print(f"\n{'='*60}")
-    print(f"📥 Descargando: {map_id}")
+    print(f"📥 Descargando: {scheme.tileset}")
     print(f"{'='*60}")
-    
-    tasks = []
-    
-    for zoom in range(map_config["minZoom"], map_config["maxNativeZoom"] + 1):
-        tiles_per_side = get_tile_count(zoom)
+
+    for zoom in scheme.zooms():
+        tiles_per_side = scheme.tiles_per_side(zoom)
         print(f"  Zoom {zoom}: {tiles_per_side}x{tiles_per_side} = {tiles_per_side**2} tiles")
-        
-        for x in range(tiles_per_side):
-            for y in range(tiles_per_side):
-                # Construir URL según el formato del mapa
-                if map_config["format"] == "{z}/{y}/{x}":
-                    tile_path = f"{zoom}/{y}/{x}"
-                else:
-                    tile_path = f"{zoom}/{x}/{y}"
-                
-                url = f"{CDN_URL}{map_config['path']}/{tile_path}.webp"
-                local_path = TILES_DIR / map_id / f"{zoom}" / f"{x}" / f"{y}.webp"
-                
-                tasks.append((url, local_path))
-    
-    print(f"  Total tiles a descargar: {len(tasks)}")
-    
+
+    store.cleanup(scheme.tileset)
+
+    tasks = tile_tasks(scheme, cdn_url)
+    if sync:
+        # Todo lo descargado se revalida; los 404 conocidos solo con retry_missing
+        pending = [task for task in tasks if retry_missing or "missing" not in manifest.tiles.get(task[0], {})]
+    else:
+        pending = [task for task in tasks if not manifest.is_done(task[0], store.size(*task[2]), retry_missing)]
+    existed = len(tasks) - len(pending)
+    print(f"  Total tiles: {len(tasks)} ({existed} ya completos según el manifest)")
+
     downloaded = 0
-    existed = 0
+    unchanged = 0
+    missing = 0
     failed = 0
     failed_urls = []
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(download_tile, url, path): (url, path) for url, path in tasks}
-        
-        for i, future in enumerate(as_completed(futures)):
-            success, url, status = future.result()
-            
-            if success:
-                if status == "exists":
-                    existed += 1
+
+    async def run(key, url, tile):
+        headers = manifest.validators(key, store.size(*tile)) if sync else None
+        return key, url, await download_tile(client, limiter, url, store, tile, headers)
+
+    jobs = [asyncio.ensure_future(run(*task)) for task in pending]
+    try:
+        for i, job in enumerate(asyncio.as_completed(jobs)):
+            key, url, (status, info) = await job
+            if status == "failed":
+                failed += 1
+                failed_urls.append((url, info))
+            elif status == "unchanged":
+                unchanged += 1
+            else:
+                manifest.record(key, info)
+                if status == "missing":
+                    missing += 1
                 else:
                     downloaded += 1
-            else:
-                failed += 1
-                failed_urls.append((url, status))
-            
+
             # Progreso cada 50 tiles
-            if (i + 1) % 50 == 0 or i + 1 == len(tasks):
-                print(f"  Progreso: {i+1}/{len(tasks)} | ✅ {downloaded} descargados | 📁 {existed} existentes | ❌ {failed} fallidos")
-    
-    print(f"\n  ✅ Completado: {downloaded} descargados, {existed} ya existían, {failed} fallidos")
-    
+            if (i + 1) % 50 == 0 or i + 1 == len(pending):
+                print(f"  Progreso: {i+1}/{len(pending)} | ✅ {downloaded} descargados | ↺ {unchanged} sin cambios"
+                      f" | 🚫 {missing} sin tile | ❌ {failed} fallidos | ⚙️ {limiter.limit} en paralelo")
+    finally:
+        for job in jobs:
+            job.cancel()
+        manifest.save()
+
+    print(f"\n  ✅ Completado: {downloaded} descargados, {existed} ya existían, {unchanged} sin cambios, "
+          f"{missing} sin tile, {failed} fallidos")
+
     if failed_urls and failed <= 10:
         print("  URLs fallidas:")
         for url, status in failed_urls[:10]:
             print(f"    - {url}: {status}")
-    
-    return downloaded, existed, failed
 
+    return downloaded, existed + unchanged, failed
 
-def main():
-    print("""
-╔══════════════════════════════════════════════════════════════╗
-║          ARC RAIDERS - DESCARGADOR DE TILES                  ║
-║                                                              ║
-║  Descarga los tiles de mapas desde cdn.arcraidersmaps.app    ║
-╚══════════════════════════════════════════════════════════════╝
-    """)
-    
-    # Crear directorio de tiles
-    TILES_DIR.mkdir(exist_ok=True)
-    
+
+async def download_maps(maps_to_download, cdn_url=CDN_URL, tiles_dir=TILES_DIR, concurrency=INITIAL_CONCURRENCY,
+                        retry_missing=False, sync=False, archive=None):
+    """Descarga varios mapas con un solo cliente y manifest → (descargados, existentes, fallidos)
+
+    Con `archive` (ruta) los tiles se guardan en ese archivo en vez de en tiles_dir.
+    """
+    if archive:
+        archive = Path(archive)
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        store = ArchiveStore(archive)
+        manifest = Manifest(archive.with_name(archive.name + "." + MANIFEST_NAME))
+    else:
+        tiles_dir.mkdir(parents=True, exist_ok=True)
+        store = DirectoryStore(tiles_dir)
+        manifest = Manifest(tiles_dir / MANIFEST_NAME)
+    limiter = AdaptiveLimiter(initial=concurrency, maximum=max(concurrency, MAX_CONCURRENCY))
+    limits = httpx.Limits(max_connections=limiter.maximum, max_keepalive_connections=limiter.maximum)
+    timeout = httpx.Timeout(30.0, connect=10.0)
+
+    totals = [0, 0, 0]
+    try:
+        async with httpx.AsyncClient(http2=HTTP2, headers=HEADERS, limits=limits, timeout=timeout) as client:
+            for scheme in maps_to_download:
+                result = await download_map_tiles(client, limiter, manifest, store, scheme, cdn_url,
+                                                  retry_missing, sync)
+                totals = [total + value for total, value in zip(totals, result)]
+    finally:
+        store.close()
+    if limiter.latency is not None:
+        print(f"\n  ⚙️ Concurrencia final {limiter.limit} (máx. {limiter.peak}), "
+              f"latencia media {limiter.latency * 1000:.0f} ms, {'HTTP/2' if HTTP2 else 'HTTP/1.1'}")
+    return tuple(totals)
+
+
+def pack(tiles_dir, archive_path, map_ids=None):
+    """Empaqueta una carpeta de tiles ya descargada en un archivo deduplicado"""
+    start = time.perf_counter()
+    archive = TileArchive(archive_path)
+    try:
+        count = pack_directory(tiles_dir, archive, map_ids)
+        stats = archive.stats()
+    finally:
+        archive.close()
+    elapsed = time.perf_counter() - start
+    print(f"📦 {count} tiles → {archive_path} en {elapsed:.1f}s")
+    print(f"   {stats['unique']} contenidos distintos ({stats['tiles'] - stats['unique']} duplicados), "
+          f"{stats['bytes'] / 1024 / 1024:.1f} MB de datos")
+
+
+def choose_maps():
+    """Menú interactivo → lista de TileScheme o None"""
     # Mostrar mapas disponibles
     print("Mapas disponibles:")
-    for i, (map_id, config) in enumerate(MAPS.items(), 1):
-        zoom_range = f"zoom {config['minZoom']}-{config['maxNativeZoom']}"
-        print(f"  {i}. {map_id} ({zoom_range})")
-    
+    for i, scheme in enumerate(TILE_SCHEMES.values(), 1):
+        zoom_range = f"zoom {scheme.min_zoom}-{scheme.max_native_zoom}"
+        print(f"  {i}. {scheme.tileset} ({zoom_range}, {scheme.count()} tiles)")
+
     print(f"\n  0. Descargar TODOS los mapas")
     print(f"  q. Salir\n")
-    
+
     choice = input("Selecciona una opción: ").strip().lower()
-    
+
     if choice == 'q':
         print("Cancelado.")
-        return
-    
+        return None
+
     if choice == '0':
         # Descargar todos
-        maps_to_download = list(MAPS.items())
+        return list(TILE_SCHEMES.values())
+    try:
+        idx = int(choice) - 1
+        if 0 <= idx < len(TILE_SCHEMES):
+            return [list(TILE_SCHEMES.values())[idx]]
+    except ValueError:
+        pass
+    print("Opción inválida")
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Descarga los tiles de los mapas para uso local")
+    parser.add_argument("maps", nargs="*", help=f"mapas a descargar: {', '.join(TILE_SCHEMES)} (por defecto, menú)")
+    parser.add_argument("--all", action="store_true", help="descargar todos los mapas")
+    parser.add_argument("--cdn", default=CDN_URL, help="URL base del CDN (o de un servidor local de pruebas)")
+    parser.add_argument("--out", type=Path, default=TILES_DIR, help="carpeta de destino")
+    parser.add_argument("--concurrency", type=int, default=INITIAL_CONCURRENCY, help="peticiones iniciales en paralelo")
+    parser.add_argument("--sync", action="store_true", help="revalidar los tiles descargados (ETag/Last-Modified)")
+    parser.add_argument("--retry-missing", action="store_true", help="volver a pedir los tiles que dieron 404")
+    parser.add_argument("--archive", type=Path, help="guardar en un único archivo SQLite deduplicado (.mbtiles)")
+    parser.add_argument("--pack", action="store_true", help="solo empaquetar la carpeta --out en --archive")
+    args = parser.parse_args()
+    unknown = [map_id for map_id in args.maps if map_id not in TILE_SCHEMES]
+    if unknown:
+        parser.error(f"mapas desconocidos: {', '.join(unknown)}")
+
+    print("""
+╔══════════════════════════════════════════════════════════════╗
+║          ARC RAIDERS - DESCARGADOR DE TILES                  ║
+║                                                              ║
+║  Descarga los tiles de mapas desde cdn.arcraidersmaps.app    ║
+╚══════════════════════════════════════════════════════════════╝
+    """)
+
+    if args.pack:
+        if not args.archive:
+            parser.error("--pack necesita --archive")
+        pack(args.out, args.archive, args.maps or None)
+        return
+
+    if args.all:
+        maps_to_download = list(TILE_SCHEMES.values())
+    elif args.maps:
+        maps_to_download = [TILE_SCHEMES[map_id] for map_id in args.maps]
     else:
-        try:
-            idx = int(choice) - 1
-            if 0 <= idx < len(MAPS):
-                map_id = list(MAPS.keys())[idx]
-                maps_to_download = [(map_id, MAPS[map_id])]
-            else:
-                print("Opción inválida")
-                return
-        except ValueError:
-            print("Opción inválida")
+        maps_to_download = choose_maps()
+        if not maps_to_download:
             return
-    
-    total_downloaded = 0
-    total_existed = 0
-    total_failed = 0
-    
+
     start_time = time.time()
-    
-    for map_id, config in maps_to_download:
-        downloaded, existed, failed = download_map_tiles(map_id, config)
-        total_downloaded += downloaded
-        total_existed += existed
-        total_failed += failed
-    
+
+    total_downloaded, total_existed, total_failed = asyncio.run(
+        download_maps(maps_to_download, args.cdn.rstrip("/"), args.out, args.concurrency, args.retry_missing,
+                      args.sync, args.archive)
+    )
+
     elapsed = time.time() - start_time
-    
+
     print(f"""
 ╔══════════════════════════════════════════════════════════════╗
 ║                    RESUMEN FINAL                             ║
@@ -214,12 +511,14 @@ def main():
 ║  ❌ Fallidos:           {total_failed:>6}                             ║
 ║  ⏱️  Tiempo total:       {elapsed:.1f}s                              ║
 ║                                                              ║
-║  📂 Tiles guardados en: {str(TILES_DIR.absolute()):>35} ║
+║  📂 Tiles guardados en: {str((args.archive or args.out).absolute()):>35} ║
 ╚══════════════════════════════════════════════════════════════╝
     """)
-    
+
     if total_downloaded > 0 or total_existed > 0:
         print("✅ ¡Listo! Ahora puedes usar arc_maps_app.py con tiles locales.")
+    if total_failed:
+        print("↻ Vuelve a ejecutarlo para reintentar solo los tiles que faltan.")
 
 
 if __name__ == "__main__":
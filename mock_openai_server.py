@@ -0,0 +1,136 @@
+"""
+Servidor local que imita la API de OpenAI (chat.completions y responses)
+Sirve para probar las apps y arc_core.llm_client sin red ni coste:
+
+    python mock_openai_server.py --port 8765 --fail 2
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=sk-test streamlit run arc_maps_pro.py
+
+--fail N responde 429 (con Retry-After) a las N primeras peticiones y
+--error-status cambia ese código (p. ej. 503); --delay simula la
+latencia entre tokens.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Configuración compartida (la fija make_server)
+    fail_remaining = 0
+    error_status = 429
+    delay = 0.02
+    lock = threading.Lock()
+    requests = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _sse(self, events):
+        # Sin Content-Length: el cuerpo termina al cerrar la conexión
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for event in events:
+                self.wfile.write(f"data: {event}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(self.delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # el cliente cortó el stream
+
+    def _reply_text(self, body):
+        question = ""
+        for message in body.get("messages") or body.get("input") or []:
+            if message.get("role") == "user":
+                content = message.get("content")
+                question = content if isinstance(content, str) else " ".join(
+                    part.get("text", "") for part in content if isinstance(part, dict))
+        return f"Respuesta simulada a: {question}"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        with self.lock:
+            type(self).requests += 1
+            fail = type(self).fail_remaining > 0
+            if fail:
+                type(self).fail_remaining -= 1
+        if fail:
+            self._json(self.error_status, {"error": {"message": "simulated error", "type": "rate_limit"}},
+                       {"Retry-After": "0"})
+            return
+
+        text = self._reply_text(body)
+        words = [word + " " for word in text.split()]
+
+        if self.path.endswith("/chat/completions"):
+            if body.get("stream"):
+                chunks = [json.dumps({
+                    "id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": 0, "model": body.get("model"),
+                    "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+                }) for word in words]
+                self._sse(chunks + ["[DONE]"])
+            else:
+                self._json(200, {
+                    "id": "chatcmpl-mock", "object": "chat.completion", "created": 0, "model": body.get("model"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}],
+                })
+        elif self.path.endswith("/responses"):
+            response = {"id": "resp-mock", "object": "response", "status": "completed", "model": body.get("model"),
+                        "output": [{"type": "message", "role": "assistant",
+                                    "content": [{"type": "output_text", "text": text}]}]}
+            if body.get("stream"):
+                events = [json.dumps({"type": "response.output_text.delta", "delta": word}) for word in words]
+                events.append(json.dumps({"type": "response.completed", "response": response}))
+                self._sse(events)
+            else:
+                self._json(200, response)
+        else:
+            self._json(404, {"error": {"message": f"Ruta desconocida: {self.path}"}})
+
+
+def make_server(port=0, fail=0, error_status=429, delay=0.02):
+    """Servidor listo para serve_forever() (port=0 elige uno libre)"""
+    handler = type("Handler", (MockOpenAIHandler,), {
+        "fail_remaining": fail, "error_status": error_status, "delay": delay, "lock": threading.Lock(),
+    })
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API de OpenAI simulada para pruebas locales")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail", type=int, default=0, help="peticiones iniciales que fallan")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--delay", type=float, default=0.02, help="segundos entre tokens")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.fail, args.error_status, args.delay)
+    print(f"🧪 API simulada en http://127.0.0.1:{server.server_port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
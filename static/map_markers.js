@@ -0,0 +1,78 @@
+// Capa de marcadores de arc_maps_app.py (servida por Streamlit desde static/)
+//
+// Hidrata el JSON de arc_core.markers.marker_payload() (columnas + clusters por
+// zoom) y dibuja solo lo que cae en la vista al mover o hacer zoom. Los
+// títulos y notas se insertan como texto, nunca como HTML.
+//
+//   addMarkerLayer(map, data, {minZoom, maxZoom})
+//
+// data = {coords: [lat, lng, ...], kind: [0 POI | 1 personalizado],
+//         color: [índice en palette], palette: [...], title: [...],
+//         detail: [...], clusters: {zoom: [índice | [lat, lng, n]]}}
+
+function addMarkerLayer(map, data, options) {
+    var layer = L.layerGroup().addTo(map);
+    var coords = Float64Array.from(data.coords);
+    var customIcon = L.divIcon({
+        className: 'custom-marker',
+        html: '<div style="background:#FF5722;width:24px;height:24px;border-radius:50%;border:3px solid #fff;box-shadow:0 2px 5px rgba(0,0,0,0.5);"></div>',
+        iconSize: [24, 24],
+        iconAnchor: [12, 12]
+    });
+
+    function popup(i) {
+        var box = document.createElement('div');
+        box.style.minWidth = '150px';
+        var title = document.createElement('b');
+        title.textContent = data.title[i];
+        var detail = document.createElement('small');
+        detail.textContent = data.detail[i];
+        if (data.kind[i] === 0) detail.style.color = '#aaa';
+        box.appendChild(title);
+        box.appendChild(document.createElement('br'));
+        box.appendChild(detail);
+        return box;
+    }
+
+    function drawPoint(i) {
+        var latlng = [coords[2 * i], coords[2 * i + 1]];
+        var marker = data.kind[i] === 1
+            ? L.marker(latlng, {icon: customIcon})
+            : L.circleMarker(latlng, {
+                radius: 8, fillColor: data.palette[data.color[i]], color: '#000', weight: 2, opacity: 1, fillOpacity: 0.85
+            });
+        marker.addTo(layer).bindPopup(function() { return popup(i); });
+    }
+
+    function drawCluster(c, zoom) {
+        var size = c[2] < 10 ? 30 : c[2] < 100 ? 36 : 44;
+        L.marker([c[0], c[1]], {
+            icon: L.divIcon({
+                className: 'marker-cluster',
+                html: '<div style="width:' + size + 'px;height:' + size + 'px;line-height:' + size + 'px">' + c[2] + '</div>',
+                iconSize: [size, size],
+                iconAnchor: [size / 2, size / 2]
+            })
+        }).addTo(layer).on('click', function() {
+            map.setView([c[0], c[1]], Math.min(zoom + 2, map.getMaxZoom()));
+        });
+    }
+
+    // Redibujar solo lo que cae en la vista (con margen)
+    function draw() {
+        layer.clearLayers();
+        var zoom = Math.max(options.minZoom, Math.min(options.maxZoom, Math.round(map.getZoom())));
+        var view = map.getBounds().pad(0.25);
+        (data.clusters[zoom] || []).forEach(function(entry) {
+            if (typeof entry === 'number') {
+                if (view.contains([coords[2 * entry], coords[2 * entry + 1]])) drawPoint(entry);
+            } else if (view.contains([entry[0], entry[1]])) {
+                drawCluster(entry, zoom);
+            }
+        });
+    }
+
+    map.on('moveend', draw);
+    draw();
+    return layer;
+}
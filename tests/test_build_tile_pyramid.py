@@ -0,0 +1,72 @@
+"""build_tile_pyramid.py sobre un juego de tiles sintético de 2×2"""
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+
+from arc_core.tiles import TileScheme
+from build_tile_pyramid import ArchiveTiles, DirectoryTiles, build_map, encode
+
+# Zoom 0: 1 tile, zoom 1 (nativo): 2×2, zoom 2 (overzoom): 4×4
+SCHEME = TileScheme("test", "test", "/test", min_zoom=0, max_native_zoom=1, max_zoom=2, tile_size=64,
+                    world_size=64)
+COLORS = {(0, 0): (255, 0, 0), (1, 0): (0, 255, 0), (0, 1): (0, 0, 255), (1, 1): (255, 255, 0)}
+
+
+def color(data, at=(32, 32)):
+    with Image.open(io.BytesIO(data)) as image:
+        return image.convert("RGB").getpixel(at)
+
+
+def close_to(actual, expected, tolerance=24):
+    return all(abs(a - b) <= tolerance for a, b in zip(actual, expected))
+
+
+@pytest.fixture(params=["directory", "archive"])
+def store(request, tmp_path):
+    store = DirectoryTiles(tmp_path) if request.param == "directory" else ArchiveTiles(tmp_path / "t.mbtiles")
+    store.put_many([("test", 1, x, y, encode(Image.new("RGB", (64, 64), rgb), 95))
+                    for (x, y), rgb in COLORS.items()])
+    yield store
+    store.close()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ThreadPoolExecutor(2) as pool:
+        yield pool
+
+
+def test_overzoom_splits_each_native_tile(store, pool):
+    count, size = build_map(pool, store, SCHEME)
+    assert count == 16 and size > 0
+    for x in range(4):
+        for y in range(4):
+            assert close_to(color(store.get("test", 2, x, y)), COLORS[x // 2, y // 2])
+    # Ya hecho: una segunda pasada no genera nada
+    assert build_map(pool, store, SCHEME) == (0, 0)
+
+
+def test_lower_fills_missing_levels_from_children(store, pool):
+    count, _ = build_map(pool, store, SCHEME, lower=True)
+    assert count == 16 + 1
+    parent = store.get("test", 0, 0, 0)
+    for (x, y), rgb in COLORS.items():
+        assert close_to(color(parent, (16 + 32 * x, 16 + 32 * y)), rgb)
+
+
+def test_existing_tiles_are_left_untouched_even_with_force(store, pool):
+    native = {key: store.get("test", 1, *key) for key in COLORS}
+    store.put_many([("test", 0, 0, 0, b"cdn tile"), ("test", 2, 0, 0, b"stale overzoom")])
+
+    build_map(pool, store, SCHEME, lower=True)
+    assert store.get("test", 0, 0, 0) == b"cdn tile"
+
+    # --force rehace el overzoom, pero ni el nativo ni los inferiores del CDN
+    count, _ = build_map(pool, store, SCHEME, lower=True, force=True)
+    assert count == 16
+    assert store.get("test", 2, 0, 0) != b"stale overzoom"
+    assert store.get("test", 0, 0, 0) == b"cdn tile"
+    assert {key: store.get("test", 1, *key) for key in COLORS} == native
@@ -0,0 +1,69 @@
+"""SystemPrompt: el prompt se reutiliza mientras sus fuentes sean los mismos objetos"""
+
+import threading
+
+from arc_core import MAPS_DATA, RECIPES, SystemPrompt, build_system_prompt, context_hash, get_system_prompt
+
+ITEMS = [{"name": "Battery"}, {"name": "Bandage"}]
+
+
+def test_same_objects_reuse_the_prompt():
+    prompt = SystemPrompt()
+    text, digest = prompt.get(ITEMS, RECIPES, MAPS_DATA)
+    again = prompt.get(ITEMS, RECIPES, MAPS_DATA)
+    assert again[0] is text and again[1] == digest
+    assert prompt.builds == 1
+    assert text == build_system_prompt(ITEMS, RECIPES, MAPS_DATA)
+    assert digest == context_hash(text)
+
+
+def test_identity_not_equality_invalidates():
+    prompt = SystemPrompt()
+    text, digest = prompt.get(ITEMS, RECIPES, MAPS_DATA)
+    # Una lista igual pero nueva (p. ej. items_data.json recargado) reconstruye
+    rebuilt, same_digest = prompt.get(list(ITEMS), RECIPES, MAPS_DATA)
+    assert prompt.builds == 2
+    assert rebuilt == text and same_digest == digest
+
+
+def test_changed_sources_change_the_prompt():
+    prompt = SystemPrompt()
+    text, digest = prompt.get(ITEMS, RECIPES, MAPS_DATA)
+    maps = {"dam": MAPS_DATA["dam"]}
+    fewer, fewer_digest = prompt.get(ITEMS, RECIPES, maps)
+    assert fewer != text and fewer_digest != digest
+    assert "Dam Battlegrounds" in fewer and MAPS_DATA["spaceport"]["name"] not in fewer
+    assert f"{len(ITEMS[:1])} items" in prompt.get(ITEMS[:1], RECIPES, maps)[0]
+    assert prompt.builds == 3
+
+
+def test_prompt_is_a_stable_prefix():
+    # Lo que cambia por mensaje va detrás; el prompt no depende del mapa actual
+    text, _ = SystemPrompt().get(ITEMS, RECIPES, MAPS_DATA)
+    assert text == SystemPrompt().get(ITEMS, RECIPES, MAPS_DATA)[0]
+
+
+def test_concurrent_callers_build_once():
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def builder(items, recipes, maps):
+        calls.append(1)
+        return build_system_prompt(items, recipes, maps)
+
+    prompt = SystemPrompt(builder)
+
+    def worker():
+        barrier.wait()
+        prompt.get(ITEMS, RECIPES, MAPS_DATA)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1 and prompt.builds == 1
+
+
+def test_shared_prompt():
+    assert get_system_prompt(ITEMS, RECIPES, MAPS_DATA)[0] is get_system_prompt(ITEMS, RECIPES, MAPS_DATA)[0]
@@ -0,0 +1,106 @@
+"""Motor de crafteo e inventarios en texto (arc_core.crafting)"""
+
+import pytest
+
+from arc_core.crafting import CraftingEngine, RecipeCycleError, parse_inventory
+from arc_core.recipes import RECIPES
+
+
+def recipe(name, *materials):
+    return {"name": name, "materials": list(materials)}
+
+
+def chain(depth):
+    """Receta level_0 ← level_1 ← ... ← level_{depth-1} ← 2 Scrap"""
+    recipes = {f"level_{i}": recipe(f"Level {i}", (f"Level {i + 1}", 1)) for i in range(depth - 1)}
+    recipes[f"level_{depth - 1}"] = recipe(f"Level {depth - 1}", ("Scrap", 2))
+    return recipes
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return CraftingEngine(RECIPES)
+
+
+def test_base_materials_expand_intermediates(engine):
+    assert engine.base_materials("medkit", 2) == {"Cloth": 8, "Chemical": 2}
+    assert engine.base_materials("unknown") == {}
+
+
+def test_recipe_tree_scales_quantities(engine):
+    tree = engine.recipe_tree("medkit", 3)
+    assert tree["name"] == RECIPES["medkit"]["name"] and tree["quantity"] == 3 and tree["depth"] == 0
+    bandage, chemical = tree["materials"]
+    assert (bandage["quantity"], bandage["depth"]) == (6, 1)
+    assert bandage["materials"] == [{"name": "Cloth", "quantity": 12, "base": True}]
+    assert chemical == {"name": "Chemical", "quantity": 3, "base": True}
+    assert engine.recipe_tree("unknown") is None
+
+
+def test_craftable_with_uses_intermediates_in_stock(engine):
+    result = engine.craftable_with({"Cloth": 4, "Bandage": 2, "Chemical": 2})
+    assert result["bandage"] == 2
+    assert result["medkit"] == 2
+
+
+def test_recipes_using_is_transitive(engine):
+    assert engine.recipes_using("Cloth", transitive=False) == ["bandage"]
+    assert set(engine.recipes_using("Cloth")) == {"bandage", "medkit", "advanced_medkit"}
+
+
+def test_cycles_are_rejected():
+    recipes = {"a": recipe("A", ("B", 1)), "b": recipe("B", ("C", 1)), "c": recipe("C", ("A", 1))}
+    with pytest.raises(RecipeCycleError) as error:
+        CraftingEngine(recipes)
+    assert error.value.cycle[0] == error.value.cycle[-1]
+
+
+def test_deep_chains_do_not_recurse():
+    depth = 5000
+    engine = CraftingEngine(chain(depth))
+    assert engine.base_materials("level_0", 3) == {"Scrap": 6}
+
+    tree = engine.recipe_tree("level_0")
+    for _ in range(depth - 1):
+        tree = tree["materials"][0]
+    assert tree["depth"] == depth - 1
+    assert tree["materials"] == [{"name": "Scrap", "quantity": 2, "base": True}]
+
+    assert engine.max_craftable("level_0", {"scrap": 7}) == 3
+    assert engine.max_craftable("level_0", {"level_2500": 1}) == 1
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("4x Cloth", {"Cloth": 4}),
+    ("4 x Cloth", {"Cloth": 4}),
+    ("4 Cloth", {"Cloth": 4}),
+    ("4xCloth", {"Cloth": 4}),
+    ("Battery: 2", {"Battery": 2}),
+    ("Battery:2", {"Battery": 2}),
+    ("Battery × 2", {"Battery": 2}),
+    ("Battery×2", {"Battery": 2}),
+    ("Cable 3", {"Cable": 3}),
+    ("Cable x3", {"Cable": 3}),
+    ("Cable x 3", {"Cable": 3}),
+    ("Chemical", {"Chemical": 1}),
+    # Nombres que terminan en x
+    ("Box 3", {"Box": 3}),
+    ("Toolbox 2", {"Toolbox": 2}),
+    ("Flex 1", {"Flex": 1}),
+    ("Music Box x2", {"Music Box": 2}),
+    ("Fruit Mix: 4", {"Fruit Mix": 4}),
+    ("Frequency Modulation Box 1", {"Frequency Modulation Box": 1}),
+    ("Painted Box", {"Painted Box": 1}),
+])
+def test_parse_inventory_line(text, expected):
+    assert parse_inventory(text) == expected
+
+
+def test_parse_inventory_splits_and_sums():
+    text = "4x Cloth, Battery: 2; cable 3\n\n2 Cloth\n"
+    assert parse_inventory(text) == {"Cloth": 6, "Battery": 2, "cable": 3}
+
+
+def test_parse_inventory_empty():
+    assert parse_inventory("") == {}
+    assert parse_inventory(" , ;\n") == {}
@@ -0,0 +1,81 @@
+"""GameData: índices derivados, accesos cacheados y carga compartida por proceso"""
+
+import json
+
+import pytest
+
+from arc_core import MAPS_DATA, GameData, get_game_data, load_items, location_mask
+from arc_core.snapshot import build_snapshot
+
+ITEMS = [
+    {"name": "Battery", "description": "Powers devices", "type": "Electrical", "foundIn": ["Electrical", "industrial"]},
+    {"name": "Bandage", "description": "Stops bleeding", "type": "Medical", "foundIn": ["medical"]},
+    {"name": "Fabric", "type": "Basic Material", "foundIn": []},
+]
+
+
+def write_items(path, items):
+    path.write_text(json.dumps(items), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def game():
+    return GameData(ITEMS)
+
+
+def test_items_index_is_by_lowercase_name(game):
+    assert game.items_index["battery"] is ITEMS[0]
+    assert set(game.items_index) == {"battery", "bandage", "fabric"}
+
+
+def test_column_fills_missing_fields(game):
+    assert game.column("description") == ["Powers devices", "Stops bleeding", None]
+
+
+@pytest.mark.parametrize("name", ["items_index", "search_index", "item_masks", "locations", "spatial", "routes"])
+def test_indexes_are_built_once(game, name):
+    assert getattr(game, name) is getattr(game, name)
+
+
+def test_retriever_and_router_are_cached_per_map_set(game):
+    subset = {"dam": MAPS_DATA["dam"]}
+    assert game.retriever is game.retriever_for(MAPS_DATA)
+    assert game.retriever_for(subset) is game.retriever_for(dict(subset))
+    assert game.retriever_for(subset) is not game.retriever
+    assert game.intents is game.intents_for()
+    assert game.intents_for(subset) is not game.intents
+
+
+def test_item_masks(game):
+    assert game.item_masks == [location_mask(item["foundIn"]) for item in ITEMS]
+    assert game.item_masks[2] == 0
+
+
+def test_snapshot_masks_match_the_json(tmp_path):
+    path = write_items(tmp_path / "items.json", ITEMS)
+    build_snapshot(path)
+    snapshot = get_game_data(path)
+    assert hasattr(snapshot.items, "column")
+    assert snapshot.item_masks == GameData(load_items(path)).item_masks
+
+
+def test_locations_batch_matches_single_lookups(game):
+    batch = game.get_locations_batch(ITEMS, "dam")
+    assert batch == [game.get_locations(item, "dam") for item in ITEMS]
+    assert "Electrical Substation" in batch[0]
+    assert batch[2] == []
+    assert game.get_locations(ITEMS[0], "no-such-map") == []
+
+
+def test_game_data_is_shared_until_the_json_changes(tmp_path):
+    path = write_items(tmp_path / "items.json", ITEMS)
+    first = get_game_data(path)
+    assert get_game_data(path) is first
+    assert len(first) == 3
+
+    write_items(tmp_path / "items.json", ITEMS[:2])
+    second = get_game_data(path)
+    assert second is not first
+    assert len(second) == 2
+    assert get_game_data(path) is second
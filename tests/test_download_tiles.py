@@ -0,0 +1,219 @@
+"""Reanudación, reintentos y --sync de download_tiles contra un CDN local de prueba"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+import download_tiles
+from arc_core.tile_archive import TileArchive
+from arc_core.tiles import TILE_SCHEMES
+
+SCHEME = TILE_SCHEMES["dam"]
+TOTAL = SCHEME.count()
+
+
+class FakeCDN:
+    """Sirve un contenido distinto por ruta con ETag; permite inyectar 503 y 404"""
+
+    def __init__(self):
+        self.version = 1
+        self.failures = {}
+        self.missing = set()
+        self.requests = Counter()
+        self.statuses = Counter()
+        self.lock = threading.Lock()
+        cdn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                with cdn.lock:
+                    cdn.requests[path] += 1
+                    failing = cdn.failures.get(path, 0)
+                    if failing:
+                        cdn.failures[path] = failing - 1
+                body = cdn.content(path)
+                etag = f'"{hashlib.sha256(body).hexdigest()[:12]}"'
+                if failing:
+                    self.reply(503, headers={"Retry-After": "0"})
+                elif path in cdn.missing:
+                    self.reply(404)
+                elif self.headers.get("If-None-Match") == etag:
+                    self.reply(304)
+                else:
+                    self.reply(200, body, {"ETag": etag})
+
+            def reply(self, status, body=b"", headers=None):
+                with cdn.lock:
+                    cdn.statuses[status] += 1
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def content(self, path):
+        return f"{path} v{self.version}".encode()
+
+    def path(self, z, x, y):
+        return urlsplit(SCHEME.url(z, x, y, self.url)).path
+
+
+@pytest.fixture
+def cdn(monkeypatch):
+    # Sin esperas entre reintentos
+    monkeypatch.setattr(download_tiles, "backoff_delay", lambda *args, **kwargs: 0)
+    cdn = FakeCDN()
+    thread = threading.Thread(target=cdn.server.serve_forever, daemon=True)
+    thread.start()
+    yield cdn
+    cdn.server.shutdown()
+    cdn.server.server_close()
+
+
+def download(cdn, tiles_dir, **options):
+    return asyncio.run(download_tiles.download_maps([SCHEME], cdn.url, tiles_dir, concurrency=4, **options))
+
+
+def test_downloads_every_tile_and_records_the_manifest(cdn, tmp_path):
+    assert download(cdn, tmp_path) == (TOTAL, 0, 0)
+    store = download_tiles.DirectoryStore(tmp_path)
+    assert store.path(SCHEME.tileset, 2, 1, 0).read_bytes() == cdn.content(cdn.path(2, 1, 0))
+    manifest = json.loads((tmp_path / download_tiles.MANIFEST_NAME).read_text())["tiles"]
+    assert len(manifest) == TOTAL
+    assert not list(tmp_path.glob("**/.*.part"))
+
+
+def test_second_run_resumes_from_the_manifest(cdn, tmp_path):
+    download(cdn, tmp_path)
+    cdn.requests.clear()
+    assert download(cdn, tmp_path) == (0, TOTAL, 0)
+    assert not cdn.requests
+
+
+def test_truncated_tile_is_downloaded_again(cdn, tmp_path):
+    download(cdn, tmp_path)
+    path = download_tiles.DirectoryStore(tmp_path).path(SCHEME.tileset, 3, 2, 1)
+    path.write_bytes(b"cut")
+    assert download(cdn, tmp_path) == (1, TOTAL - 1, 0)
+    assert path.read_bytes() == cdn.content(cdn.path(3, 2, 1))
+
+
+def test_transient_errors_are_retried(cdn, tmp_path):
+    flaky = cdn.path(4, 3, 5)
+    cdn.failures[flaky] = 2
+    assert download(cdn, tmp_path) == (TOTAL, 0, 0)
+    assert cdn.requests[flaky] == 3
+    assert cdn.statuses[503] == 2
+
+
+def test_persistent_errors_fail_and_are_retried_next_run(cdn, tmp_path):
+    broken = cdn.path(4, 0, 0)
+    cdn.failures[broken] = download_tiles.MAX_RETRIES + 1
+    assert download(cdn, tmp_path) == (TOTAL - 1, 0, 1)
+    assert download(cdn, tmp_path) == (1, TOTAL - 1, 0)
+
+
+def test_missing_tiles_are_remembered(cdn, tmp_path):
+    gap = cdn.path(4, 7, 7)
+    cdn.missing.add(gap)
+    assert download(cdn, tmp_path) == (TOTAL - 1, 0, 0)
+    manifest = json.loads((tmp_path / download_tiles.MANIFEST_NAME).read_text())["tiles"]
+    assert manifest[f"{SCHEME.tileset}/4/7/7"] == {"missing": 404}
+
+    cdn.requests.clear()
+    assert download(cdn, tmp_path) == (0, TOTAL, 0)
+    cdn.missing.clear()
+    assert download(cdn, tmp_path, retry_missing=True) == (1, TOTAL - 1, 0)
+    assert cdn.requests[gap] == 1
+
+
+def test_sync_revalidates_and_fetches_only_changes(cdn, tmp_path):
+    download(cdn, tmp_path)
+    cdn.statuses.clear()
+    assert download(cdn, tmp_path, sync=True) == (0, TOTAL, 0)
+    assert cdn.statuses == {304: TOTAL}
+
+    cdn.version = 2
+    cdn.statuses.clear()
+    assert download(cdn, tmp_path, sync=True) == (TOTAL, 0, 0)
+    assert cdn.statuses == {200: TOTAL}
+    path = download_tiles.DirectoryStore(tmp_path).path(SCHEME.tileset, 1, 0, 0)
+    assert path.read_bytes() == cdn.content(cdn.path(1, 0, 0))
+
+
+def test_archive_store_resumes(cdn, tmp_path):
+    archive = tmp_path / "tiles.mbtiles"
+    assert download(cdn, tmp_path, archive=archive) == (TOTAL, 0, 0)
+    assert download(cdn, tmp_path, archive=archive) == (0, TOTAL, 0)
+    tiles = TileArchive(archive)
+    try:
+        assert tiles.get(SCHEME.tileset, 2, 1, 1)[0] == cdn.content(cdn.path(2, 1, 1))
+    finally:
+        tiles.close()
+
+
+def fast_successes(limiter, count, latency=0.01):
+    async def run():
+        for _ in range(count):
+            await limiter.success(latency)
+    asyncio.run(run())
+
+
+def test_limiter_grows_by_one_after_a_window_of_fast_successes():
+    limiter = download_tiles.AdaptiveLimiter(initial=4, minimum=2, maximum=6)
+    fast_successes(limiter, 3)
+    assert limiter.limit == 4
+    fast_successes(limiter, 1)
+    assert limiter.limit == 5
+    fast_successes(limiter, 5 + 6 + 6)
+    assert limiter.limit == limiter.peak == 6
+
+
+def test_limiter_shrinks_when_latency_degrades():
+    limiter = download_tiles.AdaptiveLimiter(initial=4, minimum=2, maximum=8)
+    fast_successes(limiter, 4, latency=0.01)
+    assert limiter.limit == 5
+    fast_successes(limiter, 5 * 4, latency=1.0)
+    assert limiter.limit < 5
+
+
+def test_limiter_halves_on_failure_once_per_cooldown():
+    limiter = download_tiles.AdaptiveLimiter(initial=16, minimum=3, maximum=32)
+    limiter.failure()
+    assert limiter.limit == 8
+    limiter.failure()
+    assert limiter.limit == 8
+    limiter._last_decrease -= download_tiles.DECREASE_COOLDOWN
+    limiter.failure()
+    assert limiter.limit == 4
+    limiter._last_decrease -= download_tiles.DECREASE_COOLDOWN
+    limiter.failure()
+    assert limiter.limit == 3
+
+
+def test_limiter_wakes_waiters_when_the_limit_grows():
+    async def run():
+        limiter = download_tiles.AdaptiveLimiter(initial=1, minimum=1, maximum=4)
+        await limiter.__aenter__()
+        waiter = asyncio.create_task(limiter.__aenter__())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        # Nadie sale del limitador: solo la subida del límite libera el hueco
+        await limiter.success(0.01)
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 2
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+"""Presupuesto de tokens y resumen acumulado de arc_core.history"""
+
+import pytest
+
+from arc_core import history
+from arc_core.history import IMAGE_TOKENS, MESSAGE_OVERHEAD, HistoryManager, message_tokens, summarize_locally
+
+
+@pytest.fixture(autouse=True)
+def approximate_tokens(monkeypatch):
+    # Conteo aproximado (~4 caracteres por token) con o sin tiktoken instalado
+    monkeypatch.setattr(history, "tiktoken", None)
+
+
+def turn(i, size=40):
+    role = "user" if i % 2 == 0 else "assistant"
+    return {"role": role, "content": f"Mensaje {i}. " + "x" * size}
+
+
+def test_count_tokens_without_tiktoken():
+    assert history.count_tokens("") == 0
+    assert history.count_tokens("abcde") == 2
+
+
+def test_message_tokens_counts_parts_and_images():
+    text = {"role": "user", "content": "abcd" * 5}
+    parts = {"role": "user", "content": [{"type": "input_text", "text": "abcd" * 5},
+                                         {"type": "input_image", "image_url": "data:..."}]}
+    assert message_tokens(text) == 5 + MESSAGE_OVERHEAD
+    assert message_tokens(parts) == 5 + IMAGE_TOKENS + MESSAGE_OVERHEAD
+
+
+def test_short_history_is_sent_as_is():
+    messages = [turn(i) for i in range(4)]
+    state = {}
+    assert HistoryManager(budget=1000).prepare(messages, state) == messages
+    assert state == {}
+
+
+def test_old_messages_fold_into_a_summary():
+    messages = [turn(i) for i in range(10)]
+    manager = HistoryManager(budget=80, summary_budget=30)
+    state = {}
+    sent = manager.prepare(messages, state)
+
+    assert sent[0]["role"] == "system"
+    assert sent[-1] == messages[-1]
+    kept = sent[1:]
+    assert kept == messages[state["folded"]:]
+    summary_cost = history.count_tokens(state["summary"]) + MESSAGE_OVERHEAD
+    assert summary_cost + sum(message_tokens(m) for m in kept) <= 80
+    assert state["summary"].splitlines()[-1].endswith(f": Mensaje {state['folded'] - 1}.")
+
+
+def test_folding_is_incremental():
+    calls = []
+
+    def summarizer(summary, messages):
+        calls.append(len(messages))
+        return summarize_locally(summary, messages)
+
+    manager = HistoryManager(budget=60, summarizer=summarizer)
+    messages = [turn(i) for i in range(10)]
+    state = {}
+    manager.prepare(messages, state)
+    folded, summarized = state["folded"], len(calls)
+    manager.prepare(messages, state)
+    assert state["folded"] == folded and len(calls) == summarized
+
+    messages += [turn(10), turn(11)]
+    manager.prepare(messages, state)
+    assert state["folded"] > folded
+    assert sum(calls) == state["folded"]
+
+
+def test_last_message_always_fits():
+    huge = [turn(0), turn(1, size=4000)]
+    state = {}
+    sent = HistoryManager(budget=10).prepare(huge, state)
+    assert sent[-1] == huge[-1] and state["folded"] == 1
+
+
+def test_summary_keeps_its_newest_lines():
+    manager = HistoryManager(budget=20, summary_budget=15)
+    state = {}
+    messages = [turn(i) for i in range(30)]
+    manager.prepare(messages, state)
+    summary = state["summary"]
+    assert history.count_tokens(summary) <= 15
+    assert summary.splitlines()[-1].endswith(f": Mensaje {state['folded'] - 1}.")
+
+
+def test_summarize_locally_takes_the_first_sentence():
+    long = {"role": "assistant", "content": "y" * 500 + ". Segunda frase."}
+    summary = summarize_locally("- previo", [{"role": "user", "content": "  Hola.  ¿Qué tal?"}, long,
+                                             {"role": "user", "content": ""}])
+    lines = summary.splitlines()
+    assert lines[:2] == ["- previo", "- Usuario: Hola."]
+    assert lines[2].endswith("…") and len(lines[2]) == len("- Asistente: ") + history.SUMMARY_LINE_CHARS
+    assert len(lines) == 3
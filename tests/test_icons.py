@@ -0,0 +1,114 @@
+"""Detección de rejilla y reconocimiento de iconos (arc_core.icons)"""
+
+import io
+import random
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFilter
+
+from arc_core.icons import ICON_BACKGROUND, IconIndex, detect_grid, icon_hash, is_inventory
+
+
+def make_icon(seed):
+    rng = random.Random(seed)
+    icon = Image.new("RGBA", (128, 128), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(icon)
+    for _ in range(6):
+        x, y = rng.randint(0, 100), rng.randint(0, 100)
+        color = tuple(rng.randint(60, 255) for _ in range(3)) + (255,)
+        shape = draw.ellipse if rng.random() < 0.5 else draw.rectangle
+        shape([x, y, x + rng.randint(15, 50), y + rng.randint(15, 50)], fill=color)
+    return icon
+
+
+def inventory_shot(icons, cell=96, origin=(37, 53), columns=6, rows=4):
+    """Captura sintética: rejilla de celdas con un icono en cada una → (imagen, ids por celda)"""
+    shot = Image.new("RGB", (1280, 720), (10, 10, 12))
+    draw = ImageDraw.Draw(shot)
+    placed = []
+    ids = list(icons)
+    for row in range(rows):
+        for col in range(columns):
+            x0, y0 = origin[0] + col * cell, origin[1] + row * cell
+            draw.rectangle([x0, y0, x0 + cell - 1, y0 + cell - 1], fill=ICON_BACKGROUND, outline=(90, 90, 140), width=3)
+            item_id = ids[(row * columns + col) % len(ids)]
+            icon = icons[item_id].copy()
+            icon.thumbnail((70, 70))
+            shot.paste(icon, (x0 + 13, y0 + 13), icon)
+            placed.append(item_id)
+    return shot, placed
+
+
+@pytest.fixture(scope="module")
+def icons():
+    return {f"item_{i}": make_icon(i) for i in range(12)}
+
+
+@pytest.fixture(scope="module")
+def index(icons):
+    return IconIndex({item_id: icon_hash(icon).tobytes().hex() for item_id, icon in icons.items()})
+
+
+def test_detect_grid_finds_inventory_cells(icons):
+    shot, _ = inventory_shot(icons)
+    grid = detect_grid(shot)
+    assert grid is not None
+    assert (grid.cell_width, grid.cell_height) == (96, 96)
+    # El inicio puede caer dentro del borde de 3 px de la celda
+    assert 37 <= grid.x <= 40 and 53 <= grid.y <= 56
+    # La rejilla se extiende por toda la captura; las celdas vacías se ignoran después
+    assert grid.columns >= 6 and grid.rows >= 4
+
+
+@pytest.mark.parametrize("blur", [0, 2, 6])
+def test_detect_grid_rejects_noise(blur):
+    rng = np.random.default_rng(blur)
+    noise = Image.fromarray(rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8))
+    if blur:
+        noise = noise.filter(ImageFilter.GaussianBlur(blur))
+    assert detect_grid(noise) is None
+
+
+def test_detect_grid_rejects_flat_image():
+    assert detect_grid(Image.new("RGB", (640, 480), (40, 40, 40))) is None
+
+
+def test_inventory_counts_items(icons, index):
+    shot, placed = inventory_shot(icons)
+    counts, recognized, unknown = index.inventory(shot)
+    assert unknown == 0
+    assert recognized == len(placed)
+    assert counts == {item_id: placed.count(item_id) for item_id in set(placed)}
+
+
+def test_non_grid_image_is_not_an_inventory(index):
+    noise = Image.fromarray(np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8))
+    counts, recognized, unknown = index.inventory(noise.filter(ImageFilter.GaussianBlur(3)))
+    assert counts == {}
+    assert not is_inventory(recognized, unknown)
+
+
+def png_bytes(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("data", [b"not an image", b"\x89PNG\r\n\x1a\n" + b"\0" * 64, "truncated"])
+def test_corrupt_upload_is_not_an_inventory(icons, index, data):
+    if data == "truncated":
+        data = png_bytes(inventory_shot(icons)[0])[:4096]
+    assert index.inventory(data) == ({}, 0, 0)
+
+
+@pytest.mark.parametrize("recognized, unknown, expected", [
+    (0, 0, False),
+    (3, 0, False),
+    (4, 0, True),
+    (4, 4, True),
+    (4, 5, False),
+    (20, 1, True),
+])
+def test_is_inventory_thresholds(recognized, unknown, expected):
+    assert is_inventory(recognized, unknown) is expected
@@ -0,0 +1,52 @@
+"""Preprocesado de capturas de arc_core.images"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from arc_core.images import MAX_LONG_SIDE, MAX_SHORT_SIDE, data_url, image_digest, prepare_image, sniff_mime
+
+
+def encode(image, fmt="PNG"):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def screenshot(width=2560, height=1440):
+    image = Image.new("RGB", (width, height), "black")
+    for x in range(0, width, 40):
+        image.paste((x % 256, 90, 200), (x, 100, x + 20, height - 100))
+    return image
+
+
+def test_large_screenshot_is_reduced_and_trimmed():
+    data = encode(screenshot())
+    prepared = prepare_image(data)
+    assert prepared.width <= MAX_LONG_SIDE and prepared.height <= MAX_SHORT_SIDE
+    # Las bandas negras de arriba y abajo se recortan antes de reducir
+    assert prepared.width / prepared.height > 2560 / 1440
+    assert len(prepared.data) < len(data)
+    assert prepared.digest == image_digest(data)
+    assert data_url(prepared).startswith(f"data:{prepared.mime};base64,")
+
+
+@pytest.mark.parametrize("data, mime", [
+    (b"not an image", "application/octet-stream"),
+    (b"\x89PNG\r\n\x1a\n" + b"\0" * 64, "image/png"),
+    (b"\xff\xd8\xff\xe0 truncated jpeg", "image/jpeg"),
+])
+def test_corrupt_upload_falls_back_to_raw_bytes(data, mime):
+    prepared = prepare_image(data)
+    assert prepared.data == data
+    assert prepared.mime == mime == sniff_mime(data)
+    assert prepared.width is None and prepared.digest == image_digest(data)
+
+
+def test_truncated_png_falls_back_to_raw_bytes():
+    pattern = Image.frombytes("RGB", (320, 180), bytes(range(256)) * 675)
+    data = encode(pattern)
+    data = data[:len(data) // 2]
+    prepared = prepare_image(data)
+    assert (prepared.data, prepared.mime, prepared.width) == (data, "image/png", None)
@@ -0,0 +1,60 @@
+"""Clasificación y negaciones de arc_core.intents"""
+
+import pytest
+
+from arc_core import MAPGENIE_MAPS, MAPS_DATA, RECIPES, TRANS, GameData
+from arc_core.intents import IntentRouter
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter(RECIPES, MAPS_DATA, TRANS)
+
+
+@pytest.mark.parametrize("text, name, slots", [
+    ("¿Cómo hago un medkit?", "recipe", {"recipe": "medkit"}),
+    ("receta del advanced medkit", "recipe", {"recipe": "advanced_medkit"}),
+    ("mejor mapa para ARC", "best_map", {"type": "ARC"}),
+    ("ruta de eléctrico en dam", "route", {"type": "electrical", "map": "dam"}),
+])
+def test_classify_fills_slots(router, text, name, slots):
+    intent = router.classify(text)
+    assert intent is not None
+    assert (intent.name, intent.slots) == (name, slots)
+
+
+@pytest.mark.parametrize("text", [
+    "no quiero craftear medkit, dime dónde está el reciclador",
+    "no quiero craftear medkit dime dónde está el reciclador",
+    "I don't want to craft a medkit",
+    "no hay ruta de ARC en dam?",
+])
+def test_negated_cues_fall_back_to_the_model(router, text):
+    assert router.classify(text) is None
+
+
+def test_negation_does_not_cross_clauses(router):
+    intent = router.classify("no tengo cloth, ¿cómo hago bandage?")
+    assert intent is not None and intent.slots == {"recipe": "bandage"}
+
+
+@pytest.mark.parametrize("text", ["no sé cómo hacer un medkit", "I don't know how to craft a medkit"])
+def test_not_knowing_how_is_still_a_question(router, text):
+    intent = router.classify(text)
+    assert intent is not None and intent.name == "recipe"
+
+
+def test_other_clause_intent_survives_negation(router):
+    intent = router.classify("no busco el mejor mapa para ARC, solo una ruta")
+    assert intent is not None and intent.name == "route"
+
+
+def test_app_router_ignores_maps_the_app_does_not_show():
+    game = GameData([], maps=MAPS_DATA)
+    router = game.intents_for(MAPGENIE_MAPS)
+    assert router is game.intents_for(MAPGENIE_MAPS)
+    assert router.classify("ruta de eléctrico en dam").slots == {"type": "electrical", "map": "dam"}
+    assert router.classify("ruta de eléctrico").slots == {"type": "electrical", "map": None}
+    # Un mapa del juego que la app no muestra: mejor la IA que una ruta en el mapa actual
+    assert router.classify("ruta de eléctrico en blue gate") is None
+    assert game.intents.classify("ruta de eléctrico en blue gate").slots["map"] == "blue-gate"
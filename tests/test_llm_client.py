@@ -0,0 +1,147 @@
+"""arc_core.llm_client contra mock_openai_server.py"""
+
+import threading
+
+import openai
+import pytest
+
+import mock_openai_server
+from arc_core import llm_client
+from arc_core.llm_client import DeadlineExceeded, LLMClient, get_llm_client
+from arc_core.streaming import chat_completion_deltas, collect_stream, response_deltas
+
+
+def start_server(**options):
+    server = mock_openai_server.make_server(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1"
+
+
+@pytest.fixture
+def mock_api(request):
+    server, url = start_server(**getattr(request, "param", {}))
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_client():
+    clients = []
+
+    def make(url, **options):
+        client = LLMClient("sk-test", url, **options)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.mark.parametrize("mock_api", [{"fail": 2, "delay": 0}], indirect=True)
+def test_retries_temporary_errors(mock_api, make_client):
+    server, url = mock_api
+    client = make_client(url)
+    reply = client.chat.completions.create(model="m", messages=[{"role": "user", "content": "hola"}])
+    assert reply.choices[0].message.content == "Respuesta simulada a: hola"
+    assert client.retries == 2
+    assert server.RequestHandlerClass.requests == 3
+
+
+@pytest.mark.parametrize("mock_api", [{"fail": 5, "error_status": 400, "delay": 0}], indirect=True)
+def test_does_not_retry_client_errors(mock_api, make_client):
+    server, url = mock_api
+    client = make_client(url)
+    with pytest.raises(openai.BadRequestError):
+        client.chat.completions.create(model="m", messages=[{"role": "user", "content": "hola"}])
+    assert server.RequestHandlerClass.requests == 1
+
+
+@pytest.mark.parametrize("mock_api", [{"delay": 0}], indirect=True)
+def test_streams_both_endpoints(mock_api, make_client):
+    _, url = mock_api
+    client = make_client(url)
+    messages = [{"role": "user", "content": "dónde hay baterías"}]
+    text, completed = collect_stream(chat_completion_deltas(client, model="m", messages=messages))
+    assert completed and text.strip() == "Respuesta simulada a: dónde hay baterías"
+    text, completed = collect_stream(response_deltas(client, model="m", input=messages))
+    assert completed and text.strip() == "Respuesta simulada a: dónde hay baterías"
+
+
+@pytest.mark.parametrize("mock_api", [{"delay": 0.2}], indirect=True)
+def test_deadline_covers_reading_the_stream(mock_api, make_client):
+    # El stream se abre enseguida pero tarda ~1 s en llegar entero
+    _, url = mock_api
+    client = make_client(url, deadline=0.5)
+    messages = [{"role": "user", "content": "una pregunta con bastantes palabras"}]
+    with pytest.raises(DeadlineExceeded):
+        collect_stream(chat_completion_deltas(client, model="m", messages=messages))
+
+
+@pytest.mark.parametrize("mock_api", [{"delay": 0.05}], indirect=True)
+def test_limits_concurrent_requests(mock_api, make_client):
+    _, url = mock_api
+    client = make_client(url, max_concurrency=2)
+    peak = []
+
+    def ask():
+        stream = client.chat.completions.create(model="m", stream=True,
+                                                messages=[{"role": "user", "content": "a b c"}])
+        for _ in stream:
+            peak.append(client.in_flight)
+
+    threads = [threading.Thread(target=ask) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak and max(peak) <= 2
+
+
+def test_registry_is_bounded_and_closes_evicted_clients(monkeypatch):
+    monkeypatch.setattr(llm_client, "_clients", type(llm_client._clients)())
+    first = get_llm_client("sk-1", "http://127.0.0.1:9/v1", max_clients=2)
+    assert get_llm_client("sk-1", "http://127.0.0.1:9/v1", max_clients=2) is first
+    second = get_llm_client("sk-2", "http://127.0.0.1:9/v1", max_clients=2)
+    third = get_llm_client("sk-3", "http://127.0.0.1:9/v1", max_clients=2)
+    assert len(llm_client._clients) == 2
+    assert first.closed and not first._thread.is_alive()
+    assert "sk-1" not in "".join(llm_client._clients)
+    for client in (second, third):
+        client.close()
+
+
+@pytest.mark.parametrize("mock_api", [{"delay": 0}], indirect=True)
+def test_evicted_client_still_works_for_its_holder(mock_api, monkeypatch):
+    monkeypatch.setattr(llm_client, "_clients", type(llm_client._clients)())
+    _, url = mock_api
+    held = get_llm_client("sk-0", url, max_clients=1)
+    old_loop = held.loop
+    other = get_llm_client("sk-1", url, max_clients=1)
+    assert held.closed and old_loop.is_closed()
+
+    messages = [{"role": "user", "content": "hola"}]
+    reply = held.chat.completions.create(model="m", messages=messages)
+    assert reply.choices[0].message.content == "Respuesta simulada a: hola"
+    text, completed = collect_stream(chat_completion_deltas(held, model="m", messages=messages))
+    assert completed and text.strip() == "Respuesta simulada a: hola"
+    for client in (held, other):
+        client.close()
+        assert client.closed
+
+
+@pytest.mark.parametrize("mock_api", [{"delay": 0.05}], indirect=True)
+def test_eviction_waits_for_open_streams(mock_api, monkeypatch):
+    monkeypatch.setattr(llm_client, "_clients", type(llm_client._clients)())
+    _, url = mock_api
+    busy = get_llm_client("sk-0", url, max_clients=1)
+    stream = busy.chat.completions.create(model="m", stream=True, messages=[{"role": "user", "content": "a b c"}])
+    next(stream)
+    other = get_llm_client("sk-1", url, max_clients=1)
+    assert not busy.closed
+    assert len(list(stream)) > 1
+    # El cierre aplazado ocurre al terminar el stream
+    busy._thread.join(timeout=5)
+    assert busy.closed
+    other.close()
@@ -0,0 +1,89 @@
+"""Cruce item → POIs por máscaras de bits frente a los filtros lineales originales"""
+
+import pytest
+
+from arc_core import ITEMS_FILE, MAPS_DATA, GameData, load_items
+from arc_core.locations import LOCATION_TYPES, LocationMatcher, location_flag, location_mask, mask_types
+from arc_core.snapshot import build_snapshot, load_snapshot
+
+
+def linear_locations(item, map_id):
+    """get_locations original: comparar listas de categorías POI a POI"""
+    found_in = [f.lower() for f in item.get("foundIn", [])]
+    matches = []
+    for poi in MAPS_DATA.get(map_id, {}).get("pois", []):
+        poi_types = [t.lower() for t in poi.get("types", [])]
+        if any(f in poi_types for f in found_in):
+            matches.append(poi["title"])
+    return matches
+
+
+def linear_best_maps(target_type):
+    results = []
+    for map_id, map_data in MAPS_DATA.items():
+        count = sum(1 for poi in map_data["pois"] if target_type.lower() in [t.lower() for t in poi.get("types", [])])
+        if count > 0:
+            results.append((map_data["name"], count, map_id))
+    results.sort(key=lambda x: -x[1])
+    return results
+
+
+@pytest.fixture(scope="module")
+def items():
+    return load_items()
+
+
+@pytest.fixture(scope="module")
+def matcher(items):
+    return LocationMatcher(MAPS_DATA, [location_mask(item.get("foundIn")) for item in items])
+
+
+@pytest.mark.parametrize("map_id", list(MAPS_DATA) + ["nowhere"])
+def test_locations_match_the_linear_filter(matcher, items, map_id):
+    for item in items:
+        assert matcher.locations(item, map_id) == linear_locations(item, map_id)
+
+
+@pytest.mark.parametrize("found_in", [[], ["ARC"], ["arc"], ["Medical", "Electrical"], ["unknown-category"]])
+def test_locations_for_handmade_items(matcher, found_in):
+    item = {"foundIn": found_in}
+    for map_id in MAPS_DATA:
+        assert matcher.locations(item, map_id) == linear_locations(item, map_id)
+
+
+@pytest.mark.parametrize("target_type", list(LOCATION_TYPES) + ["ELECTRICAL", "nope"])
+def test_best_maps_match_the_linear_count(matcher, target_type):
+    assert matcher.best_maps_for_type(target_type) == linear_best_maps(target_type)
+    if target_type != "nope":
+        subset = ["dam", "spaceport"]
+        assert [r[2] for r in matcher.best_maps_for_type(target_type, subset)] == \
+            [r[2] for r in linear_best_maps(target_type) if r[2] in subset]
+
+
+def test_pois_of_type(matcher):
+    pois = matcher.pois_of_type("dam", "Electrical")
+    assert pois == [poi for poi in MAPS_DATA["dam"]["pois"] if "electrical" in poi["types"]]
+    assert matcher.pois_of_type("dam", "nope") == []
+
+
+def test_snapshot_masks_give_the_same_matches(tmp_path, items):
+    json_path = tmp_path / "items.json"
+    with open(ITEMS_FILE, "rb") as f:
+        json_path.write_bytes(f.read())
+    build_snapshot(str(json_path))
+    snapshot = load_snapshot(str(json_path))
+    try:
+        game = GameData(snapshot, maps=MAPS_DATA)
+        for map_id in MAPS_DATA:
+            assert game.get_locations_batch(list(snapshot), map_id) == \
+                [linear_locations(item, map_id) for item in items]
+    finally:
+        snapshot.close()
+
+
+def test_flags_and_masks():
+    assert location_flag("ARC") == location_flag("arc") == 1 << LOCATION_TYPES.index("ARC")
+    assert location_flag("never-seen", create=False) == 0
+    mask = location_mask(["Medical", "raider"])
+    assert sorted(mask_types(mask)) == ["medical", "raider"]
+    assert location_mask(None) == 0
@@ -0,0 +1,41 @@
+"""Datos de los mapas: POIs reales, capas y mapas de MapGenie"""
+
+import pytest
+
+from arc_core import LOCATION_TYPES, MAP_URLS, MAPGENIE_MAPS, MAPS_DATA, TILE_SCHEMES
+
+
+@pytest.mark.parametrize("map_id", list(MAPS_DATA))
+def test_every_map_has_valid_pois(map_id):
+    map_data = MAPS_DATA[map_id]
+    assert map_data["id"] == map_id
+    assert map_data["pois"]
+    titles = [poi["title"] for poi in map_data["pois"]]
+    assert all(titles) and len(set(titles)) == len(titles)
+    for poi in map_data["pois"]:
+        x, y = poi["coords"][:2]
+        assert 0 <= x <= map_data["width"] and 0 <= y <= map_data["height"]
+        assert set(poi["types"]) <= set(LOCATION_TYPES)
+
+
+@pytest.mark.parametrize("map_id", list(MAPS_DATA))
+def test_zooms_come_from_the_tile_scheme(map_id):
+    map_data = MAPS_DATA[map_id]
+    assert map_data["minZoom"] <= map_data["maxNativeZoom"] <= map_data["maxZoom"]
+    for layer in map_data.get("layers", []):
+        assert layer["id"] in TILE_SCHEMES
+    if "tileUrl" in map_data:
+        assert map_id in TILE_SCHEMES
+
+
+def test_known_pois_keep_their_coordinates():
+    pois = {poi["title"]: poi for poi in MAPS_DATA["dam"]["pois"]}
+    assert pois["Hydrophonic Dome Complex"]["coords"] == [4010.5, 5237]
+    assert pois["Hydrophonic Dome Complex"]["types"] == ["nature", "industrial", "security"]
+    assert pois["Pale Apartments"]["types"] == ["residential"]
+
+
+def test_mapgenie_maps_are_the_linked_subset():
+    assert list(MAPGENIE_MAPS) == list(MAP_URLS)
+    for map_id, map_data in MAPGENIE_MAPS.items():
+        assert map_data is MAPS_DATA[map_id]
@@ -0,0 +1,105 @@
+"""Pruebas de los marcadores del mapa: payload, escapado del JSON y cargador de static/"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from arc_core import MAPS_DATA, MARKERS_JS, loader_tag, marker_payload, markers_json
+from arc_core.markers import loader_source
+
+EVIL = '</script><script>alert(1)</script><!-- <b>x</b>'
+
+MAP = {
+    "id": "test",
+    "width": 8192,
+    "minZoom": 0,
+    "maxZoom": 2,
+    "pois": [
+        {"title": EVIL, "coords": [1000, 1000], "types": ["loot"]},
+        {"title": "Extracción", "coords": [7000, 7000], "types": []},
+    ],
+}
+CUSTOM = [{"name": EVIL, "x": 4000, "y": 4000, "notes": "<img src=x onerror=alert(1)>"}]
+COLORS = {"loot": "#FFD700", "default": "#FFFFFF"}
+
+
+def test_payload_columns_line_up():
+    payload = marker_payload(MAP, CUSTOM, COLORS)
+    assert len(payload["coords"]) == 2 * 3
+    assert payload["kind"] == [0, 0, 1]
+    assert payload["title"] == [EVIL, "Extracción", EVIL]
+    assert payload["detail"] == ["loot", "Location", CUSTOM[0]["notes"]]
+    assert payload["palette"] == ["#FFD700", "#FFFFFF"]
+    assert [payload["palette"][c] for c in payload["color"][:2]] == ["#FFD700", "#FFFFFF"]
+    assert set(payload["clusters"]) == {0, 1, 2}
+
+
+def test_payload_of_real_map():
+    map_data = next(iter(MAPS_DATA.values()))
+    payload = marker_payload(map_data)
+    assert len(payload["title"]) == len(map_data["pois"])
+    assert payload["palette"] == ["#FFFFFF"]
+
+
+def test_json_has_no_raw_angle_brackets():
+    text = markers_json(marker_payload(MAP, CUSTOM, COLORS))
+    assert "<" not in text
+    assert json.loads(text)["title"][0] == EVIL
+    assert "Extracción" in text
+
+
+def test_loader_tag_by_url_or_inline():
+    tag = loader_tag(True)
+    assert tag.startswith('<script src="app/static/map_markers.js?v=')
+    assert loader_tag(True) == tag
+    assert loader_tag(True, base="/assets").startswith('<script src="/assets/map_markers.js?v=')
+    with open(MARKERS_JS, encoding="utf-8") as f:
+        assert loader_tag(False) == f"<script>{f.read()}</script>"
+
+
+HARNESS = """
+var innerHTML = [];
+function element(tag) {
+    var el = {tag: tag, style: {}, children: [], textContent: '',
+              appendChild: function(child) { this.children.push(child); }};
+    Object.defineProperty(el, 'innerHTML', {set: function(v) { innerHTML.push(v); }});
+    return el;
+}
+var document = {createElement: element};
+var popups = [];
+function layerObject() {
+    return {addTo: function() { return this; },
+            bindPopup: function(build) { popups.push(build); return this; },
+            on: function() { return this; }};
+}
+var L = {
+    layerGroup: function() { var g = layerObject(); g.clearLayers = function() {}; return g; },
+    divIcon: function(o) { return o; },
+    marker: layerObject,
+    circleMarker: layerObject
+};
+var map = {
+    on: function() {}, getZoom: function() { return 2; }, getMaxZoom: function() { return 2; },
+    getBounds: function() { return {pad: function() { return {contains: function() { return true; }}; }}; }
+};
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node no está instalado")
+def test_popups_render_titles_as_text():
+    script = "\n".join([
+        HARNESS,
+        loader_source(),
+        f"addMarkerLayer(map, {markers_json(marker_payload(MAP, CUSTOM, COLORS))}, {{minZoom: 0, maxZoom: 2}});",
+        "var boxes = popups.map(function(build) { return build(); });",
+        "console.log(JSON.stringify({innerHTML: innerHTML, popups: boxes.map(function(box) {",
+        "    return [box.children[0].textContent, box.children[2].textContent]; })}));",
+    ])
+    out = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout
+    result = json.loads(out)
+    assert result["innerHTML"] == []
+    assert sorted(result["popups"]) == sorted([
+        [EVIL, "loot"], ["Extracción", "Location"], [EVIL, CUSTOM[0]["notes"]],
+    ])
@@ -0,0 +1,69 @@
+"""Claves, caducidad y expulsión de arc_core.response_cache"""
+
+import pytest
+
+from arc_core.response_cache import ResponseCache, context_hash, normalize_question
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_normalize_question_ignores_case_accents_and_punctuation():
+    assert normalize_question("¿Dónde está el  RECICLADOR?") == normalize_question("donde esta el reciclador")
+
+
+def test_equivalent_questions_share_an_entry(cache):
+    cache.put("¿Dónde está el reciclador?", "dam", "ctx", "En la presa")
+    assert cache.get("donde esta el RECICLADOR", "dam", "ctx") == "En la presa"
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("question, map_id, digest", [
+    ("donde esta el reciclador", "spaceport", "ctx"),
+    ("donde esta el reciclador", "dam", "otro"),
+    ("donde esta el reciclador", None, "ctx"),
+    ("donde esta la bateria", "dam", "ctx"),
+])
+def test_key_depends_on_question_map_and_context(cache, question, map_id, digest):
+    cache.put("¿Dónde está el reciclador?", "dam", "ctx", "En la presa")
+    assert cache.get(question, map_id, digest) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_context_hash_changes_with_context():
+    assert context_hash("a") == context_hash("a")
+    assert context_hash("a") != context_hash("b")
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=-1)
+    cache.put("pregunta", "dam", "ctx", "respuesta")
+    assert cache.get("pregunta", "dam", "ctx") is None
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put("uno", "dam", "ctx", "1")
+    cache.put("dos", "dam", "ctx", "2")
+    assert cache.get("uno", "dam", "ctx") == "1"
+    cache.put("tres", "dam", "ctx", "3")
+    assert cache.get("dos", "dam", "ctx") is None
+    assert cache.get("uno", "dam", "ctx") == "1"
+    assert len(cache) == 2
+    cache.close()
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(path)
+    cache.put("pregunta", "dam", "ctx", "respuesta")
+    cache.close()
+    reopened = ResponseCache(path)
+    assert reopened.get("pregunta", "dam", "ctx") == "respuesta"
+    reopened.close()
@@ -0,0 +1,91 @@
+"""BM25 y recuperación de contexto de arc_core.retrieval"""
+
+import math
+
+import pytest
+
+from arc_core import MAPGENIE_MAPS, MAPS_DATA, GameData
+from arc_core.retrieval import BM25_B, BM25_K1, BM25Index, ContextRetriever, tokenize
+
+ITEMS = [
+    {"name": "Battery", "type": "Electrical", "rarity": "Uncommon", "description": "Stores power",
+     "foundIn": ["Electrical", "Industrial"]},
+    {"name": "Medkit", "type": "Medical", "rarity": "Common", "description": "Restores health",
+     "foundIn": ["Medical"]},
+    {"name": "Fabric", "type": "Basic Material", "rarity": None, "description": None, "foundIn": None},
+]
+RECIPES = {
+    "medkit": {"name": "Medkit", "materials": [("Fabric", 2), ("Chemicals", 1)], "category": "Medical"},
+    "light_bulb": {"name": "Light Bulb", "materials": [("Battery", 1), ("Wires", 2)]},
+}
+MAPS = {
+    "dam": {"name": "Dam Battlegrounds", "pois": [
+        {"title": "Power Generation Complex", "types": ["industrial", "electrical"]},
+        {"title": "Field Hospital", "types": ["medical"]},
+    ]},
+}
+TRANSLATIONS = {"bateria": "battery", "tela": "fabric"}
+
+
+def test_tokenize_normalizes_and_drops_stopwords():
+    assert tokenize("¿Dónde están las Baterías?") == ["estan", "bateria"]
+    assert tokenize("The batteries and wires") == ["battery", "wire"]
+    assert tokenize(None) == []
+
+
+def test_bm25_matches_the_formula():
+    docs = [["a", "b", "b"], ["b", "c"], ["c"]]
+    index = BM25Index(docs)
+    avg = 2.0
+    idf = math.log(1 + (3 - 2 + 0.5) / (2 + 0.5))
+    expected = idf * 2 * (BM25_K1 + 1) / (2 + BM25_K1 * (1 - BM25_B + BM25_B * 3 / avg))
+    assert index.scores(["b"])[0] == pytest.approx(expected)
+    assert index.scores(["b", "b"]) == index.scores(["b"])
+    assert index.scores(["zzz"]) == {}
+
+
+def test_rare_terms_and_short_documents_rank_first():
+    index = BM25Index([["x", "common"], ["common"], ["common", "filler", "filler", "filler"]])
+    assert [doc for doc, _ in index.top(["common"], 3)] == [1, 0, 2]
+    assert index.top(["x", "common"], 1)[0][0] == 0
+    assert BM25Index([]).top(["x"], 3) == []
+
+
+@pytest.fixture(scope="module")
+def retriever():
+    return ContextRetriever(ITEMS, RECIPES, MAPS, TRANSLATIONS)
+
+
+def test_spanish_queries_are_translated(retriever):
+    assert retriever.query_tokens("¿tela?") == ["fabric", "tela"]
+    found = retriever.retrieve("¿Dónde encuentro batería?")
+    assert found["items"][0]["name"] == "Battery"
+    assert found["recipes"][0][0] == "light_bulb"
+    assert found["pois"] == []
+    assert retriever.retrieve("power")["pois"][0][1]["title"] == "Power Generation Complex"
+
+
+def test_limits_and_empty_results(retriever):
+    found = retriever.retrieve("medical", items=1, recipes=0, pois=5)
+    assert [item["name"] for item in found["items"]] == ["Medkit"]
+    assert found["recipes"] == []
+    assert [poi["title"] for _, poi in found["pois"]] == ["Field Hospital"]
+    assert retriever.format_context("zzz") == ""
+
+
+def test_format_context_lists_every_section(retriever):
+    context = retriever.format_context("tela medkit")
+    assert context.startswith("ITEMS RELEVANTES:\n- Fabric (common, Basic Material): unknown\n")
+    assert "- Medkit (Common, Medical): Medical" in context
+    assert "RECETAS RELEVANTES:\n- Medkit: necesita 2x Fabric, 1x Chemicals" in context
+
+
+def test_app_retriever_only_cites_the_apps_maps():
+    game = GameData(ITEMS, maps=MAPS_DATA)
+    question = "Trapper's Glade Gate Control Room"
+    assert game.retriever.retrieve(question)["pois"][0][0] == "blue-gate"
+
+    retriever = game.retriever_for(MAPGENIE_MAPS)
+    assert retriever is game.retriever_for(MAPGENIE_MAPS)
+    for text in (question, "electrical", "medical industrial", "dam"):
+        assert {map_id for map_id, _ in retriever.retrieve(text)["pois"]} <= set(MAPGENIE_MAPS)
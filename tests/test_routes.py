@@ -0,0 +1,92 @@
+"""Solvers de rutas de arc_core.routes frente a la fuerza bruta"""
+
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from arc_core.routes import EXACT_LIMIT, RoutePlanner, path_length, solve_exact, solve_heuristic, solve_path
+from arc_core.spatial import pairwise_distances
+
+
+def random_matrix(n, seed, free_start=False, free_end=False):
+    """Matriz de n POIs más inicio (0) y final (n+1), con extremos libres opcionales"""
+    points = np.random.default_rng(seed).uniform(0, 1000, size=(n + 2, 2))
+    matrix = pairwise_distances(points)
+    if free_start:
+        matrix[0, :] = 0
+    if free_end:
+        matrix[:, -1] = 0
+    return matrix.tolist()
+
+
+def brute_force(matrix):
+    n = len(matrix) - 2
+    return min(path_length(matrix, [0, *order, n + 1]) for order in permutations(range(1, n + 1)))
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("free_start, free_end", [(False, False), (True, False), (True, True)])
+def test_exact_is_optimal(seed, free_start, free_end):
+    matrix = random_matrix(6, seed, free_start, free_end)
+    order = solve_exact(matrix)
+    assert sorted(order) == list(range(1, 7))
+    assert path_length(matrix, [0, *order, 7]) == pytest.approx(brute_force(matrix))
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_heuristic_visits_everything_and_stays_close(seed):
+    matrix = random_matrix(8, seed)
+    order = solve_heuristic(matrix)
+    assert sorted(order) == list(range(1, 9))
+    optimum = brute_force(matrix)
+    assert optimum - 1e-6 <= path_length(matrix, [0, *order, 9]) <= optimum * 1.1
+
+
+def test_heuristic_is_optimal_on_a_line():
+    points = np.array([[0, 0]] + [[x, 0] for x in (7, 2, 9, 4, 1, 8, 3, 6, 5)] + [[10, 0]], dtype=float)
+    matrix = pairwise_distances(points).tolist()
+    order = solve_heuristic(matrix)
+    assert [points[k][0] for k in order] == list(range(1, 10))
+
+
+def test_degenerate_sizes():
+    assert solve_exact([[0, 1], [1, 0]]) == []
+    assert solve_heuristic([[0, 1], [1, 0]]) == []
+    assert solve_path(random_matrix(1, 0)) == [1]
+
+
+def test_solve_path_switches_to_the_heuristic():
+    order = solve_path(random_matrix(EXACT_LIMIT + 3, 1))
+    assert sorted(order) == list(range(1, EXACT_LIMIT + 4))
+
+
+MAPS = {
+    "test": {
+        "width": 1000,
+        "pois": [
+            {"title": "A", "coords": [100, 0], "types": ["electrical"]},
+            {"title": "B", "coords": [300, 0], "types": ["electrical", "industrial"]},
+            {"title": "C", "coords": [200, 0], "types": ["electrical"]},
+            {"title": "D", "coords": [500, 500], "types": ["medical"]},
+        ],
+    },
+}
+
+
+def test_planner_orders_pois_between_start_and_end():
+    planner = RoutePlanner(MAPS)
+    route, length = planner.plan("test", "electrical", start=[0, 0], end=[400, 0])
+    assert [poi["title"] for poi in route] == ["A", "C", "B"]
+    assert length == pytest.approx(400)
+
+
+def test_planner_with_free_ends_and_several_types():
+    planner = RoutePlanner(MAPS)
+    route, length = planner.plan("test", ["industrial", "medical"])
+    assert {poi["title"] for poi in route} == {"B", "D"}
+    assert length == pytest.approx(np.hypot(200, 500))
+
+
+def test_planner_without_matching_pois():
+    assert RoutePlanner(MAPS).plan("test", "ARC") == ([], 0.0)
@@ -0,0 +1,90 @@
+"""ItemSearchIndex frente al recorrido lineal por subcadenas"""
+
+import pytest
+
+from arc_core import GameData, load_items
+from arc_core.search import FIELD_WEIGHTS, ItemSearchIndex, normalize
+
+ITEMS = [
+    {"name": "Advanced Medkit", "description": "Restores a lot of health", "type": "Medical"},
+    {"name": "Medkit", "description": "Restores health", "type": "Medical"},
+    {"name": "Battery", "description": "Powers electrical devices", "type": "Electrical"},
+    {"name": "Wires", "description": "Electrical scrap", "type": "Electrical"},
+    {"name": "Fabric", "description": None, "type": "Basic Material"},
+    {"name": "ARC Alloy", "description": "Salvaged from ARC machines", "type": "ARC"},
+]
+TRANSLATIONS = {"bateria": "battery", "tela": "fabric"}
+
+
+def linear_score(query, translations=TRANSLATIONS):
+    """La búsqueda original: subcadena campo a campo sobre todos los items"""
+    index = ItemSearchIndex([], translations)
+    scores = {}
+    for term in index.expand_query(query):
+        for idx, item in enumerate(ITEMS):
+            for field, weight in FIELD_WEIGHTS.items():
+                if term in str(item.get(field) or "").lower():
+                    scores[idx] = scores.get(idx, 0) + weight
+    return scores
+
+
+@pytest.fixture(scope="module")
+def index():
+    return ItemSearchIndex(ITEMS, TRANSLATIONS)
+
+
+@pytest.mark.parametrize("query", [
+    "medkit", "Advanced Medkit", "a", "ar", "electrical scrap", "batería", "tela", "zzz", "kit heal", "ARC",
+])
+def test_score_matches_linear_scan(index, query):
+    assert index.score(query) == linear_score(query)
+
+
+def test_translations_expand_the_query(index):
+    assert index.search("batería")[0]["name"] == "Battery"
+    assert index.search("tela")[0]["name"] == "Fabric"
+
+
+def test_results_are_ranked_and_ties_keep_database_order(index):
+    names = [item["name"] for item in index.search("medkit")]
+    assert names == ["Advanced Medkit", "Medkit"]
+    assert [item["name"] for item in index.search("electrical", limit=1)] == ["Battery"]
+
+
+def test_no_match_returns_nothing(index):
+    assert index.search("zzz") == []
+
+
+def test_normalize_drops_case_and_accents():
+    assert normalize("  Batería ÚTIL ") == "bateria util"
+
+
+def test_field_weights():
+    assert FIELD_WEIGHTS == {"name": 10, "description": 3, "type": 5}
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("fabric", {4: 10}),
+    ("health", {0: 3, 1: 3}),
+    ("medical", {0: 5, 1: 5}),
+    ("electrical", {2: 3 + 5, 3: 3 + 5}),
+    ("arc", {5: 10 + 3 + 5}),
+])
+def test_each_field_adds_its_weight(index, query, expected):
+    assert index.score(query) == expected
+
+
+def test_words_and_full_query_add_up(index):
+    # "advanced medkit" + "advanced" + "medkit" en el nombre; "medkit" en el del Medkit
+    assert index.score("advanced medkit") == {0: 3 * 10, 1: 10}
+
+
+@pytest.fixture(scope="module")
+def game():
+    return GameData(load_items())
+
+
+def test_real_items(game):
+    assert game.search_items("battery")[0]["name"] == "Battery"
+    assert game.search_items("batería")[0]["name"] == "Battery"
+    assert len(game.search_items("a", limit=5)) == 5
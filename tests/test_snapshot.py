@@ -0,0 +1,90 @@
+"""Ida y vuelta de arc_core.snapshot y su invalidación"""
+
+import json
+import os
+
+import pytest
+
+from arc_core.search import ItemSearchIndex
+from arc_core.snapshot import ItemSnapshot, build_snapshot, compile_snapshot, load_snapshot
+
+ITEMS = [
+    {"id": "medkit", "name": "Medkit", "description": "Cura", "rarity": "Common", "type": "Medical",
+     "foundIn": ["Medical", "Residential"], "value": 250, "icon": "medkit.png", "updatedAt": "2025-01-01"},
+    {"id": "battery", "name": "Batería", "description": None, "rarity": None, "type": "Electrical",
+     "foundIn": [], "value": None},
+    {"id": "scrap", "name": "Scrap", "type": "Basic Material", "value": -3, "stack": 50, "tags": ["a", "b"]},
+    {"id": "alloy", "name": "ARC Alloy", "rarity": "Rare", "foundIn": ["ARC"], "value": 2**40},
+]
+
+
+@pytest.fixture
+def items_json(tmp_path):
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps(ITEMS, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def snapshot(items_json):
+    out_path, count, _ = build_snapshot(items_json)
+    assert count == len(ITEMS)
+    snapshot = ItemSnapshot(out_path)
+    yield snapshot
+    snapshot.close()
+
+
+def test_round_trip_preserves_items(snapshot):
+    assert list(snapshot) == ITEMS
+    assert snapshot[-1] == ITEMS[-1]
+    assert snapshot[1:3] == ITEMS[1:3]
+    with pytest.raises(IndexError):
+        snapshot[len(ITEMS)]
+
+
+def test_items_are_built_once(snapshot):
+    assert snapshot[0] is snapshot[0]
+
+
+def test_column_and_found_in_masks(snapshot):
+    assert snapshot.column("name") == [item["name"] for item in ITEMS]
+    assert snapshot.column("stack") == [None, None, 50, None]
+    masks = list(snapshot.found_in_masks())
+    for item, mask in zip(ITEMS, masks):
+        found = {category for bit, category in enumerate(snapshot.categories) if mask >> bit & 1}
+        assert found == set(item.get("foundIn") or [])
+
+
+def test_search_index_accepts_a_snapshot(snapshot):
+    assert ItemSearchIndex(snapshot).search("bater") == ItemSearchIndex(ITEMS).search("bater")
+
+
+def test_load_snapshot_requires_a_fresh_build(items_json):
+    assert load_snapshot(items_json) is None
+    build_snapshot(items_json)
+    snapshot = load_snapshot(items_json)
+    assert snapshot is not None and len(snapshot) == len(ITEMS)
+    snapshot.close()
+
+    with open(items_json, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert load_snapshot(items_json) is None
+
+
+def test_load_snapshot_without_source_json(items_json):
+    build_snapshot(items_json)
+    os.remove(items_json)
+    snapshot = load_snapshot(items_json)
+    assert snapshot is not None and snapshot[0] == ITEMS[0]
+    snapshot.close()
+
+
+def test_rejects_foreign_files_and_bad_values(tmp_path):
+    bogus = tmp_path / "items.snapshot"
+    bogus.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError):
+        ItemSnapshot(str(bogus))
+    with pytest.raises(ValueError):
+        compile_snapshot([{"id": "x", "value": "mucho"}])
+    with pytest.raises(ValueError):
+        compile_snapshot([{"id": 3}])
@@ -0,0 +1,111 @@
+"""Consultas de arc_core.spatial (rejilla y fuerza bruta) y clusters por zoom"""
+
+import numpy as np
+import pytest
+
+from arc_core.spatial import BRUTE_FORCE_LIMIT, MapSpatialIndex, SpatialIndex, cluster_grid, cluster_levels, to_leaflet
+
+WIDTH = 8192
+
+
+def random_pois(n, seed):
+    coords = np.random.default_rng(seed).uniform(0, WIDTH, size=(n, 2))
+    return [{"title": f"P{i}", "coords": [x, y], "types": ["electrical" if i % 3 else "medical"]}
+            for i, (x, y) in enumerate(coords.tolist())]
+
+
+@pytest.fixture(scope="module", params=[BRUTE_FORCE_LIMIT // 2, BRUTE_FORCE_LIMIT * 8])
+def index(request):
+    return MapSpatialIndex(random_pois(request.param, request.param), WIDTH)
+
+
+def reference(index, point):
+    dist = np.hypot(*(index.coords - np.asarray(point)).T)
+    return dist, np.lexsort((np.arange(len(dist)), dist))
+
+
+@pytest.mark.parametrize("point", [(4096, 4096), (0, 0), (8000, 150), (-500, 9000)])
+@pytest.mark.parametrize("k", [1, 5, 40])
+def test_nearest_matches_a_full_scan(index, point, k):
+    dist, order = reference(index, point)
+    found, found_dist = index.nearest(point, k)
+    k = min(k, len(index))
+    assert found_dist == pytest.approx(dist[order[:k]])
+    assert set(found.tolist()) <= set(np.flatnonzero(dist <= dist[order[k - 1]]).tolist())
+
+
+@pytest.mark.parametrize("point", [(4096, 4096), (10, 8100), (-300, -300)])
+@pytest.mark.parametrize("radius", [0, 400, 1500])
+def test_within_matches_a_full_scan(index, point, radius):
+    dist, order = reference(index, point)
+    expected = [i for i in order.tolist() if dist[i] <= radius]
+    found, found_dist = index.within(point, radius)
+    assert found.tolist() == expected
+    assert found_dist == pytest.approx(dist[expected])
+
+
+def test_distances_and_route_length():
+    index = MapSpatialIndex([{"coords": [0, 0]}, {"coords": [3, 4]}, {"coords": [3, 0]}], 100)
+    assert index.distances[0, 1] == pytest.approx(5)
+    assert index.route_length([0, 1, 2]) == pytest.approx(9)
+    assert index.route_length([1]) == 0.0
+
+
+def test_empty_map():
+    index = SpatialIndex({})["nowhere"]
+    assert len(index) == 0
+    assert index.nearest((0, 0), 3)[0].tolist() == []
+    assert index.within((0, 0), 100)[0].tolist() == []
+
+
+def test_spatial_index_builds_each_map_once():
+    spatial = SpatialIndex({"test": {"width": WIDTH, "pois": random_pois(10, 0)}})
+    assert spatial["test"] is spatial["test"]
+    (poi, dist), = spatial.nearest("test", spatial["test"].pois[4]["coords"])
+    assert poi["title"] == "P4" and dist == 0
+
+
+def test_to_leaflet_scales_to_a_256_world():
+    lat, lng = to_leaflet([[WIDTH, 0], [WIDTH / 2, WIDTH]], WIDTH)
+    assert lat.tolist() == [0, -256]
+    assert lng.tolist() == [256, 128]
+
+
+def test_cluster_grid_groups_nearby_points():
+    lats = [-10.0, -10.1, -10.2, -100.0]
+    lngs = [10.0, 10.1, 10.2, 100.0]
+    clusters = cluster_grid(lats, lngs, zoom=1)
+    assert 3 in clusters
+    (lat, lng, count), = [entry for entry in clusters if isinstance(entry, list)]
+    assert (lat, lng, count) == (pytest.approx(-10.1), pytest.approx(10.1), 3)
+    assert cluster_grid([], [], zoom=1) == []
+
+
+def test_cluster_levels_split_with_zoom():
+    pois = random_pois(300, 7)
+    lat, lng = to_leaflet([poi["coords"] for poi in pois], WIDTH)
+    levels = cluster_levels(lat, lng, 1, 5)
+    assert levels[5] == list(range(300))
+    previous = 0
+    for zoom in range(1, 5):
+        entries = levels[zoom]
+        # Cada punto aparece una vez, suelto o dentro de un cluster
+        assert sum(1 if isinstance(entry, int) else entry[2] for entry in entries) == 300
+        assert len(entries) >= previous
+        previous = len(entries)
+
+
+def test_huge_radius_only_visits_occupied_cells():
+    index = MapSpatialIndex(random_pois(BRUTE_FORCE_LIMIT * 4, 3), WIDTH)
+    visited = []
+    gather = index._gather
+
+    def counting_gather(cells):
+        cells = list(cells)
+        visited.extend(cells)
+        return gather(cells)
+
+    index._gather = counting_gather
+    found, _ = index.within((4096, 4096), 1e9)
+    assert len(found) == len(index)
+    assert len(visited) <= (index._cell_max[0] - index._cell_min[0] + 1) * (index._cell_max[1] - index._cell_min[1] + 1)
@@ -0,0 +1,87 @@
+"""Archivo de tiles deduplicado de arc_core.tile_archive"""
+
+import sqlite3
+
+import pytest
+
+from arc_core.tile_archive import TileArchive, pack_directory, tile_hash, tms_row
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = TileArchive(tmp_path / "tiles.mbtiles")
+    yield archive
+    archive.close()
+
+
+def test_round_trip(archive):
+    tile_id = archive.put("dam", 3, 5, 1, b"tile-data")
+    assert tile_id == tile_hash(b"tile-data")
+    assert archive.get("dam", 3, 5, 1) == (b"tile-data", tile_id)
+    assert archive.size("dam", 3, 5, 1) == len(b"tile-data")
+    assert archive.get("dam", 3, 1, 5) is None
+    assert archive.get("spaceport", 3, 5, 1) is None
+    assert archive.size("dam", 4, 5, 1) is None
+
+
+def test_identical_tiles_are_stored_once(archive):
+    archive.put_many([("dam", 2, x, y, b"water") for x in range(4) for y in range(4)])
+    archive.put("spaceport", 1, 0, 0, b"water")
+    archive.put("spaceport", 1, 1, 0, b"land")
+    assert archive.stats() == {"tiles": 18, "unique": 2, "bytes": len(b"water") + len(b"land")}
+
+
+def test_overwrite_and_vacuum(archive):
+    archive.put("dam", 1, 0, 0, b"old")
+    archive.put("dam", 1, 0, 0, b"new")
+    assert archive.get("dam", 1, 0, 0)[0] == b"new"
+    assert archive.stats()["unique"] == 2
+    archive.vacuum()
+    assert archive.stats() == {"tiles": 1, "unique": 1, "bytes": 3}
+
+
+@pytest.mark.parametrize("z, y, row", [(0, 0, 0), (1, 0, 1), (1, 1, 0), (4, 3, 12)])
+def test_rows_are_stored_flipped_as_in_tms(archive, z, y, row):
+    assert tms_row(z, y) == row
+    assert tms_row(z, tms_row(z, y)) == y
+    archive.put("dam", z, 0, y, b"x")
+    stored = archive._conn.execute("SELECT tile_row FROM tiles WHERE map_name = 'dam'").fetchone()[0]
+    assert stored == row
+
+
+def test_maps_lists_zoom_ranges(archive):
+    archive.put_many([("dam", z, 0, 0, bytes([z])) for z in (1, 2, 4)] + [("spaceport", 3, 0, 0, b"s")])
+    assert archive.maps() == {"dam": (1, 4), "spaceport": (3, 3)}
+
+
+def test_readonly_mode(tmp_path):
+    path = tmp_path / "tiles.mbtiles"
+    writer = TileArchive(path)
+    writer.put("dam", 1, 1, 0, b"tile")
+    writer.close()
+
+    reader = TileArchive(path, readonly=True)
+    try:
+        assert reader.get("dam", 1, 1, 0)[0] == b"tile"
+        with pytest.raises(sqlite3.OperationalError):
+            reader.put("dam", 1, 0, 0, b"other")
+    finally:
+        reader.close()
+
+
+def test_pack_directory(tmp_path, archive):
+    tiles = tmp_path / "tiles"
+    for map_id, z, x, y, data in [("dam", 1, 0, 1, b"a"), ("dam", 2, 3, 2, b"b"), ("spaceport", 1, 1, 1, b"a")]:
+        path = tiles / map_id / str(z) / str(x) / f"{y}.webp"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    # Lo que no sigue el esquema <z>/<x>/<y>.webp se ignora
+    (tiles / "dam" / "1" / "0" / "notes.webp").write_bytes(b"?")
+    (tiles / "dam" / "1" / "0" / ".1.webp.part").write_bytes(b"?")
+    (tiles / "manifest.json").write_text("{}")
+
+    assert pack_directory(tiles, archive, map_ids=["dam"], batch=1) == 2
+    assert archive.get("dam", 2, 3, 2)[0] == b"b"
+    assert archive.maps() == {"dam": (1, 2)}
+    assert pack_directory(tiles, archive) == 3
+    assert archive.stats() == {"tiles": 3, "unique": 2, "bytes": 2}
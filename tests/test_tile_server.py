@@ -0,0 +1,128 @@
+"""tile_server.py: caché por bytes, ETag/304, 404 y precarga"""
+
+import threading
+
+import httpx
+import pytest
+
+from tile_server import IMMUTABLE, MISSING_CACHE, TILE_PATH, ByteLRU, DirectorySource, make_server, preload
+
+
+def write_tile(tiles_dir, tileset, z, x, y, data):
+    path = tiles_dir / tileset / str(z) / str(x) / f"{y}.webp"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+@pytest.fixture
+def tiles_dir(tmp_path):
+    write_tile(tmp_path, "dam", 1, 0, 0, b"zoom-1")
+    write_tile(tmp_path, "dam", 2, 1, 0, b"zoom-2")
+    write_tile(tmp_path, "dam", 3, 2, 3, b"zoom-3" * 10)
+    return tmp_path
+
+
+@pytest.fixture
+def serve(tiles_dir):
+    servers = []
+
+    def start(cache_bytes=1024):
+        server = make_server(DirectorySource(tiles_dir), port=0, cache_bytes=cache_bytes)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client = httpx.Client(base_url=f"http://127.0.0.1:{server.server_port}")
+        servers.append((server, client))
+        return server, client
+
+    yield start
+    for server, client in servers:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_tile_is_served_with_etag_and_immutable_cache(serve):
+    server, client = serve()
+    response = client.get("/tiles/dam/2/1/0.webp?v=3")
+    assert response.status_code == 200
+    assert response.content == b"zoom-2"
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert response.headers["access-control-allow-origin"] == "*"
+
+    etag = response.headers["etag"]
+    revalidated = client.get("/tiles/dam/2/1/0.webp", headers={"If-None-Match": f'"other", {etag}'})
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert server.RequestHandlerClass.cache.stats()["hits"] == 1
+
+
+def test_head_sends_headers_without_body(serve):
+    _, client = serve()
+    response = client.head("/tiles/dam/1/0/0.webp")
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(b"zoom-1"))
+    assert response.content == b""
+
+
+def test_missing_and_out_of_bounds_tiles(serve):
+    server, client = serve()
+    cache = server.RequestHandlerClass.cache
+    # Dentro del mapa pero sin descargar: 404 de corta duración y la fuente se consulta
+    missing = client.get("/tiles/dam/2/0/0.webp")
+    assert missing.status_code == 404 and missing.headers["cache-control"] == MISSING_CACHE
+    assert cache.stats()["misses"] == 1
+
+    # Fuera del mapa, mapa desconocido o ruta que no es de tiles: ni caché ni fuente
+    for path in ("/tiles/dam/2/4/0.webp", "/tiles/dam/9/0/0.webp", "/tiles/nowhere/1/0/0.webp"):
+        response = client.get(path)
+        assert response.status_code == 404 and response.headers["cache-control"] == IMMUTABLE
+    assert client.get("/tiles/dam/1/0/0.png").status_code == 404
+    assert cache.stats()["misses"] == 1 and len(cache) == 0
+
+
+def test_stats_endpoint(serve):
+    _, client = serve()
+    client.get("/tiles/dam/1/0/0.webp")
+    client.get("/tiles/dam/1/0/0.webp")
+    stats = client.get("/stats").json()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_preload_fills_the_cache_up_to_a_zoom(serve):
+    server, client = serve()
+    assert preload(server, 2) == 2
+    cache = server.RequestHandlerClass.cache
+    assert cache.size == len(b"zoom-1") + len(b"zoom-2")
+    client.get("/tiles/dam/2/1/0.webp")
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 0
+
+
+def test_byte_lru_evicts_least_recently_used():
+    lru = ByteLRU(10)
+    lru.put("a", (b"aaaa", "1"))
+    lru.put("b", (b"bbbb", "2"))
+    assert lru.get("a") == (b"aaaa", "1")
+    lru.put("c", (b"cccc", "3"))
+    assert lru.get("b") is None
+    assert lru.size == 8 and len(lru) == 2
+
+    lru.put("a", (b"aaaaaa", "4"))
+    assert lru.size == 10 and lru.get("c") == (b"cccc", "3")
+    # Un valor mayor que toda la caché no se guarda ni expulsa nada
+    lru.put("huge", (b"x" * 11, "5"))
+    assert lru.get("huge") is None and len(lru) == 2
+    assert lru.stats()["max_bytes"] == 10
+
+
+def test_server_cache_is_bounded_by_bytes(serve):
+    server, client = serve(cache_bytes=64)
+    for path in ("/tiles/dam/3/2/3.webp", "/tiles/dam/1/0/0.webp", "/tiles/dam/2/1/0.webp"):
+        assert client.get(path).status_code == 200
+    cache = server.RequestHandlerClass.cache
+    assert cache.size <= 64
+    assert cache.get(("dam", 3, 2, 3)) is None
+
+
+def test_tile_path_accepts_hyphenated_maps():
+    assert TILE_PATH.match("/tiles/buried-city/4/10/3.webp")
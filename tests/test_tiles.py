@@ -0,0 +1,65 @@
+"""Direccionamiento y extensión de arc_core.tiles"""
+
+import pytest
+
+from arc_core.maps import MAPS_DATA
+from arc_core.tiles import CDN_URL, ORDER_ZXY, ORDER_ZYX, TILE_SCHEMES, TileScheme, scheme_for
+
+
+@pytest.mark.parametrize("tileset, expected", [
+    ("dam", f"{CDN_URL}/maps/dam/tiles/3/1/2.webp"),
+    ("spaceport", f"{CDN_URL}/maps/spaceport/tiles/3/1/2.webp"),
+    ("buried-city", f"{CDN_URL}/maps/buried-city-v3/tiles/3/2/1.webp"),
+    ("stella-montis-l1", f"{CDN_URL}/maps/stella-montis/layers/stella-montis-l1/tiles/3/2/1.webp"),
+])
+def test_url_follows_each_maps_axis_order(tileset, expected):
+    # (z, x, y) = (3, 2, 1): dam y spaceport ponen la y antes que la x
+    assert TILE_SCHEMES[tileset].url(3, 2, 1) == expected
+
+
+def test_templates():
+    dam = TILE_SCHEMES["dam"]
+    assert dam.order == ORDER_ZYX and TILE_SCHEMES["blue-gate"].order == ORDER_ZXY
+    assert dam.template("http://cdn") == "http://cdn/maps/dam/tiles/{z}/{y}/{x}.webp"
+    # El servidor local siempre usa {z}/{x}/{y}
+    assert dam.local_template("http://127.0.0.1:8600") == "http://127.0.0.1:8600/tiles/dam/{z}/{x}/{y}.webp"
+    assert MAPS_DATA["dam"]["tileUrl"] == dam.template()
+
+
+@pytest.mark.parametrize("z, side", [(0, 1), (1, 1), (2, 2), (3, 4), (4, 8), (5, 16)])
+def test_tiles_per_side(z, side):
+    assert TileScheme("t", "t", "/t").tiles_per_side(z) == side
+
+
+def test_tiles_per_side_with_smaller_tiles():
+    assert TileScheme("t", "t", "/t", tile_size=256).tiles_per_side(1) == 2
+
+
+def test_bounds_at_native_and_max_zoom():
+    dam = TILE_SCHEMES["dam"]
+    assert (dam.max_native_zoom, dam.max_zoom) == (4, 5)
+    assert dam.in_bounds(4, 7, 7) and not dam.in_bounds(4, 8, 0) and not dam.in_bounds(4, 0, -1)
+    # Por defecto solo los zooms nativos; con max_zoom también los de overzoom
+    assert not dam.in_bounds(5, 0, 0)
+    assert dam.in_bounds(5, 15, 15, dam.max_zoom)
+    assert not dam.in_bounds(5, 16, 0, dam.max_zoom)
+    assert not dam.in_bounds(6, 0, 0, dam.max_zoom)
+    assert not dam.in_bounds(0, 0, 0)
+
+
+def test_tiles_and_count():
+    dam = TILE_SCHEMES["dam"]
+    tiles = list(dam.tiles())
+    assert len(tiles) == dam.count() == 1 + 4 + 16 + 64
+    assert len(set(tiles)) == len(tiles)
+    assert all(dam.in_bounds(*tile) for tile in tiles)
+    assert list(dam.tiles(range(2, 3))) == [(2, 0, 0), (2, 0, 1), (2, 1, 0), (2, 1, 1)]
+    assert TILE_SCHEMES["spaceport"].count() == 1 + 4 + 16
+
+
+def test_scheme_for_layers():
+    assert scheme_for("dam") is TILE_SCHEMES["dam"]
+    assert scheme_for("stella-montis") is TILE_SCHEMES["stella-montis-l2"]
+    assert scheme_for("stella-montis", "stella-montis-l1") is TILE_SCHEMES["stella-montis-l1"]
+    with pytest.raises(KeyError):
+        scheme_for("nowhere")
@@ -0,0 +1,241 @@
+"""
+Servidor local de tiles para arc_maps_app.py
+
+Sirve los tiles que baja download_tiles.py, desde la carpeta tiles/ o
+desde un archivo empaquetado (--archive), en
+/tiles/<mapa>/<z>/<x>/<y>.webp. Los tiles más pedidos (los zooms bajos
+los pide todo el mundo) se quedan en memoria en un LRU limitado por
+bytes. Las respuestas llevan ETag (hash del contenido) y Cache-Control
+inmutable, así que el navegador no vuelve a pedir un tile que ya tiene,
+y si lo revalida recibe un 304 sin cuerpo.
+
+    python tile_server.py                          # tiles/ en el puerto 8600
+    python tile_server.py --archive tiles.mbtiles --cache-mb 128 --preload-zoom 2
+    ARC_TILE_SERVER=http://127.0.0.1:8600 streamlit run arc_maps_app.py
+
+Los zooms por encima del nativo los genera build_tile_pyramid.py; con
+ARC_TILE_OVERZOOM=1 la app los pide en vez de reescalar en el navegador.
+
+Si los tiles se actualizan (download_tiles.py --sync), cambia
+ARC_TILE_VERSION en la app para que las URLs nuevas no usen la caché
+inmutable del navegador.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from arc_core.tile_archive import TileArchive
+from arc_core.tiles import TILE_SCHEMES
+
+TILES_DIR = Path("tiles")
+DEFAULT_PORT = 8600
+# Memoria máxima para tiles en caché
+DEFAULT_CACHE_MB = 64
+
+# Un año + immutable: el contenido de una URL de tile no cambia
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Los tiles que no existen se pueden volver a pedir más adelante
+MISSING_CACHE = "public, max-age=3600"
+
+TILE_PATH = re.compile(r"^/tiles/([\w.-]+)/(\d+)/(\d+)/(\d+)\.webp$")
+
+
+class ByteLRU:
+    """LRU limitado por la suma de bytes de los valores"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        data = value[0]
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old[0])
+            self._items[key] = value
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted[0])
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._items), "bytes": self.size, "max_bytes": self.max_bytes,
+            "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class DirectorySource:
+    """Tiles de tiles/<mapa>/<z>/<x>/<y>.webp"""
+
+    def __init__(self, tiles_dir):
+        self.tiles_dir = Path(tiles_dir)
+
+    def get(self, tileset, z, x, y):
+        """(datos, etag) o None"""
+        try:
+            data = (self.tiles_dir / tileset / str(z) / str(x) / f"{y}.webp").read_bytes()
+        except OSError:
+            return None
+        return data, hashlib.sha256(data).hexdigest()[:32]
+
+    def tiles(self, max_zoom):
+        """(mapa, z, x, y) de los zooms <= max_zoom (para precargar)"""
+        for tile in self.tiles_dir.glob("*/*/*/*.webp"):
+            z, x = tile.parent.parent.name, tile.parent.name
+            if z.isdigit() and x.isdigit() and tile.stem.isdigit() and int(z) <= max_zoom:
+                yield tile.parent.parent.parent.name, int(z), int(x), int(tile.stem)
+
+
+class ArchiveSource:
+    """Tiles de un archivo de arc_core.tile_archive (solo lectura)"""
+
+    def __init__(self, path):
+        self.archive = TileArchive(path, readonly=True)
+
+    def get(self, tileset, z, x, y):
+        found = self.archive.get(tileset, z, x, y)
+        return (found[0], found[1][:32]) if found else None
+
+    def tiles(self, max_zoom):
+        for tileset, (low, _) in self.archive.maps().items():
+            scheme = TILE_SCHEMES.get(tileset)
+            if scheme is None:
+                continue
+            for z, x, y in scheme.tiles(range(low, max_zoom + 1)):
+                yield tileset, z, x, y
+
+
+class TileHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Los fija make_server
+    source = None
+    cache = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None, head=False):
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and not head:
+            self.wfile.write(body)
+
+    def _tile(self, head=False):
+        path = self.path.split("?", 1)[0]
+        if path == "/stats":
+            body = json.dumps(self.cache.stats()).encode("utf-8")
+            self._send(200, body, {"Content-Type": "application/json", "Cache-Control": "no-store"}, head)
+            return
+
+        match = TILE_PATH.match(path)
+        if not match:
+            self._send(404, b"not found", {"Content-Type": "text/plain"}, head)
+            return
+        tileset, z, x, y = match.group(1), *map(int, match.groups()[1:])
+        scheme = TILE_SCHEMES.get(tileset)
+        if scheme is None or not scheme.in_bounds(z, x, y, scheme.max_zoom):
+            # Fuera del mapa: ni se busca en la fuente ni ocupa la caché
+            self._send(404, b"", {"Cache-Control": IMMUTABLE}, head)
+            return
+
+        key = (tileset, z, x, y)
+        found = self.cache.get(key)
+        if found is None:
+            found = self.source.get(*key)
+            if found is None:
+                self._send(404, b"", {"Cache-Control": MISSING_CACHE}, head)
+                return
+            self.cache.put(key, found)
+        data, digest = found
+
+        etag = f'"{digest}"'
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE}
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self._send(304, b"", headers, head)
+            return
+        headers["Content-Type"] = "image/webp"
+        self._send(200, data, headers, head)
+
+    def do_GET(self):
+        self._tile()
+
+    def do_HEAD(self):
+        self._tile(head=True)
+
+
+def make_server(source, port=DEFAULT_PORT, cache_bytes=DEFAULT_CACHE_MB * 1024 * 1024, host="127.0.0.1"):
+    """Servidor listo para serve_forever() (port=0 elige uno libre)"""
+    handler = type("Handler", (TileHandler,), {"source": source, "cache": ByteLRU(cache_bytes)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def preload(server, max_zoom):
+    """Mete en la caché los tiles de los zooms bajos → número de tiles"""
+    handler = server.RequestHandlerClass
+    count = 0
+    for key in handler.source.tiles(max_zoom):
+        found = handler.source.get(*key)
+        if found is not None:
+            handler.cache.put(key, found)
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local de tiles con caché")
+    parser.add_argument("--tiles", type=Path, default=TILES_DIR, help="carpeta de download_tiles.py")
+    parser.add_argument("--archive", type=Path, help="archivo empaquetado (download_tiles.py --archive)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_CACHE_MB, help="memoria para tiles en caché")
+    parser.add_argument("--preload-zoom", type=int, default=-1, help="precargar los zooms hasta este nivel")
+    args = parser.parse_args()
+
+    source = ArchiveSource(args.archive) if args.archive else DirectorySource(args.tiles)
+    server = make_server(source, args.port, int(args.cache_mb * 1024 * 1024), args.host)
+    if args.preload_zoom >= 0:
+        count = preload(server, args.preload_zoom)
+        print(f"📦 {count} tiles precargados ({server.RequestHandlerClass.cache.size / 1024 / 1024:.1f} MB)")
+    print(f"🗺️ Tiles de {args.archive or args.tiles} en http://{args.host}:{server.server_port}/tiles/")
+    print(f"   Usa ARC_TILE_SERVER=http://{args.host}:{server.server_port} con arc_maps_app.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()